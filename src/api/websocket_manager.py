@@ -9,6 +9,8 @@ from typing import List, Dict, Optional
 from fastapi import WebSocket
 from loguru import logger
 
+from utils import fast_json
+
 
 class ConnectionManager:
     """WebSocket 连接管理器（单例）"""
@@ -46,11 +48,14 @@ class ConnectionManager:
         logger.info(f"WebSocket断开: 当前{len(self.active_connections)}个活跃连接")
     
     async def broadcast(self, message: dict):
-        """广播消息到所有连接"""
+        """广播消息到所有连接（只序列化一次）"""
+        if not self.active_connections:
+            return
+        text = fast_json.dumps(message).decode("utf-8")
         disconnected = []
         for connection in self.active_connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(text)
             except Exception as e:
                 logger.debug(f"WebSocket发送失败: {e}")
                 disconnected.append(connection)
@@ -65,10 +70,11 @@ class ConnectionManager:
         if user_id not in self.user_connections:
             return
         
+        text = fast_json.dumps(message).decode("utf-8")
         disconnected = []
         for connection in self.user_connections[user_id]:
             try:
-                await connection.send_json(message)
+                await connection.send_text(text)
             except Exception:
                 disconnected.append(connection)
         
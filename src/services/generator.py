@@ -4,13 +4,13 @@
 
 from __future__ import annotations
 
-import subprocess, sys, json, time, threading, re
+import subprocess, sys, json, time, threading, re, shutil, zipfile
 from pathlib import Path
 from typing import Dict, Any, Tuple, List, TYPE_CHECKING
 
 from loguru import logger
 
-from utils.text import html_to_text, sanitize_code, sanitize_filename, parse_examples, samples_to_xml, samples_to_problem_format
+from utils.text import html_to_text, sanitize_code, sanitize_cpp_code, sanitize_filename, parse_examples, samples_to_xml, samples_to_problem_format
 from utils.concurrency import acquire, SemaphorePool
 from services.oj_api import OJApi
 from services.oj_adapter import OJApiAdapter
@@ -147,7 +147,6 @@ class GeneratorService:
         zip_path = pdir / zip_name
         
         if tests_dir.exists():
-            import shutil
             self._log(original_id, "清理旧的测试数据目录...")
             shutil.rmtree(tests_dir)
         
@@ -527,7 +526,6 @@ class GeneratorService:
         # 总是重新打包（已在开始时删除旧zip）
         self._log(original_id, "打包测试数据为 zip...")
         if tests_dir.exists() and ok:
-            import zipfile
             with zipfile.ZipFile(zip_path, "w") as z:
                 count = 0
                 for i in range(10):
@@ -578,8 +576,6 @@ class GeneratorService:
             C++ 代码字符串
         """
         from services.solver import build_prompt_for_solution
-        from services.llm.response_formatter import ResponseFormatter
-        from utils.text import sanitize_cpp_code
         
         # 构建题解提示词
         prompt = build_prompt_for_solution(problem, reference_solutions=reference_solutions)
@@ -29,6 +29,8 @@ class HydroOJAdapter(OJAdapter):
         self.preferred_prefix = preferred_prefix
         self._data_uploader = None
         self._solution_submitter = None
+        # (base_url, domain, cookie) -> 认证对象，复用其 Session 免去每题重新握手
+        self._auth_cache: Dict[tuple, Any] = {}
         self._config_loaded = bool(self.base_url and self.domain)
     
     def _do_initialize(self, context: Dict[str, Any]) -> bool:
@@ -256,12 +258,20 @@ class HydroOJAdapter(OJAdapter):
         logger.debug(f"[HydroOJ] Base URL: {self.base_url}")
         logger.debug(f"[HydroOJ] Domain: {self.domain}")
         
+        # 相同配置复用已建立的认证对象（及其连接池）
+        cache_key = (self.base_url, self.domain, self.cookie)
+        if self.cookie:
+            cached = self._auth_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         auth = HydroOJAuth(self.base_url, self.domain)
         
         # 优先使用配置的Cookie
         if self.cookie:
             logger.info(f"[HydroOJ] 使用配置的 Cookie 进行认证")
             auth.login_with_cookie(self.cookie)
+            self._auth_cache[cache_key] = auth
         else:
             logger.info(f"[HydroOJ] 未找到配置的 Cookie，尝试从文件加载")
             # 尝试从文件加载
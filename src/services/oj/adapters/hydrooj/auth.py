@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import Dict, Optional
 from urllib.parse import urlparse
 
-import requests
+from utils.http_session import create_pooled_session
 
 
 class HydroOJAuth:
@@ -16,7 +16,8 @@ class HydroOJAuth:
     def __init__(self, base_url: str, domain: str):
         self.base_url = base_url.rstrip("/")
         self.domain = domain
-        self.session = requests.Session()
+        # 连接池 Session：同一认证对象在多个题目间复用时共享 keep-alive 连接
+        self.session = create_pooled_session()
     
     def login_with_selenium(self, login_url: str = None, target_domain: str = None) -> str:
         """使用Selenium自动登录获取Cookie
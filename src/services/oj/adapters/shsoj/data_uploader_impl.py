@@ -3,11 +3,12 @@
 
 from typing import Dict, Any
 from pathlib import Path
-import json, time, os
+import json
 from loguru import logger
 
 from ...base.data_uploader import DataUploader
 from .url_utils import derive_api_url, derive_frontend_url
+from utils.multipart import MultipartFileStream
 
 
 class SHSOJDataUploader(DataUploader):
@@ -175,39 +176,18 @@ class SHSOJDataUploader(DataUploader):
         
         url = f"{self.api_base_url}/api/file/upload-testcase-zip?mode={mode}"
         
-        # 读取文件
-        with open(zip_path, "rb") as f:
-            file_data = f.read()
-        
-        filename = os.path.basename(zip_path)
-        
-        # 构建multipart/form-data
-        boundary = "----WebKitFormBoundary%08x%08x" % (int(time.time()) & 0xFFFFFFFF, os.getpid() & 0xFFFFFFFF)
-        file_ct = "application/x-zip-compressed"
-        crlf = "\r\n"
-        
-        lines = []
-        lines.append(f"--{boundary}")
-        lines.append(f'Content-Disposition: form-data; name="file"; filename="{filename}"')
-        lines.append(f"Content-Type: {file_ct}")
-        lines.append("")
-        
-        body_head = crlf.join(lines).encode("utf-8") + crlf.encode("utf-8")
-        body_tail = (crlf + f"--{boundary}--" + crlf).encode("utf-8")
-        body = body_head + file_data + body_tail
-        
-        headers = {
-            "Content-Type": f"multipart/form-data; boundary={boundary}",
-            "Content-Length": str(len(body)),
-            "Accept": "*/*",
-            "Origin": self.api_base_url.replace("-api", "").replace("api-tcoj", "oj"),
-            "Referer": self.api_base_url.replace("-api", "").replace("api-tcoj", "oj") + "/",
-            "User-Agent": "Mozilla/5.0",
-            "authorization": auth.token,
-            "url-type": "general",
-        }
-        
-        r = auth.session.post(url, data=body, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
+        # 流式构建multipart/form-data（不整体读入内存）
+        with MultipartFileStream(zip_path) as body:
+            headers = {
+                "Content-Type": body.content_type,
+                "Accept": "*/*",
+                "Origin": self.api_base_url.replace("-api", "").replace("api-tcoj", "oj"),
+                "Referer": self.api_base_url.replace("-api", "").replace("api-tcoj", "oj") + "/",
+                "User-Agent": "Mozilla/5.0",
+                "authorization": auth.token,
+                "url-type": "general",
+            }
+            r = auth.session.post(url, data=body, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
         
         if r.status_code != 200:
             raise RuntimeError(f"上传失败: HTTP {r.status_code} {r.reason}")
@@ -5,6 +5,8 @@ from typing import Dict, Any
 import json
 from loguru import logger
 
+from utils.concurrency import RateLimitedError, parse_retry_after
+
 from ...base.solution_submitter import SolutionSubmitter
 from .url_utils import derive_api_url, derive_frontend_url
 
@@ -159,6 +161,12 @@ class SHSOJSolutionSubmitter(SolutionSubmitter):
         if r.status_code != 200:
             error_text = r.text[:200] if r.text else ""
             logger.error(f"SHSOJ提交失败: HTTP {r.status_code}, URL: {url}, Response: {error_text}")
+            if r.status_code in (429, 503):
+                raise RateLimitedError(
+                    f"提交失败: HTTP {r.status_code} - {error_text}",
+                    status_code=r.status_code,
+                    retry_after=parse_retry_after(r.headers.get("Retry-After")),
+                )
             raise RuntimeError(f"提交失败: HTTP {r.status_code} - {error_text}")
         
         try:
@@ -170,7 +178,11 @@ class SHSOJSolutionSubmitter(SolutionSubmitter):
         code_val = obj.get("code")
         
         if code_val == 10002:
-            raise RuntimeError("提交频率过快，请稍后再试")
+            raise RateLimitedError(
+                "提交频率过快，请稍后再试",
+                status_code=r.status_code,
+                retry_after=parse_retry_after(r.headers.get("Retry-After")),
+            )
         
         if code_val not in (0, 200):
             msg = obj.get("msg") or obj.get("message") or "未知错误"
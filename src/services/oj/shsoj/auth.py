@@ -5,7 +5,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 import requests
 from loguru import logger
-from utils.concurrency import retry_with_backoff
+from utils.concurrency import is_retryable_error, raise_for_transient_status, retry_with_backoff
+from utils.http_session import create_pooled_adapter, create_pooled_session
 
 
 # SHSOJ 固定 API 地址（不需要用户配置）
@@ -29,6 +30,9 @@ class SHSOJAuth:
         self.timeout = timeout
         self.proxies = proxies or None
         self.verify_ssl = verify_ssl
+        # 所有登录共享同一个连接池（token 刷新免去 TLS 握手）；每次登录使用新的 Session，
+        # 重新登录不会修改其他线程仍在使用的旧 OJAuth 的 authorization 头
+        self._adapter = create_pooled_adapter()
     
     def login_user(self, username: str, password: str) -> OJAuth:
         """登录并获取token
@@ -37,8 +41,7 @@ class SHSOJAuth:
         """
         url = f"{self.base_url}/api/login"
         
-        s = requests.Session()
-        s.proxies = self.proxies or {}
+        s = create_pooled_session(proxies=self.proxies, adapter=self._adapter)
         
         # 简化 headers，只保留必要的
         headers = {
@@ -63,7 +66,9 @@ class SHSOJAuth:
             if resp.status_code != 200:
                 logger.error(f"[SHSOJ] 登录失败，HTTP状态 {resp.status_code}")
                 logger.error(f"[SHSOJ] 响应内容: {resp.text[:500]}")
-                raise RuntimeError(f"登录失败，HTTP状态 {resp.status_code}: {resp.text}")
+                message = f"登录失败，HTTP状态 {resp.status_code}: {resp.text}"
+                raise_for_transient_status(resp, message)
+                raise RuntimeError(message)
             
             # 解析响应
             try:
@@ -84,15 +89,17 @@ class SHSOJAuth:
             
             # 如果响应头没有，尝试从响应体获取
             if not token:
+                inner = data.get("data")
+                if not isinstance(inner, dict):
+                    inner = {}
                 token = (
-                    data.get("data", {}).get("token") if isinstance(data.get("data"), dict) else None
-                ) or data.get("token") or (
-                    data.get("data", {}).get("Authorization") if isinstance(data.get("data"), dict) else None
-                ) or data.get("Authorization")
+                    inner.get("token") or data.get("token")
+                    or inner.get("Authorization") or data.get("Authorization")
+                )
                 logger.debug(f"[SHSOJ] 从响应体获取 token: {'成功' if token else '失败'}")
             
             if not token:
-                logger.error(f"[SHSOJ] 登录响应头: {dict(resp.headers)}")
+                logger.opt(lazy=True).error("[SHSOJ] 登录响应头: {}", lambda: dict(resp.headers))
                 logger.error(f"[SHSOJ] 登录响应体: {resp.text[:500]}")
                 raise RuntimeError("登录成功但未返回Authorization token")
             
@@ -100,5 +107,10 @@ class SHSOJAuth:
             logger.info(f"[SHSOJ] 登录成功，token 前缀: {token[:20]}...")
             return token
 
-        token = retry_with_backoff(_req, on_error=lambda e, a: logger.warning(f"[SHSOJ] 登录重试 {a}: {e}"))
+        token = retry_with_backoff(
+            _req,
+            on_error=lambda e, a: logger.warning(f"[SHSOJ] 登录重试 {a}: {e}"),
+            jitter=True,
+            retryable=is_retryable_error,
+        )
         return OJAuth(token=token, session=s)
@@ -21,46 +21,81 @@ def get_status_name(code: int) -> str:
     return STATUS_NAMES.get(code, f"Status {code}")
 
 
+# 状态标志位：判题结果汇总循环中用一次字典查询代替多次谓词调用
+#   flags = STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS)
+#   if flags & FLAG_REGEN: ...
+FLAG_AC = 1 << 0
+FLAG_WA = 1 << 1
+FLAG_CE = 1 << 2
+FLAG_SE = 1 << 3
+FLAG_PAC = 1 << 4
+FLAG_RE = 1 << 5
+FLAG_JUDGING = 1 << 6
+FLAG_FINAL = 1 << 7
+FLAG_REGEN = 1 << 8
+
+STATUS_FLAGS = {
+    0: FLAG_AC | FLAG_FINAL,
+    1: FLAG_WA | FLAG_FINAL | FLAG_REGEN,
+    2: FLAG_FINAL,
+    3: FLAG_FINAL,
+    4: FLAG_RE | FLAG_FINAL | FLAG_REGEN,
+    5: FLAG_JUDGING,
+    6: FLAG_CE | FLAG_FINAL,
+    7: FLAG_PAC | FLAG_FINAL | FLAG_REGEN,
+    8: FLAG_SE | FLAG_FINAL,
+    -2: FLAG_CE | FLAG_FINAL,
+}
+
+# 未知状态码视为最终状态（与 is_final_status 的 code != 5 语义一致）
+UNKNOWN_STATUS_FLAGS = FLAG_FINAL
+
+
+def get_status_flags(code: int) -> int:
+    """获取状态码对应的标志位"""
+    return STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS)
+
+
 def is_accepted(code: int) -> bool:
     """判断是否AC"""
-    return code == 0
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_AC)
 
 
 def is_compile_error(code: int) -> bool:
     """判断是否编译错误"""
-    return code in (6, -2)
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_CE)
 
 
 def is_system_error(code: int) -> bool:
     """判断是否系统错误"""
-    return code == 8
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_SE)
 
 
 def is_partially_accepted(code: int) -> bool:
     """判断是否部分正确（PAC）"""
-    return code == 7
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_PAC)
 
 
 def is_wrong_answer(code: int) -> bool:
     """判断是否答案错误"""
-    return code == 1
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_WA)
 
 
 def is_runtime_error(code: int) -> bool:
     """判断是否运行时错误"""
-    return code == 4
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_RE)
 
 
 def is_judging(code: int) -> bool:
     """判断是否正在判题中"""
-    return code == 5
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_JUDGING)
 
 
 def is_final_status(code: int) -> bool:
     """判断是否是最终状态（非判题中）"""
-    return code != 5
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_FINAL)
 
 
 def requires_data_regeneration(code: int) -> bool:
     """判断是否需要重新生成数据（WA/RE/PAC）"""
-    return code in (1, 4, 7)
+    return bool(STATUS_FLAGS.get(code, UNKNOWN_STATUS_FLAGS) & FLAG_REGEN)
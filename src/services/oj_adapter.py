@@ -9,11 +9,29 @@
 """
 
 from __future__ import annotations
+from functools import lru_cache
 from typing import Any, Dict, List
 from .oj_api import OJApi, OJAuth
 from loguru import logger
 
 
+@lru_cache(maxsize=4096)
+def _parse_and_normalize(original_id: str) -> str:
+    """通过适配器注册表解析问题ID（结果按原始ID缓存）
+    
+    无法解析时抛出 LookupError，异常不会进入缓存，注册表就绪后可再次尝试。
+    """
+    from services.oj.registry import get_global_registry
+    registry = get_global_registry()
+    adapter = registry.find_adapter_by_url(original_id) if registry else None
+    fetcher = adapter.get_problem_fetcher() if adapter else None
+    parsed = fetcher.parse_problem_id(original_id) if fetcher else None
+    if not parsed:
+        raise LookupError("无匹配的适配器或无法解析")
+    logger.debug(f"OJApiAdapter: 将原始ID {original_id} 规范化为后端ID {parsed}")
+    return str(parsed)
+
+
 class OJApiAdapter:
     """OJ适配器（使用模块化SHSOJ或直通旧OJApi）"""
     
@@ -24,20 +42,12 @@ class OJApiAdapter:
     
     def _normalize_problem_id_for_api(self, original_id: str) -> str:
         """将 URL/混合形式的问题标识转换为后端API需要的实际 problemId（通常是纯数字）"""
+        # 快速路径：纯数字ID无需解析
+        if isinstance(original_id, str) and original_id.isdigit():
+            return original_id
         try:
-            # 仅当明显是URL或包含非数字字符时尝试解析
-            if isinstance(original_id, str) and (original_id.startswith("http://") or original_id.startswith("https://") or not original_id.isdigit()):
-                from services.oj.registry import get_global_registry
-                registry = get_global_registry()
-                if registry:
-                    adapter = registry.find_adapter_by_url(original_id)
-                    if adapter:
-                        fetcher = adapter.get_problem_fetcher()
-                        if fetcher:
-                            parsed = fetcher.parse_problem_id(original_id)
-                            if parsed:
-                                logger.debug(f"OJApiAdapter: 将原始ID {original_id} 规范化为后端ID {parsed}")
-                                return str(parsed)
+            if isinstance(original_id, str):
+                return _parse_and_normalize(original_id)
         except Exception as e:
             logger.debug(f"OJApiAdapter: 规范化问题ID失败 ({original_id}): {e}")
         # 回退：原样返回
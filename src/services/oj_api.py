@@ -3,16 +3,65 @@
 
 from __future__ import annotations
 
-import json
+import copy
+import threading
 import time
-import os
 from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional, Dict, Any, Tuple, List
 
 import requests
 from loguru import logger
 
-from utils.concurrency import retry_with_backoff
+from utils import fast_json
+from utils.concurrency import is_retryable_error, raise_for_transient_status, retry_with_backoff
+from utils.http_session import create_pooled_session
+from utils.multipart import MultipartFileStream
+
+_USER_AGENT = "Mozilla/5.0 (compatible; ojo_batch_tool/1.0)"
+
+# get_problem_detail 缓存：有 ETag 时用 If-None-Match 复验，无 ETag 时按 TTL 直接复用
+_DETAIL_CACHE_MAXSIZE = 1024
+_DETAIL_CACHE_TTL = 60.0
+
+
+def _loads(r: requests.Response) -> Any:
+    """直接从原始字节解析JSON响应（跳过 r.json() 的字符集探测与文本解码）"""
+    return fast_json.loads(r.content)
+
+
+def _read_preview(r: requests.Response, limit: int = 4096) -> str:
+    """读取流式响应体的前 limit 字节（错误页可能很大，不整体缓冲）"""
+    try:
+        return r.raw.read(limit, decode_content=True).decode("utf-8", errors="replace")
+    except Exception:
+        return ""
+
+@lru_cache(maxsize=32)
+def _derive_api_url(frontend_url: str) -> str:
+    """根据前端URL自动推导API URL（与problem_fetcher_impl保持一致，结果按URL缓存）"""
+    url_lower = frontend_url.lower()
+    
+    # 如果已经是API地址，直接返回
+    if 'api-tcoj.aicoders.cn' in url_lower:
+        return "https://api-tcoj.aicoders.cn"
+    if 'oj-api.shsbnu.net' in url_lower:
+        return "https://oj-api.shsbnu.net"
+    
+    # 新的 aicoders.cn 平台（前端）
+    if 'oj.aicoders.cn' in url_lower or 'aicoders.cn/problem' in url_lower:
+        logger.debug(f"OJApi: 前端URL（aicoders） {frontend_url} → API URL https://api-tcoj.aicoders.cn")
+        return "https://api-tcoj.aicoders.cn"
+    
+    # 旧的 shsbnu.net 平台（前端）
+    if 'oj.shsbnu.net' in url_lower or 'shsbnu.net' in url_lower:
+        logger.debug(f"OJApi: 前端URL（shsbnu） {frontend_url} → API URL https://oj-api.shsbnu.net")
+        return "https://oj-api.shsbnu.net"
+    
+    # 默认使用原URL
+    logger.warning(f"OJApi: 无法推导API URL，使用原URL {frontend_url}")
+    return frontend_url
 
 
 @dataclass
@@ -23,37 +72,68 @@ class OJAuth:
 
 class OJApi:
     """与 OJ 的交互封装 - 所有API调用完全按照原始脚本格式"""
-    def __init__(self, base_url: str, timeout: int = 30, proxies: dict | None = None, verify_ssl: bool = True):
+    def __init__(self, base_url: str, timeout: int = 30, proxies: dict | None = None, verify_ssl: bool = True,
+                 pool_maxsize: int = 32):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.proxies = proxies or None
         self.verify_ssl = verify_ssl
+        # 每个主机的连接池大小（应不小于并发调用本实例的线程数）
+        self.pool_maxsize = pool_maxsize
+        # 无需认证的请求共用一个连接池 Session（同一主机的连续请求复用 keep-alive 连接）
+        self.session = create_pooled_session(pool_maxsize=pool_maxsize, proxies=self.proxies)
+        # original_id → (ETag, 缓存时间, 题目数据)
+        self._detail_cache: Dict[str, Tuple[str, float, Dict[str, Any]]] = {}
+        self._detail_cache_lock = threading.Lock()
         # 推导API URL（前端URL → API URL）
         self.api_base_url = self._derive_api_url(self.base_url)
+        # 静态请求头在构造时一次性生成，各方法只补充 authorization 等可变字段
+        self._origin = self.base_url.replace("-api", "")
+        self._referer = self._origin + "/"
+        self._json_headers = MappingProxyType({
+            "Content-Type": "application/json;charset=UTF-8",
+            "Accept": "application/json, text/plain, */*",
+            "Origin": self._origin,
+            "Referer": self._referer,
+            "Url-Type": "general",
+            "User-Agent": _USER_AGENT,
+        })
+        self._get_headers = MappingProxyType({
+            "Accept": "application/json, text/plain, */*",
+            "User-Agent": _USER_AGENT,
+            "Url-Type": "general",
+            "Origin": self._origin,
+            "Referer": self._referer,
+        })
+        self._public_headers = MappingProxyType({
+            "Accept": "application/json, text/plain, */*",
+            "User-Agent": _USER_AGENT,
+            "url-type": "general",
+        })
+        self._admin_get_headers = MappingProxyType({
+            "Accept": "application/json, text/plain, */*",
+            "url-type": "general",
+            "User-Agent": "Mozilla/5.0",
+        })
+        self._admin_json_headers = MappingProxyType({
+            "Content-Type": "application/json;charset=UTF-8",
+            "Accept": "application/json, text/plain, */*",
+            "url-type": "general",
+            "Origin": self._origin,
+            "Referer": self._referer,
+            "User-Agent": "Mozilla/5.0",
+        })
+        self._upload_headers = MappingProxyType({
+            "Accept": "*/*",
+            "Origin": self._origin,
+            "Referer": self._referer,
+            "User-Agent": "Mozilla/5.0",
+            "url-type": "general",
+        })
     
     def _derive_api_url(self, frontend_url: str) -> str:
         """根据前端URL自动推导API URL（与problem_fetcher_impl保持一致）"""
-        url_lower = frontend_url.lower()
-        
-        # 如果已经是API地址，直接返回
-        if 'api-tcoj.aicoders.cn' in url_lower:
-            return "https://api-tcoj.aicoders.cn"
-        if 'oj-api.shsbnu.net' in url_lower:
-            return "https://oj-api.shsbnu.net"
-        
-        # 新的 aicoders.cn 平台（前端）
-        if 'oj.aicoders.cn' in url_lower or 'aicoders.cn/problem' in url_lower:
-            logger.debug(f"OJApi: 前端URL（aicoders） {frontend_url} → API URL https://api-tcoj.aicoders.cn")
-            return "https://api-tcoj.aicoders.cn"
-        
-        # 旧的 shsbnu.net 平台（前端）
-        if 'oj.shsbnu.net' in url_lower or 'shsbnu.net' in url_lower:
-            logger.debug(f"OJApi: 前端URL（shsbnu） {frontend_url} → API URL https://oj-api.shsbnu.net")
-            return "https://oj-api.shsbnu.net"
-        
-        # 默认使用原URL
-        logger.warning(f"OJApi: 无法推导API URL，使用原URL {frontend_url}")
-        return frontend_url
+        return _derive_api_url(frontend_url)
 
     def login_user(self, username: str, password: str) -> OJAuth:
         """登录并获取token（对应team.py的login_user）"""
@@ -65,20 +145,13 @@ class OJApi:
         if api_login != frontend_login:
             login_urls.append(api_login)
         
-        s = requests.Session()
-        s.proxies = self.proxies or {}
+        # 每次登录使用独立的 Session，避免不同账号的 authorization 头互相覆盖
+        s = create_pooled_session(pool_maxsize=self.pool_maxsize, proxies=self.proxies)
 
         payload = {"username": username, "password": password}
 
         def _attempt(url: str) -> str:
-            headers = {
-                "Content-Type": "application/json;charset=UTF-8",
-                "Accept": "application/json, text/plain, */*",
-                "Origin": self.base_url.replace("-api", ""),
-                "Referer": self.base_url.replace("-api", "") + "/",
-                "Url-Type": "general",
-                "User-Agent": "Mozilla/5.0 (compatible; ojo_batch_tool/1.0)",
-            }
+            headers = self._json_headers
             logger.debug(f"OJApi: 尝试登录 {url}")
             resp = s.post(
                 url,
@@ -89,12 +162,14 @@ class OJApi:
                 verify=self.verify_ssl,
             )
             if resp.status_code != 200:
-                raise RuntimeError(f"登录失败，HTTP状态 {resp.status_code}: {resp.text}")
+                message = f"登录失败，HTTP状态 {resp.status_code}: {resp.text}"
+                raise_for_transient_status(resp, message)
+                raise RuntimeError(message)
             
             token = resp.headers.get("Authorization")
             if not token:
                 try:
-                    data = resp.json()
+                    data = _loads(resp)
                     token = data.get("data", {}).get("token") or data.get("token")
                 except Exception:
                     token = None
@@ -112,12 +187,19 @@ class OJApi:
                 try:
                     return _attempt(url)
                 except Exception as exc:
-                    last_exc = exc
+                    # 任一地址出现可重试错误（限流/5xx/连接错误）时整体重试
+                    if last_exc is None or not is_retryable_error(last_exc):
+                        last_exc = exc
                     logger.warning(f"OJApi: 登录地址 {url} 失败: {exc}")
             assert last_exc is not None
             raise last_exc
 
-        token = retry_with_backoff(_req, on_error=lambda e, a: logger.warning(f"登录重试 {a}: {e}"))
+        token = retry_with_backoff(
+            _req,
+            on_error=lambda e, a: logger.warning(f"登录重试 {a}: {e}"),
+            jitter=True,
+            retryable=is_retryable_error,
+        )
         return OJAuth(token=token, session=s)
 
     def resolve_actual_id(self, auth: OJAuth, original_id: str) -> Tuple[int, str]:
@@ -130,31 +212,27 @@ class OJApi:
             "currentPage": 1,
             "isGroup": False,
         }
-        data_bytes = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        headers = {
-            "Content-Type": "application/json;charset=UTF-8",
-            "Accept": "application/json, text/plain, */*",
-            "authorization": auth.token,
-            "url-type": "general",
-        }
+        data_bytes = fast_json.dumps(payload)
+        headers = {**self._admin_json_headers, "authorization": auth.token}
         
         try:
             r = auth.session.post(url, data=data_bytes, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
             if r.status_code == 200:
-                obj = r.json()
+                obj = _loads(r)
                 records = obj.get("data", {}).get("records", []) or []
                 if records:
-                    # 精确匹配problemId字段
-                    for rec in records:
-                        if rec.get("problemId") == str(original_id):
-                            actual_id = rec.get("id", int(original_id))
-                            problem_id_str = rec.get("problemId", str(original_id))
-                            logger.debug(f"精确匹配到题目: id={actual_id}, problemId={problem_id_str}")
-                            return int(actual_id), str(problem_id_str)
+                    # 精确匹配problemId字段（按problemId建索引，重复时保留首条记录）
+                    by_pid = {str(rec.get("problemId")): rec for rec in reversed(records)}
+                    rec = by_pid.get(str(original_id))
+                    if rec is not None:
+                        actual_id = rec.get("id", int(original_id))
+                        problem_id_str = rec.get("problemId", str(original_id))
+                        logger.debug(f"精确匹配到题目: id={actual_id}, problemId={problem_id_str}")
+                        return int(actual_id), str(problem_id_str)
                     
                     # 没有精确匹配，记录警告并使用原始ID
                     logger.warning(f"未找到精确匹配的题目 {original_id}，API返回了 {len(records)} 条记录")
-                    logger.warning(f"返回的记录: {[rec.get('problemId') for rec in records]}")
+                    logger.warning(f"返回的记录: {list(by_pid)}")
         except Exception as e:
             logger.debug(f"resolve_actual_id失败: {e}")
         
@@ -164,73 +242,61 @@ class OJApi:
         """获取公开的题目详情（对应getdata.py的fetch_problem_detail）"""
         # 使用推导的API URL，修复双斜杠问题
         url = f"{self.api_base_url}/api/get-problem-detail?problemId={original_id}"
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "User-Agent": "Mozilla/5.0 (compatible; ojo_batch_tool/1.0)",
-            "url-type": "general",
-        }
-        
-        logger.info(f"OJApi: 请求题目详情 {original_id}")
-        logger.info(f"OJApi: 使用 API URL: {url}")
-        
-        r = requests.get(url, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
-        
-        logger.info(f"OJApi: HTTP {r.status_code}, Content-Type: {r.headers.get('Content-Type', 'N/A')}")
-        logger.info(f"OJApi: Response length: {len(r.text)} bytes")
+        headers = self._public_headers
+        
+        with self._detail_cache_lock:
+            cached = self._detail_cache.get(original_id)
+        if cached:
+            etag, stored_at, problem = cached
+            if etag:
+                headers = {**headers, "If-None-Match": etag}
+            elif time.monotonic() - stored_at < _DETAIL_CACHE_TTL:
+                return copy.deepcopy(problem)
+        
+        r = self.session.get(url, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
+        
+        # 单条汇总日志；长度取 len(r.content)，避免为记录日志解码整个响应
+        logger.opt(lazy=True).debug(
+            "OJApi: 题目详情 {} ← {} HTTP {}, Content-Type: {}, {} bytes",
+            lambda: original_id, lambda: url, lambda: r.status_code,
+            lambda: r.headers.get('Content-Type', 'N/A'), lambda: len(r.content),
+        )
+        if r.status_code == 304 and cached:
+            self._store_detail(original_id, cached[0], cached[2])
+            return copy.deepcopy(cached[2])
         if r.status_code != 200:
             logger.error(f"OJApi: Response preview: {r.text[:500]}")
             raise RuntimeError(f"获取题目详情失败: HTTP {r.status_code} – {r.text[:200]}")
         
-        logger.debug(f"OJApi: Response preview: {r.text[:200]}")
-        data = r.json()
+        data = _loads(r)
         
         if data.get("code") not in (0, 200):
             raise RuntimeError(f"API错误: {data.get('message') or data.get('msg', 'unknown error')}")
-        return data.get("data", {}).get("problem", {})
+        problem = data.get("data", {}).get("problem", {})
+        self._store_detail(original_id, r.headers.get("ETag", ""), problem)
+        return copy.deepcopy(problem)
+
+    def _store_detail(self, original_id: str, etag: str, problem: Dict[str, Any]) -> None:
+        """写入题目详情缓存（超出容量时淘汰最早写入的条目）"""
+        with self._detail_cache_lock:
+            self._detail_cache.pop(original_id, None)
+            self._detail_cache[original_id] = (etag, time.monotonic(), problem)
+            while len(self._detail_cache) > _DETAIL_CACHE_MAXSIZE:
+                self._detail_cache.pop(next(iter(self._detail_cache)))
 
     def upload_testcase_zip(self, auth: OJAuth, zip_path: str, mode: str = "default") -> Dict[str, Any]:
         """上传测试数据ZIP包（对应upload.py的do_upload）"""
         url = f"{self.api_base_url}/api/file/upload-testcase-zip?mode={mode}"
         
-        # 读取文件数据
-        with open(zip_path, "rb") as f:
-            file_data = f.read()
-        
-        filename = os.path.basename(zip_path)
-        
-        # 构建WebKit风格的multipart/form-data（完全按照原始脚本）
-        boundary = "----WebKitFormBoundary%08x%08x" % (int(time.time()) & 0xFFFFFFFF, os.getpid() & 0xFFFFFFFF)
-        file_ct = "application/x-zip-compressed"
-        crlf = "\r\n"
-        
-        # 构建multipart body
-        lines = []
-        lines.append(f"--{boundary}")
-        lines.append(f'Content-Disposition: form-data; name="file"; filename="{filename}"')
-        lines.append(f"Content-Type: {file_ct}")
-        lines.append("")
-        
-        body_head = crlf.join(lines).encode("utf-8") + crlf.encode("utf-8")
-        body_tail = (crlf + f"--{boundary}--" + crlf).encode("utf-8")
-        body = body_head + file_data + body_tail
-        
-        headers = {
-            "Content-Type": f"multipart/form-data; boundary={boundary}",
-            "Content-Length": str(len(body)),
-            "Accept": "*/*",
-            "Origin": self.base_url.replace("-api", ""),
-            "Referer": self.base_url.replace("-api", "") + "/",
-            "User-Agent": "Mozilla/5.0",
-            "authorization": auth.token,
-            "url-type": "general",
-        }
+        # 流式构建WebKit风格的multipart/form-data（格式与原始脚本一致，不整体读入内存）
+        with MultipartFileStream(zip_path) as body:
+            headers = {**self._upload_headers, "Content-Type": body.content_type, "authorization": auth.token}
+            # stream=True：出错时不下载响应体（nginx 413/502 错误页可能很大）
+            with auth.session.post(url, data=body, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl, stream=True) as r:
+                if r.status_code != 200:
+                    raise RuntimeError(f"Upload failed: HTTP {r.status_code} {r.reason}")
+                json_resp = _loads(r)
         
-        r = auth.session.post(url, data=body, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
-        
-        if r.status_code != 200:
-            raise RuntimeError(f"Upload failed: HTTP {r.status_code} {r.reason}")
-        
-        json_resp = r.json()
         if json_resp.get("code") not in (0, 200):
             raise RuntimeError(f"Upload returned error: {json_resp}")
         
@@ -239,19 +305,15 @@ class OJApi:
     def fetch_admin_problem(self, auth: OJAuth, pid: int) -> Dict[str, Any]:
         """获取题目配置（对应upload.py的fetch_problem）"""
         url = f"{self.api_base_url}/api/admin/problem?pid={pid}"
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "authorization": auth.token,
-            "url-type": "general",
-            "User-Agent": "Mozilla/5.0",
-        }
+        headers = {**self._admin_get_headers, "authorization": auth.token}
         
         try:
-            r = auth.session.get(url, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
-            if r.status_code != 200:
-                logger.warning(f"获取题目{pid}失败: HTTP {r.status_code} {r.reason}")
-                return {}
-            json_resp = r.json()
+            # with 块退出即关闭响应并归还连接；只保留 data 子字典，不持有整个 Response
+            with auth.session.get(url, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl, stream=True) as r:
+                if r.status_code != 200:
+                    logger.warning(f"获取题目{pid}失败: HTTP {r.status_code} {r.reason}")
+                    return {}
+                json_resp = _loads(r)
             return json_resp.get("data", {})
         except Exception as e:
             logger.warning(f"获取题目{pid}异常: {e}")
@@ -260,18 +322,13 @@ class OJApi:
     def fetch_problem_cases(self, auth: OJAuth, pid: int) -> List[Dict[str, Any]]:
         """触发服务器解析测试用例（对应upload.py的fetch_problem_cases）"""
         url = f"{self.api_base_url}/api/admin/problem/get-problem-cases?pid={pid}&isUpload=true"
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "authorization": auth.token,
-            "url-type": "general",
-            "User-Agent": "Mozilla/5.0",
-        }
+        headers = {**self._admin_get_headers, "authorization": auth.token}
         
         try:
-            r = auth.session.get(url, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
-            if r.status_code != 200:
-                return []
-            json_resp = r.json()
+            with auth.session.get(url, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl, stream=True) as r:
+                if r.status_code != 200:
+                    return []
+                json_resp = _loads(r)
             return json_resp.get("data", []) or []
         except Exception:
             return []
@@ -279,51 +336,33 @@ class OJApi:
     def put_admin_problem(self, auth: OJAuth, payload: Dict[str, Any]) -> Dict[str, Any]:
         """更新题目配置（对应upload.py的do_update）"""
         url = f"{self.api_base_url}/api/admin/problem"
-        data_bytes = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        data_bytes = fast_json.dumps(payload)
+        headers = {**self._admin_json_headers, "authorization": auth.token}
         
-        headers = {
-            "Content-Type": "application/json;charset=UTF-8",
-            "Accept": "application/json, text/plain, */*",
-            "authorization": auth.token,
-            "url-type": "general",
-            "Origin": self.base_url.replace("-api", ""),
-            "Referer": self.base_url.replace("-api", "") + "/",
-            "User-Agent": "Mozilla/5.0",
-        }
-        
-        r = auth.session.put(url, data=data_bytes, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
-        
-        if r.status_code != 200:
-            # 尽量把后端返回的错误信息暴露出来，方便定位（例如缺少某个必需字段）
-            detail = ""
-            try:
-                # 优先尝试解析JSON
-                obj = r.json()
-                msg = obj.get("message") or obj.get("msg") or ""
-                code = obj.get("code")
-                detail = f", code={code}, msg={msg}"
-            except Exception:
-                # 回退到原始文本
+        with auth.session.put(url, data=data_bytes, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl, stream=True) as r:
+            if r.status_code != 200:
+                # 尽量把后端返回的错误信息暴露出来，方便定位（例如缺少某个必需字段）
+                # 只读取有限长度的响应体，避免大错误页占用内存
+                preview = _read_preview(r)
+                detail = ""
                 try:
-                    text_preview = r.text[:500]
-                    detail = f", body={text_preview}"
+                    # 优先尝试解析JSON
+                    obj = fast_json.loads(preview)
+                    msg = obj.get("message") or obj.get("msg") or ""
+                    code = obj.get("code")
+                    detail = f", code={code}, msg={msg}"
                 except Exception:
-                    detail = ""
-            raise RuntimeError(f"Update failed: HTTP {r.status_code} {r.reason}{detail}")
-        
-        return r.json()
+                    # 回退到原始文本
+                    if preview:
+                        detail = f", body={preview[:500]}"
+                raise RuntimeError(f"Update failed: HTTP {r.status_code} {r.reason}{detail}")
+            
+            return _loads(r)
 
     def submit_problem_judge(self, auth: OJAuth, original_id: str, code: str, language: str = "C++") -> int:
         """提交代码判题（对应solve.py的submit_code）"""
         url = f"{self.api_base_url}/api/submit-problem-judge"
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "Content-Type": "application/json;charset=UTF-8",
-            "Origin": self.base_url.replace("-api", ""),
-            "Referer": self.base_url.replace("-api", "") + "/",
-            "Url-Type": "general",
-            "User-Agent": "Mozilla/5.0 (compatible; ojo_batch_tool/1.0)",
-        }
+        headers = self._json_headers
         payload = {
             "pid": str(original_id),
             "language": language,
@@ -337,7 +376,7 @@ class OJApi:
         r = auth.session.post(
             url, 
             headers=headers, 
-            data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+            data=fast_json.dumps(payload),
             timeout=self.timeout, 
             proxies=self.proxies, 
             verify=self.verify_ssl
@@ -346,7 +385,7 @@ class OJApi:
         if r.status_code != 200:
             raise RuntimeError(f"提交代码失败: HTTP {r.status_code} – {r.text.strip()}")
         
-        data = r.json()
+        data = _loads(r)
         if data.get("code") != 0:
             raise RuntimeError(f"提交API错误: {data.get('message') or data.get('msg', 'unknown error')}")
         
@@ -359,20 +398,14 @@ class OJApi:
     def get_submission_detail(self, auth: OJAuth, submit_id: int) -> Dict[str, Any]:
         """轮询提交详情（对应solve.py的poll_submission_detail）"""
         url = f"{self.api_base_url}/api/get-submission-detail?submitId={submit_id}"
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "User-Agent": "Mozilla/5.0 (compatible; ojo_batch_tool/1.0)",
-            "Url-Type": "general",
-            "Origin": self.base_url.replace("-api", ""),
-            "Referer": self.base_url.replace("-api", "") + "/",
-        }
+        headers = self._get_headers
         
         r = auth.session.get(url, headers=headers, timeout=self.timeout, proxies=self.proxies, verify=self.verify_ssl)
         
         if r.status_code != 200:
             raise RuntimeError(f"获取提交详情失败: HTTP {r.status_code} – {r.text.strip()}")
         
-        data = r.json()
+        data = _loads(r)
         if data.get("code") != 0:
             raise RuntimeError(f"提交详情API错误: {data.get('message') or data.get('msg', 'unknown error')}")
         
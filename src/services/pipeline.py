@@ -12,15 +12,20 @@ Pipeline v8.0 - 架构重构版
 """
 from __future__ import annotations
 
+import csv
+import os
+import queue
+import re
 import time
-import json
 import random
+import stat
 import threading
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Callable, Any, Tuple
+from typing import Deque, Dict, List, Optional, Callable, Any, Set, Tuple
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 from loguru import logger
@@ -45,15 +50,174 @@ from services.logger import configure_logger
 from services.image_service import ImageService
 from services.validation_service import ValidationService, ValidationConfig
 from services.problem_data_manager import ProblemDataManager
-from services.problem_id import get_problem_id_resolver, ProblemIdResolver
+from services.problem_id import get_problem_id_resolver, ProblemIdResolver, _resolve_workspace_base
 from services.user_context import get_user_context, UserContext
+from services.concurrency_manager import get_concurrency_manager
 
 # 工具模块
-from utils.concurrency import SemaphorePool, CancelToken
+from utils.concurrency import SemaphorePool, CancelToken, TokenBucket, RateLimitedError, clamp_retry_after
+from utils import fast_json
 from utils.text import sanitize_filename
 
+# 日志热路径使用的时间函数（模块级绑定，省去每次调用的属性查找）
+_now = datetime.now
+_mono_ns = time.monotonic_ns
+_wall = time.time
+_rand = random.random  # 重试抖动用，避免 random.uniform 的额外开销
 
-@dataclass
+# 日志行时间戳 "HH:MM:SS" 按秒缓存：同一秒内的日志复用格式化结果，strftime 每秒最多一次
+_clock_cache: Tuple[int, str] = (-1, "")
+
+
+def _clock_str() -> str:
+    global _clock_cache
+    sec = int(_wall())
+    cached_sec, text = _clock_cache
+    if sec != cached_sec:
+        text = time.strftime('%H:%M:%S', time.localtime(sec))
+        _clock_cache = (sec, text)
+    return text
+
+# pipeline.log 以原始描述符追加写入（无 writev 的平台回退为单次 write）
+_LOG_OPEN_FLAGS = (
+    os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+)
+_HAS_WRITEV = hasattr(os, "writev")
+_IOV_MAX = 1024
+
+def _count_tests(pdir: Path) -> int:
+    """统计 tests/ 下的 .in 测试点数量（一次 scandir，目录不存在返回 0）"""
+    try:
+        with os.scandir(pdir / "tests") as it:
+            return sum(1 for e in it if e.name.endswith(".in") and e.is_file(follow_symlinks=False))
+    except (FileNotFoundError, NotADirectoryError):
+        return 0
+
+
+def _probe_solution(pdir: Path) -> Optional[int]:
+    """检查本地验题条件：solution.cpp 存在且 tests/ 为目录时返回代码文件大小，否则返回 None
+
+    每个文件只 stat 一次，同时确认存在性与获取大小。
+    """
+    try:
+        cpp_size = os.stat(pdir / "solution.cpp").st_size
+        if not stat.S_ISDIR(os.stat(pdir / "tests").st_mode):
+            return None
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return cpp_size
+
+
+# 重试等待分类：瞬时错误（超时/5xx/429/限流）、确定性错误（重试前等待无意义）、普通 4xx
+# 状态码只在 HTTP 上下文中识别，避免把行号、通过数等数字误判为状态码
+_TRANSIENT_ERR_RE = re.compile(
+    r"(?:HTTP|status|响应码)\s*[=: ]?\s*(?:429|5\d\d)\b"
+    r"|timed? ?out|timeout|超时|频率|rate.?limit|connection|连接",
+    re.IGNORECASE,
+)
+_CLIENT_ERR_RE = re.compile(r"(?:HTTP|status|响应码)\s*[=: ]?\s*4\d\d\b", re.IGNORECASE)
+# 只匹配本地产生的确定性失败：编译错误、本地验题失败、本地文件缺失
+_DETERMINISTIC_ERR_RE = re.compile(
+    r"\bCE\b|compil(?:e|ation) error|编译(?:错误|失败)|验题失败|validation failed"
+    r"|文件(?:缺失|不存在)|未生成 zip|no such file or directory",
+    re.IGNORECASE,
+)
+
+
+def _backoff_for(error_text: str, attempt: int, fallback: Optional[float] = None) -> float:
+    """根据错误类型计算重试前的等待秒数
+
+    - 超时 / HTTP 5xx / 429 / 限流：30s ± 1.5s 抖动（优先判断，避免打爆服务端）
+    - 编译错误、本地验题失败、本地文件缺失等确定性错误：0（立即重试）
+    - 其他 HTTP 4xx：5 * attempt
+    - 无法归类：fallback（未指定时按瞬时错误处理）
+    """
+    text = error_text or ""
+    if _TRANSIENT_ERR_RE.search(text):
+        return 30 + (_rand() * 3.0 - 1.5)
+    if _DETERMINISTIC_ERR_RE.search(text):
+        return 0.0
+    if _CLIENT_ERR_RE.search(text):
+        return 5.0 * attempt
+    if fallback is not None:
+        return fallback
+    return 30 + (_rand() * 3.0 - 1.5)
+
+
+# 求解异常重试的指数退避参数：错误类别 -> (base 秒, cap 秒)
+_RETRY_WAIT_PARAMS: Dict[str, Tuple[float, float]] = {
+    "auth_expired": (1.0, 8.0),
+    "rate_limit": (30.0, 120.0),
+    "not_exist": (10.0, 60.0),
+    "other": (5.0, 30.0),
+}
+
+
+def _compute_retry_wait(error_class: str, attempt: int) -> float:
+    """指数退避 + full jitter：min(cap, base * 2**(attempt-1)) * U(0.5, 1.0)"""
+    base, cap = _RETRY_WAIT_PARAMS.get(error_class, _RETRY_WAIT_PARAMS["other"])
+    return min(cap, base * 2 ** (attempt - 1)) * (0.5 + 0.5 * _rand())
+
+
+# 求解异常分类（一次扫描）：认证失效 > 频率限制 > 题目不存在
+_SOLVE_ERR_RE = re.compile(
+    r"(?P<auth_expired>401|登录状态已失效|登录失效|请重新登录|token.*expired|expired.*token)"
+    r"|(?P<rate_limit>频率|频繁|403|429)"
+    r"|(?P<not_exist>不存在)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _iter_exc_chain(exc: Optional[BaseException]):
+    """依次产出异常及其 __cause__ / __context__ 链上的异常（防环）"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def _classify_solve_error(error_msg: str, exc: Optional[BaseException] = None) -> str:
+    """返回错误类别（_RETRY_WAIT_PARAMS 的键）：auth_expired / rate_limit / not_exist / other
+
+    异常链上有 RateLimitedError 时直接判为频率限制（如 HTTP 503 + Retry-After），不依赖错误信息措辞。
+    """
+    if any(isinstance(e, RateLimitedError) for e in _iter_exc_chain(exc)):
+        return "rate_limit"
+    found = set()
+    for m in _SOLVE_ERR_RE.finditer(error_msg):
+        if m.lastgroup == "auth_expired":
+            return "auth_expired"
+        found.add(m.lastgroup)
+    if "rate_limit" in found:
+        return "rate_limit"
+    if "not_exist" in found:
+        return "not_exist"
+    return "other"
+
+
+# 错误信息中的服务端等待提示，如 "建议等待 30 秒"、"Retry-After: 30"
+_RETRY_AFTER_RE = re.compile(r"(\d+(?:\.\d+)?)\s*秒|retry[- ]after[:\s]+(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def _server_retry_after(exc: BaseException, error_msg: str) -> Optional[float]:
+    """提取服务端建议的等待秒数：优先异常链上的 retry_after 属性，其次解析错误信息
+
+    结果限制在 MAX_RETRY_AFTER 以内，非有限值视为没有建议。
+    """
+    for e in _iter_exc_chain(exc):
+        retry_after = getattr(e, "retry_after", None)
+        if retry_after:
+            retry_after = clamp_retry_after(float(retry_after))
+            return retry_after or None
+    m = _RETRY_AFTER_RE.search(error_msg or "")
+    if m:
+        return clamp_retry_after(float(m.group(1) or m.group(2)))
+    return None
+
+
+@dataclass(slots=True)
 class TaskResult:
     """任务执行结果"""
     original_id: str
@@ -89,6 +253,7 @@ class ServiceContainer:
         self._image_service = None
         self._validation_service = None
         self._solution_searcher = None
+        self._generator: Optional[GeneratorService] = None
     
     @property
     def llm_factory(self) -> LLMFactory:
@@ -156,8 +321,19 @@ class ServiceContainer:
             )
         return self._solution_searcher
     
+    @property
+    def generator(self) -> GeneratorService:
+        """生成器服务（懒加载，任务间共享）
+        
+        GeneratorService 构造后不再修改自身状态，任务相关数据都通过方法参数传入，
+        可以安全地在并发任务间复用。
+        """
+        if self._generator is None:
+            self._generator = self.create_generator()
+        return self._generator
+    
     def create_generator(self) -> GeneratorService:
-        """创建生成器服务（每个任务可能需要独立实例）
+        """创建新的生成器服务实例
         
         NOTE: OCR 客户端是可选的，如果未配置硅基流动 API Key，
         OCR 功能不可用，但不会阻塞数据生成流程。
@@ -184,7 +360,8 @@ class PipelineRunner:
                  table_cb: Optional[Callable] = None, 
                  log_cb: Optional[Callable] = None,
                  user_id: Optional[int] = None,
-                 fetch_adapter_override: Optional[str] = None):
+                 fetch_adapter_override: Optional[str] = None,
+                 task_id: Optional[str] = None):
         """初始化 Pipeline 执行器
         
         Args:
@@ -193,36 +370,81 @@ class PipelineRunner:
             log_cb: 日志回调
             user_id: 用户ID
             fetch_adapter_override: 拉取适配器覆盖（优先于全局配置）
+            task_id: 所属任务ID（用于事件推送和数据库阶段同步）
         """
         self.cfg_mgr = cfg_mgr
         self.table_cb = table_cb or (lambda *a, **k: None)
         self.log_cb = log_cb or (lambda *a, **k: None)
         self.cancel = CancelToken()
         self.gui_signals = None
+        self._emit_status = self._emit_status_basic  # 设置 GUI 信号后切换为 _emit_status_with_gui
+        self._last_status: Dict[int, Dict[str, str]] = {}  # row -> 已发送的状态（去重用）
         self.per_logs: Dict[str, List[str]] = {}
         self.user_id = user_id
+        self.task_id = task_id
         
         # 拉取适配器覆盖（任务级别，优先于全局配置）
         self._fetch_adapter_override = fetch_adapter_override
         
+        # 模块适配器设置（初始化时解析一次，适配器获取时只做字典读取）
+        adapter_settings = getattr(cfg_mgr.cfg, "module_adapter_settings", {}) or {}
+        fetch_settings = adapter_settings.get("fetch", {}) or {}
+        self._fetch_mode: str = fetch_settings.get("mode", "auto")
+        self._fetch_fallback: Optional[str] = fetch_settings.get("fallback")
+        self._fetch_adapter_name: Optional[str] = fetch_settings.get("adapter")
+        self._upload_adapter_name: Optional[str] = (adapter_settings.get("upload", {}) or {}).get("adapter")
+        self._submit_adapter_name: Optional[str] = (adapter_settings.get("submit", {}) or {}).get("adapter")
+        
+        # 工作区基础目录（只解析一次，避免每条日志都 stat /app/workspace）
+        self._workspace_base: Path = self._resolve_workspace_base()
+        
         # 外部取消检查回调（由 TaskService 设置）
         self._cancellation_check: Optional[Callable[[], bool]] = None
         
-        # 任务执行状态跟踪（用于事件推送）
-        self._current_task_id: Optional[str] = None
-        self._current_stage: Optional[str] = None
-        self._current_progress: int = 0
+        # 各题目当前所处阶段（用于事件推送；按 pid 区分，任何线程发送事件都能取到该题目自己的阶段）
+        self._pid_stage: Dict[str, str] = {}
         
         # 日志批量处理（避免高频日志阻塞前端，同时保证用户体验）
-        self._log_batch_buffer: Dict[str, List[str]] = {}  # pid -> [log_lines]
-        self._log_batch_last_flush: Dict[str, float] = {}  # pid -> last_flush_time
+        self._log_batch_buffer: Dict[str, Deque[str]] = defaultdict(deque)  # pid -> [log_lines]
+        self._log_batch_last_flush: Dict[str, int] = {}  # pid -> last_flush_time (monotonic ns)
         self._log_batch_interval = 0.2  # 批量发送间隔（秒）
+        self._log_batch_interval_ns = int(self._log_batch_interval * 1e9)
+        self._log_drain_lock = threading.Lock()  # 保护缓冲区的取出操作（append 无需加锁）
+        # 日志事件中不随每批变化的字段：stage -> 模板（只增不改，线程安全）
+        self._event_data_cache: Dict[str, Dict[str, Any]] = {}
+        
+        # 定时汇总线程：每个间隔把所有题目的待发日志合并为一个事件（在 run() 中启停）
+        self._log_flusher_stop = threading.Event()
+        self._log_flusher_thread: Optional[threading.Thread] = None
         self._log_batch_max_size = 20  # 达到此数量立即发送
         
         # 文件写入缓冲区（减少 I/O）
-        self._file_write_buffer: Dict[str, List[str]] = {}  # pid -> [log_lines]
-        self._file_write_last_flush: Dict[str, float] = {}  # pid -> last_flush_time
+        self._file_write_buffer: Dict[str, Deque[str]] = defaultdict(deque)  # pid -> [log_lines]
+        self._file_write_last_flush: Dict[str, int] = {}  # pid -> last_flush_time (monotonic ns)
         self._file_write_interval = 1.0  # 文件写入间隔（秒）
+        self._file_write_interval_ns = int(self._file_write_interval * 1e9)
+        self._log_file_fds: Dict[str, int] = {}  # pid -> 常驻的追加写文件描述符
+        self._log_active_pids: Set[str] = set()  # 任务执行中的题目（只有这些题目常驻描述符）
+        self._log_file_lock = threading.Lock()  # 保护描述符的打开/写入/关闭，避免写入已关闭（被复用）的描述符
+        # 任务收尾的日志发送与写盘交给单独线程，工作线程可立即处理下一题（在 run() 中启停）
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        
+        # 按题目缓存的查找结果
+        self._canonical_cache: Dict[str, str] = {}  # pid -> 规范化ID
+        self._log_file_cache: Dict[str, Path] = {}  # pid -> pipeline.log 路径
+        self._adapter_cache: Dict[str, Any] = {}  # pid -> 拉取适配器
+        self._adapter_urlinfo_cache: Dict[str, Tuple[str, str, str]] = {}  # 适配器名 -> (base_url, domain, url_prefix)
+        self._title_search_cache: Dict[Tuple[str, str], Tuple[int, Optional[str]]] = {}  # (适配器, 标题) -> (时间, 远端ID)
+        self._verify_cache: Dict[Tuple[str, str, str], Tuple[int, bool]] = {}  # (适配器, real_id, 标题) -> (时间, 结果)
+        self._pdm_cache: Dict[Path, Dict[str, Any]] = {}  # 题目目录 -> 已解析的 problem_data.json（任务内有效）
+        self._pdm_pending: Dict[Path, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        
+        # 上传/求解服务实例（构造后无可变状态，跨题目和重试复用）
+        self._upload_services: Dict[str, UploadService] = {}  # 适配器名 -> UploadService
+        self._solve_service: Optional[SolveService] = None
+        
+        # 求解重试令牌桶（按提交适配器隔离）：频繁限流时本地放弃重试
+        self._submit_buckets: Dict[str, TokenBucket] = {}
         
         # 关键日志模式（这些日志立即发送，不限流）
         self._critical_log_patterns = [
@@ -237,9 +459,11 @@ class PipelineRunner:
             "任务已取消",
             "执行失败",
         ]
+        self._critical_re = re.compile("|".join(re.escape(p) for p in self._critical_log_patterns))
         
         # 配置日志
         configure_logger(cfg_mgr.cfg.log_level)
+        self._debug_enabled = (cfg_mgr.cfg.log_level or "INFO").upper() in ("TRACE", "DEBUG")
         
         # 核心组件
         self.event_bus: EventBus = get_event_bus()
@@ -273,19 +497,29 @@ class PipelineRunner:
         
         logger.info(f"Pipeline v8.0 初始化完成 (user_id={self.user_id})")
     
+    _ADAPTER_NAMES = ('shsoj', 'hydrooj', 'codeforces', 'luogu', 'atcoder', 'aicoders', 'manual')
+    
     def _initialize_adapters(self):
-        """初始化所有适配器（传递 user_id 用于用户配置隔离）"""
-        for name in ['shsoj', 'hydrooj', 'codeforces', 'luogu', 'atcoder', 'aicoders', 'manual']:
-            try:
-                adapter = self.registry.get_adapter(name)
-                if adapter and hasattr(adapter, 'initialize'):
-                    # 传递 user_id 到适配器 context，用于读取用户配置
-                    adapter.initialize({
-                        'config_manager': self.cfg_mgr,
-                        'user_id': self.user_id  # 用户配置隔离
-                    })
-            except Exception as e:
-                logger.debug(f"适配器初始化跳过 {name}: {e}")
+        """并发初始化所有适配器（传递 user_id 用于用户配置隔离）
+        
+        各适配器互相独立，总耗时取决于最慢的一个而不是全部之和。
+        """
+        with ThreadPoolExecutor(max_workers=len(self._ADAPTER_NAMES),
+                                thread_name_prefix="adapter-init") as executor:
+            list(executor.map(self._init_one_adapter, self._ADAPTER_NAMES))
+    
+    def _init_one_adapter(self, name: str):
+        """初始化单个适配器（失败只记录日志）"""
+        try:
+            adapter = self.registry.get_adapter(name)
+            if adapter and hasattr(adapter, 'initialize'):
+                # 传递 user_id 到适配器 context，用于读取用户配置
+                adapter.initialize({
+                    'config_manager': self.cfg_mgr,
+                    'user_id': self.user_id  # 用户配置隔离
+                })
+        except Exception as e:
+            logger.debug(f"适配器初始化跳过 {name}: {e}")
     
     @property
     def services(self) -> ServiceContainer:
@@ -302,27 +536,18 @@ class PipelineRunner:
     # ==================== 工作区路径 ====================
     
     def _get_workspace_base(self) -> Path:
-        """获取工作区基础目录（支持环境变量）"""
-        import os
-        # 优先使用环境变量，其次使用 /app/workspace（Docker），最后使用当前目录
-        workspace_base = os.getenv("OJO_WORKSPACE")
-        if not workspace_base:
-            docker_workspace = Path("/app/workspace")
-            if docker_workspace.exists():
-                workspace_base = str(docker_workspace)
-            else:
-                workspace_base = "workspace"
-        
-        base_path = Path(workspace_base)
+        """获取工作区基础目录（初始化时解析一次）"""
+        return self._workspace_base
+    
+    def _resolve_workspace_base(self) -> Path:
+        """解析工作区基础目录（规则与 ProblemIdResolver 共用，见 problem_id._resolve_workspace_base）"""
+        base_path = _resolve_workspace_base()
         if self.user_id:
             return base_path / f"user_{self.user_id}"
         return base_path
     
     def _problem_dir_for(self, pid: str) -> Path:
         """获取题目工作目录（带缓存）"""
-        if not hasattr(self, '_canonical_cache'):
-            self._canonical_cache = {}
-        
         if pid not in self._canonical_cache:
             self._canonical_cache[pid] = self.id_resolver.canonicalize(pid)
         
@@ -345,33 +570,133 @@ class PipelineRunner:
     def _mark_completed(self, pid: str, result: TaskResult):
         """标记题目为已完成"""
         pdir = self._problem_dir_for(pid)
-        ProblemDataManager.set_processing_status(pdir, {
+        status = {
             "stage": "completed",
             "ok_gen": result.ok_gen,
             "ok_upload": result.ok_upload,
             "ok_solve": result.ok_solve,
             "elapsed": result.elapsed,
             "completed_at": datetime.now().isoformat()
-        })
+        }
+        self._pdm_update_status(pdir, status)
+        self._pdm_flush(pdir)
     
     def _update_stage(self, pid: str, stage: str, **kwargs):
         """更新处理阶段"""
         pdir = self._problem_dir_for(pid)
         status = {"stage": stage}
         status.update(kwargs)
-        ProblemDataManager.set_processing_status(pdir, status)
+        # 纯状态变化只暂存，任务结束时统一写盘；有暂存的元数据修改时才随阶段切换写出，
+        # 保证后续阶段的服务（如求解读取 real_id）能从磁盘读到
+        self._pdm_update_status(pdir, status)
+        if self._pdm_pending_for(pdir)[0]:
+            self._pdm_flush(pdir)
         
-        # 更新当前阶段（用于事件推送）
-        self._current_stage = stage
+        # 更新题目当前阶段（用于事件推送）
+        self._pid_stage[pid] = stage
         
         # 同步更新数据库中的任务阶段
-        if self._current_task_id:
+        if self.task_id:
             try:
                 db = get_database()
-                db.update_task(self._current_task_id, stage=stage)
+                db.update_task(self.task_id, stage=stage)
             except Exception as e:
                 logger.debug(f"更新任务阶段到数据库失败: {e}")
     
+    def _get_or_make_uploader(self, upload_adapter) -> UploadService:
+        """获取上传服务（每个适配器一个实例）"""
+        uploader = self._upload_services.get(upload_adapter.name)
+        if uploader is None:
+            uploader = UploadService(upload_adapter, self.sems, log_callback=self._append_log)
+            self._upload_services[upload_adapter.name] = uploader
+        return uploader
+    
+    _SUBMIT_RETRY_COST = 1.0
+    _SUBMIT_RATE_LIMITED_RETRY_COST = 5.0
+    _SOLVE_MAX_AUTH_REFRESHES = 5
+    
+    def _get_submit_bucket(self, adapter_name: str) -> TokenBucket:
+        bucket = self._submit_buckets.get(adapter_name)
+        if bucket is None:
+            bucket = self._submit_buckets.setdefault(adapter_name, TokenBucket(capacity=10.0))
+        return bucket
+    
+    def _get_or_make_solver(self) -> SolveService:
+        """获取求解服务（提交适配器按调用传入，实例共享）"""
+        if self._solve_service is None:
+            self._solve_service = SolveService(
+                None, self.services.llm_solve,
+                self._get_workspace_base(), self.sems,
+                log_callback=self._append_log,
+                solution_searcher=self.services.solution_searcher,
+                summary_llm=self.services.llm_summary,
+                cancel_check=self.is_cancelled,
+                user_id=self.user_id  # 传递用户ID用于适配器配置隔离
+            )
+        return self._solve_service
+    
+    # ---------- 题目元数据任务内缓存 ----------
+    # 任务执行期间 problem_data.json 只解析一次；流水线自己的写入同步到缓存，
+    # 整体覆盖（save）时丢弃缓存。任务结束时清除。
+    # 流水线的修改先暂存在 _pdm_pending，在标记完成、任务结束（以及有元数据修改的
+    # 阶段切换）时合并到磁盘上的最新数据一次写出（不会覆盖其他服务写入的字段）。
+    
+    def _pdm_load(self, pdir: Path) -> Dict[str, Any]:
+        data = self._pdm_cache.get(pdir)
+        if data is None:
+            data = ProblemDataManager.load(pdir)
+            self._pdm_cache[pdir] = data
+        return data
+    
+    def _pdm_is_completed(self, pdir: Path) -> bool:
+        return ProblemDataManager.status_is_completed(self._pdm_load(pdir).get("_processing"))
+    
+    def _pdm_get_upload_real_id(self, pdir: Path, adapter_name: str) -> Optional[str]:
+        return self._pdm_load(pdir).get("upload_real_ids", {}).get(adapter_name)
+    
+    def _pdm_pending_for(self, pdir: Path) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """暂存的 (顶层字段更新, _processing 状态更新)"""
+        pending = self._pdm_pending.get(pdir)
+        if pending is None:
+            pending = self._pdm_pending[pdir] = ({}, {})
+        return pending
+    
+    def _pdm_set(self, pdir: Path, key: str, value: Any):
+        data = self._pdm_cache.get(pdir)
+        if data is not None:
+            data[key] = value
+        self._pdm_pending_for(pdir)[0][key] = value
+    
+    def _pdm_set_upload_real_id(self, pdir: Path, adapter_name: str, real_id: str):
+        ids = dict(self._pdm_load(pdir).get("upload_real_ids", {}))
+        ids[adapter_name] = real_id
+        self._pdm_set(pdir, "upload_real_ids", ids)
+    
+    def _pdm_set_upload_verify(self, pdir: Path, adapter_name: str, entry: Dict[str, Any]):
+        verify = dict(self._pdm_load(pdir).get("upload_verify", {}))
+        verify[adapter_name] = entry
+        self._pdm_set(pdir, "upload_verify", verify)
+    
+    def _pdm_update_status(self, pdir: Path, status: Dict[str, Any]):
+        data = self._pdm_cache.get(pdir)
+        if data is not None:
+            data.setdefault("_processing", {}).update(status)
+        self._pdm_pending_for(pdir)[1].update(status)
+    
+    def _pdm_flush(self, pdir: Path):
+        """把暂存的修改一次写入 problem_data.json"""
+        pending = self._pdm_pending.pop(pdir, None)
+        if pending and (pending[0] or pending[1]):
+            ProblemDataManager.update(pdir, pending[0], processing=pending[1])
+    
+    def _pdm_flush_all(self):
+        """写出所有题目尚未落盘的修改（流水线结束时的兜底）"""
+        for pdir in list(self._pdm_pending):
+            try:
+                self._pdm_flush(pdir)
+            except Exception as e:
+                logger.warning(f"写入题目数据失败 {pdir}: {e}")
+    
     # ==================== 日志系统 ====================
     
     def _append_log(self, msg: str):
@@ -382,11 +707,7 @@ class PipelineRunner:
         2. 普通日志（思考、代码片段）批量聚合后发送
         3. 文件写入使用缓冲区减少 I/O
         """
-        import time
-        from datetime import datetime
-        
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        log_line = f"[{timestamp}] {msg}"
+        log_line = f"[{_clock_str()}] {msg}"
         
         # 提取 pid
         pid = None
@@ -398,8 +719,9 @@ class PipelineRunner:
             self._buffer_file_write(pid, log_line)
         
         # 写入 loguru（不限制频率，但降低日志级别避免控制台刷屏）
-        if any(p in msg for p in ["[思考]", "[代码]"]):
-            logger.debug(msg)  # 流式日志降级为 debug
+        if "[思考]" in msg or "[代码]" in msg:
+            if self._debug_enabled:
+                logger.debug(msg)  # 流式日志降级为 debug
         else:
             logger.info(msg)
         
@@ -407,81 +729,160 @@ class PipelineRunner:
         if pid:
             self._buffer_log_event(pid, msg, log_line)
     
+    def _append_log_batch(self, msgs: List[str]):
+        """批量追加同一题目的多条日志
+        
+        与逐条调用 _append_log 的输出一致，但共用一个时间戳，
+        文件缓冲与事件缓冲各只写入一次、最多触发一次发送。
+        所有消息须带相同的 "[pid]" 前缀。
+        """
+        if not msgs:
+            return
+        first = msgs[0]
+        if not (first.startswith("[") and "]" in first):
+            for msg in msgs:
+                self._append_log(msg)
+            return
+        
+        pid = first.split("]")[0][1:]
+        ts = _clock_str()
+        log_lines = [f"[{ts}] {msg}" for msg in msgs]
+        self.per_logs.setdefault(pid, []).extend(log_lines)
+        self._buffer_file_write(pid, *log_lines)
+        
+        for msg in msgs:
+            logger.info(msg)
+        
+        is_critical = any(self._critical_re.search(msg) for msg in msgs)
+        self._enqueue_log_events(pid, log_lines, is_critical)
+    
     def _is_critical_log(self, msg: str) -> bool:
         """判断是否为关键日志（需要立即发送）"""
-        return any(pattern in msg for pattern in self._critical_log_patterns)
+        return self._critical_re.search(msg) is not None
     
-    def _buffer_file_write(self, pid: str, log_line: str):
+    def _buffer_file_write(self, pid: str, *log_lines: str):
         """缓冲文件写入（减少 I/O 操作）"""
-        import time
-        
         # 确保日志文件路径已缓存
-        if not hasattr(self, '_log_file_cache'):
-            self._log_file_cache = {}
-        
         if pid not in self._log_file_cache:
             pdir = self._problem_dir_for(pid)
             pdir.mkdir(parents=True, exist_ok=True)
             self._log_file_cache[pid] = pdir / "pipeline.log"
         
         # 添加到缓冲区
-        if pid not in self._file_write_buffer:
-            self._file_write_buffer[pid] = []
-            self._file_write_last_flush[pid] = time.time()
-        
-        self._file_write_buffer[pid].append(log_line)
-        
-        # 检查是否需要刷新文件
-        current_time = time.time()
-        elapsed = current_time - self._file_write_last_flush.get(pid, 0)
-        buffer_size = len(self._file_write_buffer[pid])
+        now = _mono_ns()
+        buf = self._file_write_buffer[pid]
+        buf.extend(log_lines)
+        last = self._file_write_last_flush.setdefault(pid, now)
         
         # 达到时间间隔或缓冲区满时写入文件
-        if elapsed >= self._file_write_interval or buffer_size >= 50:
+        if now - last >= self._file_write_interval_ns or len(buf) >= 50:
             self._flush_file_buffer(pid)
     
     def _flush_file_buffer(self, pid: str):
         """刷新文件写入缓冲区"""
-        import time
-        
-        if pid not in self._file_write_buffer or not self._file_write_buffer[pid]:
+        buf = self._file_write_buffer.get(pid)
+        if not buf:
             return
+        with self._log_file_lock:
+            self._write_file_buffer_locked(pid, buf)
+        self._file_write_last_flush[pid] = _mono_ns()
+    
+    def _write_file_buffer_locked(self, pid: str, buf: Deque[str]):
+        """把缓冲写入日志文件（调用方持有 _log_file_lock）
         
+        执行中的题目复用常驻描述符（首次写入时打开）；任务收尾之后才到达的日志
+        单次打开、写入后立即关闭，不遗留描述符。
+        """
+        lines = self._drain(buf)
+        if not lines:
+            return
+        fd = self._log_file_fds.get(pid)
+        if fd is None:
+            try:
+                fd = os.open(self._log_file_cache[pid], _LOG_OPEN_FLAGS, 0o644)
+            except OSError as e:
+                logger.warning(f"打开日志文件失败 {pid}，丢弃 {len(lines)} 行日志: {e}")
+                return
+            if pid in self._log_active_pids:
+                self._log_file_fds[pid] = fd
         try:
-            log_file = self._log_file_cache.get(pid)
-            if log_file:
-                with open(log_file, "a", encoding="utf-8") as f:
-                    f.write("\n".join(self._file_write_buffer[pid]) + "\n")
-        except Exception:
-            pass
-        
-        self._file_write_buffer[pid] = []
-        self._file_write_last_flush[pid] = time.time()
+            iov = [(line + "\n").encode("utf-8") for line in lines]
+            if _HAS_WRITEV and len(iov) <= _IOV_MAX:
+                os.writev(fd, iov)  # 一次系统调用写出整批
+            else:
+                os.write(fd, b"".join(iov))
+        except OSError as e:
+            logger.warning(f"写入日志文件失败 {pid}，丢弃 {len(lines)} 行日志: {e}")
+        finally:
+            if self._log_file_fds.get(pid) != fd:
+                os.close(fd)
+    
+    def _drain(self, buf: Deque[str]) -> List[str]:
+        """取出缓冲区中的全部日志（从左侧弹出，与其他线程的 append 互不干扰）"""
+        with self._log_drain_lock:
+            return [buf.popleft() for _ in range(len(buf))]
+    
+    def _open_task_log(self, pid: str):
+        """标记题目任务开始：执行期间日志文件描述符常驻"""
+        with self._log_file_lock:
+            self._log_active_pids.add(pid)
+    
+    def _close_log_file(self, pid: str):
+        """写出剩余缓冲并关闭题目的日志文件描述符（任务结束或取消时调用）"""
+        with self._log_file_lock:
+            self._log_active_pids.discard(pid)
+            buf = self._file_write_buffer.get(pid)
+            if buf:
+                self._write_file_buffer_locked(pid, buf)
+            fd = self._log_file_fds.pop(pid, None)
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError as e:
+                    logger.warning(f"关闭日志文件失败 {pid}: {e}")
+    
+    def _finalize_task_logs(self, pid: str):
+        """发送题目剩余的日志事件，写出缓冲并关闭日志文件"""
+        self._flush_log_events(pid)
+        self._close_log_file(pid)
+        self._pid_stage.pop(pid, None)
+    
+    def _finalize_async(self, pid: str):
+        """在收尾线程中执行 _finalize_task_logs（未运行 run() 时同步执行）"""
+        executor = self._io_executor
+        if executor is not None:
+            try:
+                executor.submit(self._finalize_task_logs, pid)
+                return
+            except RuntimeError:  # 执行器已关闭
+                pass
+        self._finalize_task_logs(pid)
+    
+    def _close_log_files(self):
+        """关闭所有日志文件描述符"""
+        with self._log_file_lock:
+            pids = set(self._log_file_fds) | self._log_active_pids
+        for pid in pids:
+            self._close_log_file(pid)
     
     def _buffer_log_event(self, pid: str, msg: str, log_line: str):
         """缓冲日志事件（智能批量发送）"""
-        import time
-        from datetime import datetime
-        
-        current_time = time.time()
-        is_critical = self._is_critical_log(msg)
-        
-        # 初始化缓冲区
-        if pid not in self._log_batch_buffer:
-            self._log_batch_buffer[pid] = []
-            self._log_batch_last_flush[pid] = current_time
+        self._enqueue_log_events(pid, (log_line,), self._is_critical_log(msg))
+    
+    def _enqueue_log_events(self, pid: str, log_lines, is_critical: bool):
+        """把若干日志行加入事件缓冲区，并按策略决定是否立即发送"""
+        now = _mono_ns()
         
         # 添加到缓冲区
-        self._log_batch_buffer[pid].append(log_line)
-        
-        # 检查是否需要发送
-        elapsed = current_time - self._log_batch_last_flush.get(pid, 0)
-        buffer_size = len(self._log_batch_buffer[pid])
+        buf = self._log_batch_buffer[pid]
+        buf.extend(log_lines)
+        last = self._log_batch_last_flush.setdefault(pid, now)
         
+        # 检查是否需要发送（汇总线程运行时由其负责按间隔发送）
         should_flush = (
             is_critical or  # 关键日志立即发送
-            elapsed >= self._log_batch_interval or  # 达到时间间隔
-            buffer_size >= self._log_batch_max_size  # 缓冲区满
+            len(buf) >= self._log_batch_max_size or  # 缓冲区满
+            (not self._log_flusher_running() and now - last >= self._log_batch_interval_ns)  # 达到时间间隔
         )
         
         if should_flush:
@@ -489,49 +890,123 @@ class PipelineRunner:
     
     def _flush_log_events(self, pid: str):
         """刷新日志事件缓冲区（批量发送到前端）"""
-        import time
-        from datetime import datetime
+        buf = self._log_batch_buffer.get(pid)
+        if not buf:
+            return
         
-        if pid not in self._log_batch_buffer or not self._log_batch_buffer[pid]:
+        logs = self._drain(buf)
+        if not logs:
             return
         
+        self._publish_log_event(pid, logs)
+        self._log_batch_last_flush[pid] = _mono_ns()
+        
+        # 同时刷新文件缓冲区
+        self._flush_file_buffer(pid)
+    
+    def _publish_log_event(self, pid: str, logs: List[str]):
+        """发送一个题目的批量日志事件"""
         try:
-            logs = self._log_batch_buffer[pid]
-            
-            # 发送批量日志事件
+            base = self._event_base(pid)
             self.event_bus.publish_sync(TaskEvent(
                 type=EventType.TASK_PROGRESS,
-                task_id=self._current_task_id or "",
+                task_id=base["task_id"],
                 problem_id=pid,
-                stage=self._current_stage or "processing",
-                progress=self._current_progress or 0,
-                message=logs[-1] if logs else "",  # 最后一条日志作为主消息
+                stage=base["stage"],
+                progress=base["progress"],
+                message=logs[-1],  # 最后一条日志作为主消息
                 data={
-                    "task_id": self._current_task_id or "",
+                    **base,
                     "problem_id": pid,
-                    "stage": self._current_stage or "processing",
-                    "progress": self._current_progress or 0,
                     "logs": logs,  # 批量日志
                     "log_count": len(logs),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": _now().isoformat()
                 }
             ))
         except Exception as e:
             logger.debug(f"刷新日志事件失败: {e}")
+    
+    def _event_base(self, pid: str) -> Dict[str, Any]:
+        """日志事件的公共字段（阶段相同时复用同一模板）
         
-        # 清空缓冲区
-        self._log_batch_buffer[pid] = []
-        self._log_batch_last_flush[pid] = time.time()
-        
-        # 同时刷新文件缓冲区
-        self._flush_file_buffer(pid)
+        阶段按 pid 查找，汇总线程、收尾线程发送的事件也带上该题目自己的阶段。
+        """
+        stage = self._pid_stage.get(pid, "processing")
+        template = self._event_data_cache.get(stage)
+        if template is None:
+            template = {"task_id": self.task_id or "", "stage": stage, "progress": 0}
+            self._event_data_cache[stage] = template
+        return template
+    
+    def _flush_all_log_events(self):
+        """发送所有题目的待发日志（每个题目一个事件，前端按 data.problem_id 归属）"""
+        for pid, buf in list(self._log_batch_buffer.items()):
+            if buf:
+                lines = self._drain(buf)
+                if lines:
+                    self._publish_log_event(pid, lines)
+                    self._log_batch_last_flush[pid] = _mono_ns()
     
-    def _emit_status(self, row: int, status: Dict[str, str], elapsed: Optional[float] = None):
-        """更新UI状态"""
+    def _log_flusher_loop(self):
+        """汇总线程主循环"""
+        while not self._log_flusher_stop.wait(self._log_batch_interval):
+            self._flush_all_log_events()
+    
+    def _log_flusher_running(self) -> bool:
+        thread = self._log_flusher_thread
+        return thread is not None and thread.is_alive()
+    
+    def _start_log_flusher(self):
+        """启动日志汇总线程"""
+        if self._log_flusher_running():
+            return
+        self._log_flusher_stop.clear()
+        self._log_flusher_thread = threading.Thread(
+            target=self._log_flusher_loop, name="pipeline-log-flusher", daemon=True
+        )
+        self._log_flusher_thread.start()
+    
+    def _stop_log_flusher(self):
+        """停止日志汇总线程并发送剩余日志"""
+        self._log_flusher_stop.set()
+        thread = self._log_flusher_thread
+        if thread is not None:
+            thread.join(timeout=2)
+            self._log_flusher_thread = None
+        self._flush_all_log_events()
+    
+    def set_gui_signals(self, signals: Any):
+        """设置 GUI 信号并切换状态更新实现"""
+        self.gui_signals = signals
+        self._emit_status = self._emit_status_with_gui if signals else self._emit_status_basic
+    
+    def _status_delta(self, row: int, status: Dict[str, str]) -> Dict[str, str]:
+        """返回与该行上次状态相比发生变化的字段，并记录新状态"""
+        last = self._last_status.get(row)
+        if last is None:
+            last = self._last_status[row] = {}
+        delta = {k: v for k, v in status.items() if last.get(k) != v}
+        last.update(delta)
+        return delta
+    
+    def _emit_status_basic(self, row: int, status: Dict[str, str], elapsed: Optional[float] = None):
+        """更新UI状态（仅表格回调，未变化的字段不重复发送）"""
+        status = self._status_delta(row, status)
+        if not status and elapsed is None:
+            return
         try:
             self.table_cb(row, status, elapsed)
-            if self.gui_signals:
-                self.gui_signals.taskUpdate.emit(row, {"status": status, "elapsed": elapsed or -1})
+        except Exception:
+            pass
+    
+    def _emit_status_with_gui(self, row: int, status: Dict[str, str], elapsed: Optional[float] = None):
+        """更新UI状态（表格回调 + GUI 信号，未变化的字段不重复发送）"""
+        status = self._status_delta(row, status)
+        if not status and elapsed is None:
+            return
+        try:
+            self.table_cb(row, status, elapsed)
+            self.gui_signals.taskUpdate.emit(row, {"status": status, "elapsed": elapsed or -1})
         except Exception:
             pass
     
@@ -546,9 +1021,6 @@ class PipelineRunner:
         3. 自动检测
         """
         # 缓存适配器查找结果
-        if not hasattr(self, '_adapter_cache'):
-            self._adapter_cache = {}
-        
         if pid in self._adapter_cache:
             return self._adapter_cache[pid]
         
@@ -562,19 +1034,16 @@ class PipelineRunner:
         
         # 2. 使用配置中的设置
         if not adapter:
-            settings = getattr(self.cfg_mgr.cfg, "module_adapter_settings", {}).get("fetch", {})
-            mode = settings.get("mode", "auto")
-            
-            if mode == "auto":
+            if self._fetch_mode == "auto":
                 adapter = self.registry.find_adapter_by_url(pid)
                 if not adapter:
-                    fallback = settings.get("fallback")
+                    fallback = self._fetch_fallback
                     if fallback:
                         adapter = self.registry.get_adapter(fallback)
                     else:
                         adapter = self.registry.get_default_adapter(OJCapability.FETCH_PROBLEM)
             else:
-                adapter = self.registry.get_adapter(settings.get("adapter"))
+                adapter = self.registry.get_adapter(self._fetch_adapter_name)
         
         # 对于 manual 适配器，设置用户隔离的工作区目录
         if adapter and adapter.name == "manual" and hasattr(adapter, 'set_workspace_dir'):
@@ -585,8 +1054,7 @@ class PipelineRunner:
     
     def _get_upload_adapter(self):
         """获取上传适配器（确保设置用户上下文）"""
-        settings = getattr(self.cfg_mgr.cfg, "module_adapter_settings", {}).get("upload", {})
-        name = settings.get("adapter")
+        name = self._upload_adapter_name
         if name:
             adapter = self.registry.get_adapter(name)
             if adapter:
@@ -598,8 +1066,7 @@ class PipelineRunner:
     
     def _get_submit_adapter(self):
         """获取提交适配器（确保设置用户上下文）"""
-        settings = getattr(self.cfg_mgr.cfg, "module_adapter_settings", {}).get("submit", {})
-        name = settings.get("adapter")
+        name = self._submit_adapter_name
         if name:
             adapter = self.registry.get_adapter(name)
             if adapter:
@@ -609,6 +1076,112 @@ class PipelineRunner:
             return adapter
         return None
     
+    def _get_adapter_urlinfo(self, adapter_name: str) -> Tuple[str, str, str]:
+        """获取用户适配器配置中的 (base_url, domain, url_prefix)（每个适配器只查一次数据库）
+        
+        url_prefix 形如 ``{base_url}/d/{domain}/p/``，直接拼接题目ID即为题目链接；
+        base_url 或 domain 未配置时为空字符串。
+        """
+        info = self._adapter_urlinfo_cache.get(adapter_name)
+        if info is None:
+            adapter_config = get_database().get_user_adapter_config(self.user_id, adapter_name) or {}
+            base_url = adapter_config.get("base_url", "")
+            domain = adapter_config.get("domain", "")
+            url_prefix = f"{base_url.rstrip('/')}/d/{domain}/p/" if base_url and domain else ""
+            info = (base_url, domain, url_prefix)
+            self._adapter_urlinfo_cache[adapter_name] = info
+        return info
+    
+    _TITLE_SEARCH_TTL_NS = 60 * 10**9
+    
+    @staticmethod
+    def _title_key(adapter_name: str, title: str) -> Tuple[str, str]:
+        return adapter_name, " ".join(title.split())
+    
+    def _search_title_cached(self, uploader, adapter_name: str, title: str, auth) -> Optional[str]:
+        """远端精确标题搜索（结果短时缓存，未找到也缓存）"""
+        key = self._title_key(adapter_name, title)
+        now = _mono_ns()
+        cached = self._title_search_cache.get(key)
+        if cached and now - cached[0] < self._TITLE_SEARCH_TTL_NS:
+            return cached[1]
+        existing_id = uploader._search_exact_title(title, auth)
+        self._title_search_cache[key] = (now, existing_id)
+        return existing_id
+    
+    def _invalidate_title_search(self, adapter_name: str, title: str):
+        """清除指定标题的搜索缓存（上传成功后调用）"""
+        if title:
+            self._title_search_cache.pop(self._title_key(adapter_name, title), None)
+    
+    _VERIFY_TTL_NS = 60 * 10**9
+    _VERIFY_SCAN_LIMIT = 512 * 1024
+    
+    def _verify_remote_title(self, session, url: str, title: str, cache_key: Tuple[str, str, str],
+                             pdir: Optional[Path] = None) -> bool:
+        """验证远端题目页面包含指定标题（结果短时缓存）
+        
+        先 HEAD 探测，404 直接判定不存在；否则流式 GET，找到标题即停止下载，
+        最多扫描 _VERIFY_SCAN_LIMIT 字节。
+        
+        传入 pdir 时，页面的 ETag/Last-Modified 与验证结果记录在 problem_data.json
+        的 upload_verify 中，下次运行发送条件请求，服务器返回 304 即沿用上次结果。
+        """
+        now = _mono_ns()
+        cached = self._verify_cache.get(cache_key)
+        if cached and now - cached[0] < self._VERIFY_TTL_NS:
+            return cached[1]
+        
+        adapter_name = cache_key[0]
+        saved = None
+        if pdir is not None:
+            saved = self._pdm_load(pdir).get("upload_verify", {}).get(adapter_name)
+            if not saved or saved.get("url") != url or saved.get("title") != title:
+                saved = None
+        
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        if saved:
+            if saved.get("etag"):
+                headers['If-None-Match'] = saved["etag"]
+            if saved.get("last_modified"):
+                headers['If-Modified-Since'] = saved["last_modified"]
+        
+        found = False
+        validators = None
+        head = session.head(url, timeout=5, headers=headers, allow_redirects=True)
+        if head.status_code == 304 and saved:
+            found = bool(saved.get("title_seen"))
+        elif head.status_code not in (404, 410):
+            needle = title.encode("utf-8")
+            keep = max(len(needle) - 1, 0)
+            with session.get(url, timeout=10, headers=headers, stream=True) as r:
+                if r.status_code == 304 and saved:
+                    found = bool(saved.get("title_seen"))
+                elif r.status_code == 200:
+                    window = b""
+                    scanned = 0
+                    for chunk in r.iter_content(64 * 1024):
+                        window = window[-keep:] + chunk if keep else chunk
+                        if needle in window:
+                            found = True
+                            break
+                        scanned += len(chunk)
+                        if scanned >= self._VERIFY_SCAN_LIMIT:
+                            break
+                    validators = (r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        
+        if pdir is not None and validators and any(validators):
+            self._pdm_set_upload_verify(pdir, adapter_name, {
+                "url": url,
+                "title": title,
+                "etag": validators[0],
+                "last_modified": validators[1],
+                "title_seen": found,
+            })
+        
+        self._verify_cache[cache_key] = (now, found)
+        return found
+    
     def _get_cached_auth(self, adapter_name: str):
         """获取缓存的认证（用户隔离）
         
@@ -648,19 +1221,32 @@ class PipelineRunner:
         """请求取消"""
         self.cancel.cancel()
     
+    def _interruptible_wait(self, seconds: float) -> bool:
+        """可取消的等待：request_cancel() 立即唤醒，外部取消回调按间隔检查；返回 False 表示已取消"""
+        return interruptible_sleep(seconds, self._cancellation_check, token=self.cancel)
+    
     def run(self, ids: List[str], modules: Dict[str, bool], 
             force_process_finished: bool = False,
             extra_settings: Optional[Dict] = None) -> List[TaskResult]:
         """批量执行任务"""
         try:
+            self._start_log_flusher()
+            self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-io")
             if not ids:
                 logger.warning("题目列表为空")
                 return []
             
+            # 批量预热规范化ID缓存，工作线程只走缓存路径
+            self._canonical_cache.update(self.id_resolver.bulk_canonicalize(ids))
+            
             # 过滤已完成的题目（除非强制处理）
             ids_to_process = ids
             if not force_process_finished:
-                ids_to_process = [pid for pid in ids if not self._is_completed(pid)]
+                dir_names = {pid: self._problem_dir_for(pid).name for pid in ids}
+                completed = ProblemDataManager.scan_completed(
+                    self._get_workspace_base(), dir_names.values()
+                )
+                ids_to_process = [pid for pid in ids if dir_names[pid] not in completed]
                 skipped = len(ids) - len(ids_to_process)
                 if skipped > 0:
                     logger.info(f"跳过 {skipped} 个已完成题目")
@@ -683,22 +1269,36 @@ class PipelineRunner:
             results: List[TaskResult] = []
             id_to_row = {pid: i for i, pid in enumerate(ids_to_process)}
             
-            # 并发执行
-            max_workers = self.cfg_mgr.cfg.max_workers
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {
-                    executor.submit(self._run_one_task, pid, modules, id_to_row[pid]): pid
-                    for pid in ids_to_process
-                }
-                
-                for future in as_completed(futures):
-                    pid = futures[future]
+            # 并发执行：有界队列 + 常驻工作线程（入队自然背压，不为每个题目创建 Future）
+            max_workers = max(1, self.cfg_mgr.cfg.max_workers)
+            task_queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=2 * max_workers)
+            results_lock = threading.Lock()
+            
+            def worker():
+                while True:
+                    pid = task_queue.get()
+                    if pid is None:
+                        return
                     try:
-                        result = future.result()
-                        results.append(result)
+                        result = self._run_one_task(pid, modules, id_to_row[pid])
                     except Exception as e:
                         logger.error(f"任务异常 {pid}: {e}")
-                        results.append(TaskResult(original_id=pid, extra={"error": str(e)}))
+                        result = TaskResult(original_id=pid, extra={"error": str(e)})
+                    with results_lock:
+                        results.append(result)
+            
+            workers = [
+                threading.Thread(target=worker, name=f"pipeline-worker-{i}", daemon=True)
+                for i in range(min(max_workers, len(ids_to_process)))
+            ]
+            for t in workers:
+                t.start()
+            for pid in ids_to_process:
+                task_queue.put(pid)
+            for _ in workers:
+                task_queue.put(None)
+            for t in workers:
+                t.join()
             
             # 生成汇总
             self._generate_summary(results)
@@ -713,6 +1313,13 @@ class PipelineRunner:
             
             return results
         finally:
+            # 完成或取消时等待收尾写盘完成、发送剩余日志，并关闭日志文件描述符
+            if self._io_executor is not None:
+                self._io_executor.shutdown(wait=True)
+                self._io_executor = None
+            self._pdm_flush_all()
+            self._stop_log_flusher()
+            self._close_log_files()
             # 确保用户上下文计数在任何情况下都会减少
             if self._user_context:
                 self._user_context.decrement_task()
@@ -722,23 +1329,25 @@ class PipelineRunner:
         start = time.time()
         result = TaskResult(original_id=pid)
         cfg = self.cfg_mgr.cfg
+        self._last_status.pop(row, None)  # 新任务（含单模块重试）重新发送全部状态
+        self._open_task_log(pid)
         
         try:
             self.per_logs[pid] = []
             self._append_log(f"[{pid}] ========== 开始执行 ==========")
             
             # 记录配置信息
-            self._append_log(f"[{pid}] 配置: 模块={modules}")
-            self._append_log(f"[{pid}] 配置: 生成温度={getattr(cfg, 'temperature_generation', 0.3)}, 求解温度={getattr(cfg, 'temperature_solution', 0.3)}")
-            self._append_log(f"[{pid}] 配置: 最大重试=3, 工作目录={self._problem_dir_for(pid)}")
+            self._append_log_batch([
+                f"[{pid}] 配置: 模块={modules}",
+                f"[{pid}] 配置: 生成温度={getattr(cfg, 'temperature_generation', 0.3)}, 求解温度={getattr(cfg, 'temperature_solution', 0.3)}",
+                f"[{pid}] 配置: 最大重试=3, 工作目录={self._problem_dir_for(pid)}",
+            ])
             
             self._emit_status(row, {"fetch": "进行中"})
             
             if self.is_cancelled():
                 self._append_log(f"[{pid}] 任务已取消")
                 self._emit_status(row, {"fetch": "已取消"})
-                self._flush_log_events(pid)
-                self._flush_file_buffer(pid)  # 确保日志写入文件
                 return result
             
             pdir = self._problem_dir_for(pid)
@@ -749,8 +1358,8 @@ class PipelineRunner:
                 self._update_stage(pid, "fetch")
                 
                 # 检查是否可以复用已有题面数据（必须是 AC 通过的）
-                existing_data = ProblemDataManager.load(pdir)
-                is_ac = ProblemDataManager.is_completed(pdir)  # ok_solve=True
+                existing_data, is_ac = ProblemDataManager.load_with_status(pdir)  # is_ac: ok_solve=True
+                self._pdm_cache[pdir] = existing_data
                 if existing_data and existing_data.get("title") and is_ac:
                     self._append_log(f"[{pid}] [FETCH] ✓ 复用已AC题面数据: {existing_data.get('title', 'N/A')}")
                     self._emit_status(row, {"fetch": "复用"})
@@ -779,6 +1388,7 @@ class PipelineRunner:
                         fetch_elapsed = time.time() - fetch_start
                         
                         ProblemDataManager.save(pdir, problem_data)
+                        self._pdm_cache.pop(pdir, None)
                         
                         # 详细记录题目信息
                         title = problem_data.get('title', 'N/A')
@@ -787,17 +1397,17 @@ class PipelineRunner:
                         content_len = len(problem_data.get('description', ''))
                         samples_count = len(problem_data.get('samples', []))
                         
-                        self._append_log(f"[{pid}] [FETCH] ✓ 题面获取成功 (耗时 {fetch_elapsed:.2f}s)")
-                        self._append_log(f"[{pid}] [FETCH]   标题: {title}")
-                        self._append_log(f"[{pid}] [FETCH]   时限: {time_limit}, 内存: {memory_limit}")
-                        self._append_log(f"[{pid}] [FETCH]   题面长度: {content_len} 字符, 样例数: {samples_count}")
+                        self._append_log_batch([
+                            f"[{pid}] [FETCH] ✓ 题面获取成功 (耗时 {fetch_elapsed:.2f}s)",
+                            f"[{pid}] [FETCH]   标题: {title}",
+                            f"[{pid}] [FETCH]   时限: {time_limit}, 内存: {memory_limit}",
+                            f"[{pid}] [FETCH]   题面长度: {content_len} 字符, 样例数: {samples_count}",
+                        ])
                         self._emit_status(row, {"fetch": "成功"})
                     except Exception as e:
                         if "不存在" in str(e) or "404" in str(e):
                             self._append_log(f"[{pid}] [FETCH] ✗ 题号不存在")
                             self._emit_status(row, {"fetch": "失败(不存在)"})
-                            self._flush_log_events(pid)
-                            self._flush_file_buffer(pid)  # 确保日志写入文件
                             return result
                         self._append_log(f"[{pid}] [FETCH] ✗ 拉取失败: {e}")
                         raise
@@ -808,17 +1418,14 @@ class PipelineRunner:
             # 检查取消
             if self.is_cancelled():
                 self._append_log(f"[{pid}] 任务已取消")
-                self._flush_log_events(pid)
-                self._flush_file_buffer(pid)  # 确保日志写入文件
                 return result
             
             # ===== 远端题目预检测（如果启用上传，先检查远端是否已有同名题目）=====
             if modules.get("upload", False):
                 try:
-                    problem_data_file = pdir / "problem_data.json"
-                    if problem_data_file.exists():
-                        with open(problem_data_file, 'r', encoding='utf-8') as f:
-                            prob_data = json.load(f)
+                    # 复用本任务已解析的题目数据（FETCH 阶段已加载或刚保存）
+                    prob_data = self._pdm_load(pdir)
+                    if prob_data:
                         title = prob_data.get('title', '').strip()
                         
                         if title:
@@ -831,27 +1438,24 @@ class PipelineRunner:
                                 
                                 # 精确标题搜索
                                 if hasattr(uploader, '_search_exact_title'):
-                                    existing_id = uploader._search_exact_title(title, hydrooj_auth)
+                                    existing_id = self._search_title_cached(
+                                        uploader, upload_adapter.name, title, hydrooj_auth
+                                    )
                                     id_source = "搜索"
                                     
                                     # 回退机制：如果精确搜索失败，检查已保存的 real_id
                                     if not existing_id:
-                                        saved_real_id = ProblemDataManager.get_upload_real_id(pdir, upload_adapter.name)
+                                        saved_real_id = self._pdm_get_upload_real_id(pdir, upload_adapter.name)
                                         if saved_real_id:
                                             try:
-                                                from core.database import get_database
-                                                db = get_database()
-                                                adapter_config = db.get_user_adapter_config(self.user_id, upload_adapter.name)
-                                                base_url = adapter_config.get("base_url", "")
-                                                domain = adapter_config.get("domain", "")
+                                                _, _, url_prefix = self._get_adapter_urlinfo(upload_adapter.name)
                                                 
-                                                if base_url and domain:
-                                                    verify_url = f"{base_url.rstrip('/')}/d/{domain}/p/{saved_real_id}"
-                                                    verify_r = hydrooj_auth.session.get(verify_url, timeout=10, headers={
-                                                        'User-Agent': 'Mozilla/5.0'
-                                                    })
-                                                    
-                                                    if verify_r.status_code == 200 and title in verify_r.text:
+                                                if url_prefix:
+                                                    verify_url = url_prefix + str(saved_real_id)
+                                                    if self._verify_remote_title(
+                                                        hydrooj_auth.session, verify_url, title,
+                                                        (upload_adapter.name, str(saved_real_id), title), pdir
+                                                    ):
                                                         existing_id = saved_real_id
                                                         id_source = "缓存"
                                             except Exception as verify_err:
@@ -864,18 +1468,14 @@ class PipelineRunner:
                                         result.ok_solve = True  # 跳过求解
                                         
                                         # 保存 real_id
-                                        ProblemDataManager.set_upload_real_id(pdir, upload_adapter.name, str(existing_id))
+                                        self._pdm_set_upload_real_id(pdir, upload_adapter.name, str(existing_id))
                                         
                                         # 构建 uploaded_url
                                         uploaded_url = None
                                         try:
-                                            from core.database import get_database
-                                            db = get_database()
-                                            adapter_config = db.get_user_adapter_config(self.user_id, upload_adapter.name)
-                                            base_url = adapter_config.get("base_url", "")
-                                            domain = adapter_config.get("domain", "")
-                                            if base_url and domain:
-                                                uploaded_url = f"{base_url.rstrip('/')}/d/{domain}/p/{existing_id}"
+                                            _, _, url_prefix = self._get_adapter_urlinfo(upload_adapter.name)
+                                            if url_prefix:
+                                                uploaded_url = url_prefix + str(existing_id)
                                                 result.extra["uploaded_url"] = uploaded_url
                                         except Exception as url_err:
                                             logger.debug(f"构建上传URL失败: {url_err}")
@@ -891,9 +1491,7 @@ class PipelineRunner:
                                         self._emit_status(row, {"gen": "跳过", "upload": "跳过", "solve": "跳过"})
                                         self._append_log(f"[{pid}] ========== 任务完成（远端已有）==========")
                                         self._append_log(f"[{pid}] 总耗时: {result.elapsed:.1f}s")
-                                        self._flush_log_events(pid)
-                                        self._flush_file_buffer(pid)  # 确保日志写入文件
-                                        return result
+                                        return result  # 日志发送与写盘在 finally 中交给收尾线程
                                     else:
                                         self._append_log(f"[{pid}] [CHECK] 远端无同名题目，继续正常流程")
                 except Exception as e:
@@ -906,16 +1504,18 @@ class PipelineRunner:
                 
                 # 检查是否可以复用已有测试数据（必须是 AC 通过的）
                 existing_zip = self._zip_path_for(pid)
-                is_ac = ProblemDataManager.is_completed(pdir)  # ok_solve=True
+                is_ac = self._pdm_is_completed(pdir)  # ok_solve=True
                 
                 if existing_zip.exists() and is_ac:
                     # AC 通过的测试数据可以复用
                     zip_size = existing_zip.stat().st_size
-                    test_count = len(list((pdir / "tests").glob("*.in"))) if (pdir / "tests").exists() else 0
+                    test_count = _count_tests(pdir)
                     
-                    self._append_log(f"[{pid}] [GEN] ✓ 复用已AC测试数据")
-                    self._append_log(f"[{pid}] [GEN]   ZIP文件: {existing_zip} ({zip_size} bytes)")
-                    self._append_log(f"[{pid}] [GEN]   测试点数量: {test_count}")
+                    self._append_log_batch([
+                        f"[{pid}] [GEN] ✓ 复用已AC测试数据",
+                        f"[{pid}] [GEN]   ZIP文件: {existing_zip} ({zip_size} bytes)",
+                        f"[{pid}] [GEN]   测试点数量: {test_count}",
+                    ])
                     self._emit_status(row, {"gen": "复用"})
                     
                     result.ok_gen = True
@@ -935,7 +1535,7 @@ class PipelineRunner:
                         self._append_log(f"[{pid}] [GEN] 第 {attempt}/3 次尝试 (温度={gen_temp:.2f})")
                         gen_start = time.time()
                         try:
-                            generator = self.services.create_generator()
+                            generator = self.services.generator
                             gen_pdir, zip_path = generator.generate_for(
                                 pid, temperature=gen_temp, context_history=gen_context
                             )
@@ -943,24 +1543,27 @@ class PipelineRunner:
                             
                             if zip_path and Path(zip_path).exists():
                                 zip_size = Path(zip_path).stat().st_size
-                                test_count = len(list((pdir / "tests").glob("*.in"))) if (pdir / "tests").exists() else 0
+                                test_count = _count_tests(pdir)
                                 
-                                self._append_log(f"[{pid}] [GEN] ✓ 数据生成成功 (耗时 {gen_elapsed:.2f}s)")
-                                self._append_log(f"[{pid}] [GEN]   ZIP文件: {zip_path} ({zip_size} bytes)")
-                                self._append_log(f"[{pid}] [GEN]   测试点数量: {test_count}")
+                                self._append_log_batch([
+                                    f"[{pid}] [GEN] ✓ 数据生成成功 (耗时 {gen_elapsed:.2f}s)",
+                                    f"[{pid}] [GEN]   ZIP文件: {zip_path} ({zip_size} bytes)",
+                                    f"[{pid}] [GEN]   测试点数量: {test_count}",
+                                ])
                                 
                                 # === 本地验题（作为生成的一部分）===
                                 cpp_file = pdir / "solution.cpp"
                                 test_dir = pdir / "tests"
+                                cpp_size = _probe_solution(pdir)
                                 
-                                if cpp_file.exists() and test_dir.exists():
-                                    cpp_size = cpp_file.stat().st_size
-                                    self._append_log(f"[{pid}] [GEN] 开始本地验题...")
-                                    self._append_log(f"[{pid}] [GEN]   代码文件: solution.cpp ({cpp_size} bytes)")
-                                    self._append_log(f"[{pid}] [GEN]   测试点: {test_count} 个")
+                                if cpp_size is not None:
+                                    self._append_log_batch([
+                                        f"[{pid}] [GEN] 开始本地验题...",
+                                        f"[{pid}] [GEN]   代码文件: solution.cpp ({cpp_size} bytes)",
+                                        f"[{pid}] [GEN]   测试点: {test_count} 个",
+                                    ])
                                     
                                     # 使用并发控制
-                                    from services.concurrency_manager import get_concurrency_manager
                                     concurrency_mgr = get_concurrency_manager()
                                     
                                     val_start = time.time()
@@ -977,7 +1580,7 @@ class PipelineRunner:
                                     
                                     if val_result.passed:
                                         self._append_log(f"[{pid}] [GEN] ✓ 本地验题通过 ({val_result.passed_cases}/{val_result.total_cases}, 耗时 {val_elapsed:.2f}s)")
-                                        ProblemDataManager.set_validation_result(pdir, {
+                                        self._pdm_set(pdir, "validation", {
                                             "passed": True,
                                             "total_cases": val_result.total_cases,
                                             "passed_cases": val_result.passed_cases
@@ -998,9 +1601,10 @@ class PipelineRunner:
                                                 self._append_log(f"[{pid}] [GEN]   失败样例: {fc.case_name} - {fc.reason}")
                                         
                                         # 保存上下文用于下次重试
+                                        val_error = f"本地验题失败: {val_result.passed_cases}/{val_result.total_cases} 通过"
                                         gen_context.append({
                                             "attempt": attempt,
-                                            "error": f"本地验题失败: {val_result.passed_cases}/{val_result.total_cases} 通过",
+                                            "error": val_error,
                                             "temperature": gen_temp,
                                             "validation_failed": True
                                         })
@@ -1011,11 +1615,12 @@ class PipelineRunner:
                                         self._append_log(f"[{pid}] [GEN] 验题失败，降温: {old_temp:.2f} -> {gen_temp:.2f}")
                                         
                                         if attempt < 3:
-                                            wait_time = 20 + random.uniform(-2, 2)
-                                            self._append_log(f"[{pid}] [GEN] 等待 {wait_time:.1f}s 后重新生成...")
-                                            if not interruptible_sleep(wait_time, self.is_cancelled):
-                                                self._append_log(f"[{pid}] 任务已取消")
-                                                return result
+                                            wait_time = _backoff_for(val_error, attempt)
+                                            if wait_time > 0:
+                                                self._append_log(f"[{pid}] [GEN] 等待 {wait_time:.1f}s 后重新生成...")
+                                                if not self._interruptible_wait(wait_time):
+                                                    self._append_log(f"[{pid}] 任务已取消")
+                                                    return result
                                         continue
                                 else:
                                     # 没有 solution.cpp，无法验题但数据生成成功
@@ -1046,11 +1651,12 @@ class PipelineRunner:
                                 self._append_log(f"[{pid}] [GEN] 检测到编译错误，降温: {old_temp:.2f} -> {gen_temp:.2f}")
                             
                             if attempt < 3:
-                                wait_time = 30 + random.uniform(-1.5, 1.5)
-                                self._append_log(f"[{pid}] [GEN] 等待 {wait_time:.1f}s 后重试...")
-                                if not interruptible_sleep(wait_time, self.is_cancelled):
-                                    self._append_log(f"[{pid}] 任务已取消")
-                                    return result
+                                wait_time = _backoff_for(error, attempt)
+                                if wait_time > 0:
+                                    self._append_log(f"[{pid}] [GEN] 等待 {wait_time:.1f}s 后重试...")
+                                    if not self._interruptible_wait(wait_time):
+                                        self._append_log(f"[{pid}] 任务已取消")
+                                        return result
                             else:
                                 self._append_log(f"[{pid}] [GEN] ✗ 已达最大重试次数，生成失败")
                                 self._emit_status(row, {"gen": "失败"})
@@ -1087,10 +1693,9 @@ class PipelineRunner:
                         cpp_file = pdir / "solution.cpp"
                         test_dir = pdir / "tests"
                         
-                        if cpp_file.exists() and test_dir.exists():
+                        if _probe_solution(pdir) is not None:
                             self._append_log(f"[{pid}] [UPLOAD] 执行补充验题...")
                             
-                            from services.concurrency_manager import get_concurrency_manager
                             concurrency_mgr = get_concurrency_manager()
                             
                             val_start = time.time()
@@ -1113,20 +1718,20 @@ class PipelineRunner:
                     # 上传数据
                     upload_adapter = self._get_upload_adapter()
                     if upload_adapter:
-                        self._append_log(f"[{pid}] [UPLOAD] 使用适配器: {upload_adapter.name}")
-                        self._append_log(f"[{pid}] [UPLOAD] ZIP文件: {zip_path}")
+                        self._append_log_batch([
+                            f"[{pid}] [UPLOAD] 使用适配器: {upload_adapter.name}",
+                            f"[{pid}] [UPLOAD] ZIP文件: {zip_path}",
+                        ])
                         
                         # 上传重试机制
                         max_upload_retries = 3
                         upload_success = False
                         
+                        uploader = self._get_or_make_uploader(upload_adapter)
+                        
                         for upload_attempt in range(1, max_upload_retries + 1):
                             try:
                                 upload_start = time.time()
-                                uploader = UploadService(
-                                    upload_adapter, self.sems,
-                                    log_callback=self._append_log
-                                )
                                 up_resp = uploader.upload_and_update(None, pid, zip_path)
                                 upload_elapsed = time.time() - upload_start
                                 
@@ -1151,18 +1756,14 @@ class PipelineRunner:
                                         
                                         if upload_adapter:
                                             # 保存上传后的 real_id（用于后续求解）
-                                            ProblemDataManager.set_upload_real_id(pdir, upload_adapter.name, real_id)
+                                            self._pdm_set_upload_real_id(pdir, upload_adapter.name, real_id)
                                             self._append_log(f"[{pid}] [UPLOAD] 已保存 {upload_adapter.name} 题目ID: {real_id}")
                                             
                                             # 根据适配器构建题目URL（从用户配置读取）
                                             try:
-                                                from core.database import get_database
-                                                db = get_database()
-                                                adapter_config = db.get_user_adapter_config(self.user_id, upload_adapter.name)
-                                                base_url = adapter_config.get("base_url", "")
-                                                domain = adapter_config.get("domain", "")
-                                                if base_url and domain:
-                                                    uploaded_url = f"{base_url.rstrip('/')}/d/{domain}/p/{real_id}"
+                                                _, _, url_prefix = self._get_adapter_urlinfo(upload_adapter.name)
+                                                if url_prefix:
+                                                    uploaded_url = url_prefix + str(real_id)
                                                     result.extra["uploaded_url"] = uploaded_url
                                                     self._append_log(f"[{pid}] [UPLOAD] 题目链接: {uploaded_url}")
                                             except Exception as url_err:
@@ -1171,22 +1772,28 @@ class PipelineRunner:
                                         # 如果没有找到 real_id，记录警告（但不上传失败，因为可能适配器不支持）
                                         self._append_log(f"[{pid}] [UPLOAD] ⚠ 响应中无题目ID，求解功能可能受影响")
                                     
+                                    # 远端已新增该题，之前缓存的标题搜索结果失效
+                                    if upload_adapter:
+                                        self._invalidate_title_search(upload_adapter.name, self._pdm_load(pdir).get("title") or "")
+                                    
                                     upload_success = True
                                     break
                                 else:
                                     self._append_log(f"[{pid}] [UPLOAD] ✗ 上传失败 (响应码={resp_code})")
                                     if upload_attempt < max_upload_retries:
-                                        wait_time = 5 * upload_attempt
-                                        self._append_log(f"[{pid}] [UPLOAD] 等待 {wait_time}s 后重试...")
-                                        if not interruptible_sleep(wait_time, self.is_cancelled):
-                                            return result
+                                        wait_time = _backoff_for(f"响应码={resp_code}", upload_attempt, fallback=5.0 * upload_attempt)
+                                        if wait_time > 0:
+                                            self._append_log(f"[{pid}] [UPLOAD] 等待 {wait_time:.1f}s 后重试...")
+                                            if not self._interruptible_wait(wait_time):
+                                                return result
                             except Exception as e:
                                 self._append_log(f"[{pid}] [UPLOAD] ✗ 上传异常 (尝试 {upload_attempt}/{max_upload_retries}): {e}")
                                 if upload_attempt < max_upload_retries:
-                                    wait_time = 5 * upload_attempt
-                                    self._append_log(f"[{pid}] [UPLOAD] 等待 {wait_time}s 后重试...")
-                                    if not interruptible_sleep(wait_time, self.is_cancelled):
-                                        return result
+                                    wait_time = _backoff_for(str(e), upload_attempt, fallback=5.0 * upload_attempt)
+                                    if wait_time > 0:
+                                        self._append_log(f"[{pid}] [UPLOAD] 等待 {wait_time:.1f}s 后重试...")
+                                        if not self._interruptible_wait(wait_time):
+                                            return result
                         
                         if not upload_success:
                             self._emit_status(row, {"upload": "失败"})
@@ -1219,9 +1826,9 @@ class PipelineRunner:
                 else:
                     # 如果刚完成上传，等待一段时间让服务器处理题目更新（避免"题目不存在"错误）
                     if modules.get("upload", False) and result.ok_upload:
-                        wait_after_upload = 3 + random.uniform(-0.5, 1.5)  # 等待 3-4.5 秒
+                        wait_after_upload = 3 + (_rand() * 2.0 - 0.5)  # 等待 3-4.5 秒
                         self._append_log(f"[{pid}] [SOLVE] 刚完成上传，等待 {wait_after_upload:.1f}s 让服务器处理题目更新...")
-                        if not interruptible_sleep(wait_after_upload, self.is_cancelled):
+                        if not self._interruptible_wait(wait_after_upload):
                             return result
                     self._append_log(f"[{pid}] [SOLVE] 使用适配器: {submit_adapter.name}")
                     
@@ -1230,7 +1837,22 @@ class PipelineRunner:
                     
                     self._append_log(f"[{pid}] [SOLVE] 初始温度: {solve_temp}, 最大重试: 3")
                     
-                    for attempt in range(1, 4):
+                    submit_bucket = self._get_submit_bucket(submit_adapter.name)
+                    last_rate_limited = False
+                    
+                    # 认证失效重新登录即可恢复，单独计数，不占用 3 次求解重试
+                    attempt = 0
+                    auth_refreshes = 0
+                    auth_refresh_pending = False
+                    while attempt < 3:
+                        attempt += 1
+                        # 首次提交与认证刷新后的重试总是放行；其余重试需要令牌（上次被限流时消耗更多）
+                        retry_cost = self._SUBMIT_RATE_LIMITED_RETRY_COST if last_rate_limited else self._SUBMIT_RETRY_COST
+                        if attempt > 1 and not auth_refresh_pending and not submit_bucket.try_acquire(retry_cost):
+                            self._append_log(f"[{pid}] [SOLVE] ✗ 本地限流降级：{submit_adapter.name} 近期频繁限流，放弃剩余重试")
+                            break
+                        last_rate_limited = False
+                        auth_refresh_pending = False
                         self._append_log(f"[{pid}] [SOLVE] 第 {attempt}/3 次尝试 (温度={solve_temp:.2f})")
                         solve_start = time.time()
                         try:
@@ -1243,15 +1865,7 @@ class PipelineRunner:
                                     self._cache_auth(submit_adapter.name, auth)
                                     self._append_log(f"[{pid}] [SOLVE] 登录成功，已缓存认证")
                             
-                            solver = SolveService(
-                                None, self.services.llm_solve,
-                                self._get_workspace_base(), self.sems,
-                                log_callback=self._append_log,
-                                solution_searcher=self.services.solution_searcher,
-                                summary_llm=self.services.llm_summary,
-                                cancel_check=self.is_cancelled,
-                                user_id=self.user_id  # 传递用户ID用于适配器配置隔离
-                            )
+                            solver = self._get_or_make_solver()
                             
                             solve_result = solver.solve(
                                 auth, pid,
@@ -1271,6 +1885,7 @@ class PipelineRunner:
                             submission_id = solve_result.get("submission_id", "N/A")
                             
                             self._append_log(f"[{pid}] [SOLVE] 提交结果: status={final_status}, msg={final_msg}, id={submission_id}")
+                            submit_bucket.add(1.0)  # 服务端正常判题，返还令牌
                             
                             if final_status == 0:  # AC
                                 result.ok_solve = True
@@ -1287,65 +1902,69 @@ class PipelineRunner:
                                 solve_context.append({"status": status_name, "attempt": attempt})
                             
                             if attempt < 3:
-                                wait_time = 30 + random.uniform(-1.5, 1.5)
-                                self._append_log(f"[{pid}] [SOLVE] 等待 {wait_time:.1f}s 后重试...")
-                                if not interruptible_sleep(wait_time, self.is_cancelled):
-                                    self._append_log(f"[{pid}] 任务已取消")
-                                    self._flush_log_events(pid)
-                                    self._flush_file_buffer(pid)  # 确保日志写入文件
-                                    return result
-                            else:
-                                self._append_log(f"[{pid}] [SOLVE] ✗ 已达最大重试次数，求解失败")
-                                self._emit_status(row, {"solve": f"失败"})
+                                # CE 立即换代码重试；WA/TLE 等判题结果仍按原节奏等待，避免触发提交频率限制
+                                wait_time = _backoff_for("CE" if final_status in (6, -2) else "", attempt)
+                                if wait_time > 0:
+                                    self._append_log(f"[{pid}] [SOLVE] 等待 {wait_time:.1f}s 后重试...")
+                                    if not self._interruptible_wait(wait_time):
+                                        self._append_log(f"[{pid}] 任务已取消")
+                                        return result
                                 
                         except Exception as e:
                             solve_elapsed = time.time() - solve_start
                             error_msg = str(e)
                             self._append_log(f"[{pid}] [SOLVE] ✗ 第 {attempt} 次异常 (耗时 {solve_elapsed:.2f}s): {error_msg[:100]}")
                             
-                            # 检查是否是特定错误（需要特殊处理）
-                            is_rate_limit = "频率过快" in error_msg or "频率" in error_msg or "403" in error_msg
-                            is_problem_not_exist = "不存在" in error_msg or "已不存在" in error_msg
-                            # 检测 401 认证失效错误（SHSOJ 返回 "登录状态已失效"）
-                            is_auth_expired = (
-                                "401" in error_msg or 
-                                "登录状态已失效" in error_msg or 
-                                "登录失效" in error_msg or
-                                "请重新登录" in error_msg or
-                                "token" in error_msg.lower() and "expired" in error_msg.lower()
-                            )
+                            # 检查是否是特定错误（需要特殊处理）；401 认证失效如 SHSOJ 返回 "登录状态已失效"
+                            error_class = _classify_solve_error(error_msg, e)
+                            
+                            if error_class == "auth_expired":
+                                if auth_refreshes >= self._SOLVE_MAX_AUTH_REFRESHES:
+                                    self._append_log(f"[{pid}] [SOLVE] ✗ 认证失效且重新登录 {auth_refreshes} 次后仍失败，求解失败")
+                                    break
+                                # 认证失效：清除缓存认证后重新登录重试，不计入求解重试次数，也不消耗限流令牌
+                                auth_refreshes += 1
+                                attempt -= 1
+                                auth_refresh_pending = True
+                                self._append_log(f"[{pid}] [SOLVE] 检测到认证失效，清除缓存认证并重新登录 ({auth_refreshes}/{self._SOLVE_MAX_AUTH_REFRESHES})...")
+                                if self._user_context:
+                                    self._user_context.clear_auth(submit_adapter.name)
+                                # 下次循环时 _get_cached_auth() 会返回 None，自动触发重新登录
+                                wait_time = _compute_retry_wait("auth_expired", auth_refreshes)
+                                self._append_log(f"[{pid}] [SOLVE] 等待 {wait_time:.1f}s 后重新登录重试...")
+                                if not self._interruptible_wait(wait_time):
+                                    self._append_log(f"[{pid}] 任务已取消")
+                                    return result
+                                continue
                             
                             if attempt < 3:
                                 # 根据错误类型决定等待时间和处理方式
-                                if is_auth_expired:
-                                    # 认证失效：清除缓存认证，下次循环会重新登录
-                                    self._append_log(f"[{pid}] [SOLVE] 检测到认证失效，清除缓存认证并重新登录...")
-                                    if self._user_context:
-                                        self._user_context.clear_auth(submit_adapter.name)
-                                    # 下次循环时 _get_cached_auth() 会返回 None，自动触发重新登录
-                                    wait_time = 2 + random.uniform(0, 1)  # 短暂等待后重试
-                                    self._append_log(f"[{pid}] [SOLVE] 等待 {wait_time:.1f}s 后重新登录重试...")
-                                elif is_rate_limit:
-                                    # 频率限制：等待更长时间（60-90秒）
-                                    wait_time = 60 + random.uniform(-5, 30)
+                                if error_class == "rate_limit":
+                                    last_rate_limited = True
+                                    # 频率限制：优先遵循服务端给出的等待时间，否则较长的指数退避
+                                    retry_after = _server_retry_after(e, error_msg)
+                                    if retry_after is not None:
+                                        wait_time = retry_after + 2.0 * _rand()
+                                    else:
+                                        wait_time = _compute_retry_wait("rate_limit", attempt)
                                     self._append_log(f"[{pid}] [SOLVE] 检测到频率限制错误，等待 {wait_time:.1f}s 后重试...")
-                                elif is_problem_not_exist:
-                                    # 题目不存在：可能是刚更新，等待服务器处理（15-25秒）
-                                    wait_time = 15 + random.uniform(-2, 10)
+                                elif error_class == "not_exist":
+                                    # 题目不存在：可能是刚更新，等待服务器处理
+                                    wait_time = _compute_retry_wait("not_exist", attempt)
                                     self._append_log(f"[{pid}] [SOLVE] 检测到题目不存在错误，等待 {wait_time:.1f}s 让服务器处理...")
                                 else:
-                                    # 其他错误：正常等待（30秒左右）
-                                    wait_time = 30 + random.uniform(-1.5, 1.5)
+                                    wait_time = _compute_retry_wait("other", attempt)
                                     self._append_log(f"[{pid}] [SOLVE] 等待 {wait_time:.1f}s 后重试...")
                                 
-                                if not interruptible_sleep(wait_time, self.is_cancelled):
+                                if not self._interruptible_wait(wait_time):
                                     self._append_log(f"[{pid}] 任务已取消")
-                                    self._flush_log_events(pid)
-                                    self._flush_file_buffer(pid)
                                     return result
-                            else:
-                                self._append_log(f"[{pid}] [SOLVE] ✗ 已达最大重试次数，求解失败")
-                                self._emit_status(row, {"solve": "失败"})
+                    else:
+                        self._append_log(f"[{pid}] [SOLVE] ✗ 已达最大重试次数，求解失败")
+                    
+                    # 唯一的失败出口（重试耗尽、认证刷新耗尽或本地限流降级）
+                    if not result.ok_solve:
+                        self._emit_status(row, {"solve": "失败"})
             else:
                 self._append_log(f"[{pid}] [SOLVE] 跳过（未启用）")
                 self._emit_status(row, {"solve": "跳过"})
@@ -1356,51 +1975,53 @@ class PipelineRunner:
             if result.ok_solve:
                 self._mark_completed(pid, result)
             
-            # 详细汇总（先刷新待发布的日志事件和文件缓冲区）
-            self._flush_log_events(pid)
-            self._flush_file_buffer(pid)  # 确保日志写入文件
-            self._append_log(f"[{pid}] ========== 任务完成 ==========")
-            self._append_log(f"[{pid}] 总耗时: {result.elapsed:.1f}s")
+            # 详细汇总
             check, cross = '✓', '✗'
-            self._append_log(f"[{pid}] 结果: 生成={check if result.ok_gen else cross}, 上传={check if result.ok_upload else cross}, 求解={check if result.ok_solve else cross}")
+            summary = [
+                f"[{pid}] ========== 任务完成 ==========",
+                f"[{pid}] 总耗时: {result.elapsed:.1f}s",
+                f"[{pid}] 结果: 生成={check if result.ok_gen else cross}, 上传={check if result.ok_upload else cross}, 求解={check if result.ok_solve else cross}",
+            ]
             if result.extra.get('error'):
-                self._append_log(f"[{pid}] 错误: {result.extra['error'][:100]}")
-            self._append_log(f"[{pid}] ========================================")
-            self._flush_log_events(pid)  # 确保最后一条日志也被发布
-            self._flush_file_buffer(pid)  # 确保最终日志写入文件
+                summary.append(f"[{pid}] 错误: {result.extra['error'][:100]}")
+            summary.append(f"[{pid}] ========================================")
+            self._append_log_batch(summary)
             
         except Exception as e:
             logger.exception(f"任务失败 {pid}: {e}")
             result.extra["error"] = str(e)
             self._append_log(f"[{pid}] ✗ 执行失败: {e}")
             result.elapsed = time.time() - start
-            # 确保异常日志也写入文件
-            self._flush_log_events(pid)
-            self._flush_file_buffer(pid)
+        finally:
+            pdir = self._problem_dir_for(pid)
+            try:
+                self._pdm_flush(pdir)
+            finally:
+                self._pdm_cache.pop(pdir, None)
+            # 所有返回/取消/异常路径统一在此收尾日志（发送剩余事件、写出缓冲并关闭文件）
+            self._finalize_async(pid)
         
         return result
     
     def _generate_summary(self, results: List[TaskResult]):
         """生成汇总报告"""
-        import csv
         try:
-            # JSON
-            Path("summary.json").write_text(
-                json.dumps([r.__dict__ for r in results], ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+            # JSON（逐条写出，不在内存中拼出整份文档）
+            with open("summary.json", "wb", buffering=1 << 20) as f:
+                fast_json.dump_array_pretty(results, f)
             
             # CSV
-            with open("summary.csv", "w", newline="", encoding="utf-8") as f:
+            with open("summary.csv", "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
                 w = csv.writer(f)
                 w.writerow(["problem_id", "gen", "upload", "solve", "elapsed"])
-                for r in results:
-                    w.writerow([r.original_id, r.ok_gen, r.ok_upload, r.ok_solve, f"{r.elapsed:.1f}"])
+                w.writerows(
+                    (r.original_id, r.ok_gen, r.ok_upload, r.ok_solve, f"{r.elapsed:.1f}") for r in results
+                )
             
             # 失败列表
             failed = [r.original_id for r in results if not r.ok_solve]
             if failed:
-                Path("failed_problems.txt").write_text("\n".join(failed), encoding="utf-8")
+                Path("failed_problems.txt").write_bytes("\n".join(failed).encode("utf-8"))
             
             logger.info("汇总已保存")
         except Exception as e:
@@ -3,12 +3,43 @@
 
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Set, Tuple
 from datetime import datetime
-import json
+from functools import lru_cache
+import copy
+import os
+import threading
+import time
 
 from loguru import logger
 
+from utils import fast_json
+
+
+@lru_cache(maxsize=256)
+def _parse_cached(path: str, ino: int, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """按文件身份（inode, mtime, size）缓存解析结果；save() 原子替换后身份必然变化"""
+    with open(path, 'rb') as f:
+        return fast_json.loads(f.read())
+
+
+# [秒级时间戳, 对应的 ISO 字符串]
+_iso_now_cache: List[Any] = [0, ""]
+
+
+def _iso_now() -> str:
+    """当前本地时间的 ISO 字符串（按秒缓存，同一秒内复用）"""
+    t = int(time.time())
+    if _iso_now_cache[0] != t:
+        _iso_now_cache[:] = [t, datetime.fromtimestamp(t).isoformat()]
+    return _iso_now_cache[1]
+
+
+def _load_shared(data_file: str) -> Dict[str, Any]:
+    """读取缓存的解析结果（共享对象，调用方不得修改）；文件不存在时抛出 FileNotFoundError"""
+    st = os.stat(data_file)
+    return _parse_cached(data_file, st.st_ino, st.st_mtime_ns, st.st_size)
+
 
 class ProblemDataManager:
     """题目数据管理器
@@ -44,14 +75,26 @@ class ProblemDataManager:
             return {}
         
         try:
-            with open(data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(data_file, 'rb') as f:
+                data = fast_json.loads(f.read())
             logger.debug(f"加载题目数据: {data_file}")
             return data
         except Exception as e:
             logger.error(f"加载题目数据失败: {e}")
             return {}
     
+    @staticmethod
+    def _load_readonly(workspace_dir: Path) -> Dict[str, Any]:
+        """只读加载：文件未变化时直接复用上次解析结果（返回值不得修改）"""
+        data_file = ProblemDataManager._get_data_file_path(workspace_dir)
+        try:
+            return _load_shared(str(data_file))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"加载题目数据失败: {e}")
+            return {}
+    
     @staticmethod
     def save(workspace_dir: Path, data: Dict[str, Any]):
         """保存题目数据
@@ -70,22 +113,41 @@ class ProblemDataManager:
             data["_data_version"] = ProblemDataManager.DATA_VERSION
         
         try:
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            new_bytes = fast_json.dumps_pretty(data)
+            # 内容未变化时跳过写盘（大小不同时无需读取比较）
+            try:
+                if data_file.stat().st_size == len(new_bytes) and data_file.read_bytes() == new_bytes:
+                    return
+            except FileNotFoundError:
+                pass
+            # 先写临时文件再原子替换，读取方不会看到写了一半的文件；
+            # 临时文件名带线程标识，同目录并发保存互不覆盖
+            tmp_file = data_file.with_name(f"{data_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                tmp_file.write_bytes(new_bytes)
+                os.replace(tmp_file, data_file)
+            except BaseException:
+                tmp_file.unlink(missing_ok=True)
+                raise
             logger.debug(f"保存题目数据: {data_file}")
         except Exception as e:
             logger.error(f"保存题目数据失败: {e}")
     
     @staticmethod
-    def update(workspace_dir: Path, updates: Dict[str, Any]):
+    def update(workspace_dir: Path, updates: Dict[str, Any],
+               processing: Optional[Dict[str, Any]] = None):
         """更新题目数据（部分更新）
         
         Args:
             workspace_dir: 工作区目录
             updates: 要更新的数据
+            processing: 同时合并的处理状态（同 set_processing_status），一次读写完成
         """
         data = ProblemDataManager.load(workspace_dir)
         data.update(updates)
+        if processing:
+            data.setdefault("_processing", {}).update(processing)
+            data["_processing"]["updated_at"] = _iso_now()
         ProblemDataManager.save(workspace_dir, data)
     
     # ========== 上传适配器 real_id（通用） ==========
@@ -116,7 +178,7 @@ class ProblemDataManager:
         Returns:
             上传后的真实题目 ID，不存在则返回 None
         """
-        data = ProblemDataManager.load(workspace_dir)
+        data = ProblemDataManager._load_readonly(workspace_dir)
         upload_ids = data.get("upload_real_ids", {})
         return upload_ids.get(adapter_name)
     
@@ -155,8 +217,8 @@ class ProblemDataManager:
         Returns:
             图片信息列表
         """
-        data = ProblemDataManager.load(workspace_dir)
-        return data.get("images", [])
+        data = ProblemDataManager._load_readonly(workspace_dir)
+        return copy.deepcopy(data.get("images", []))
     
     # ========== 验证信息 ==========
     
@@ -181,8 +243,8 @@ class ProblemDataManager:
         Returns:
             验证结果，不存在则返回 None
         """
-        data = ProblemDataManager.load(workspace_dir)
-        return data.get("validation")
+        data = ProblemDataManager._load_readonly(workspace_dir)
+        return copy.deepcopy(data.get("validation"))
     
     # ========== 适配器特定数据 ==========
     
@@ -215,9 +277,9 @@ class ProblemDataManager:
         Returns:
             适配器数据，不存在则返回 None
         """
-        data = ProblemDataManager.load(workspace_dir)
+        data = ProblemDataManager._load_readonly(workspace_dir)
         adapter_data = data.get("_adapter_data", {})
-        return adapter_data.get(adapter_name)
+        return copy.deepcopy(adapter_data.get(adapter_name))
     
     # ========== 处理状态跟踪 ==========
     
@@ -240,31 +302,82 @@ class ProblemDataManager:
         if "_processing" not in data:
             data["_processing"] = {}
         data["_processing"].update(status)
-        data["_processing"]["updated_at"] = datetime.now().isoformat()
+        data["_processing"]["updated_at"] = _iso_now()
         ProblemDataManager.save(workspace_dir, data)
     
     @staticmethod
     def get_processing_status(workspace_dir: Path) -> Optional[Dict[str, Any]]:
         """获取处理状态"""
-        data = ProblemDataManager.load(workspace_dir)
-        return data.get("_processing")
+        data = ProblemDataManager._load_readonly(workspace_dir)
+        return copy.deepcopy(data.get("_processing"))
     
     @staticmethod
-    def is_completed(workspace_dir: Path) -> bool:
-        """检查是否已完成（AC通过）"""
-        status = ProblemDataManager.get_processing_status(workspace_dir)
+    def status_is_completed(status: Optional[Dict[str, Any]]) -> bool:
+        """根据 _processing 状态判断是否已完成"""
         if not status:
             return False
         return status.get("ok_solve", False) or status.get("stage") == "completed"
     
+    @staticmethod
+    def is_completed(workspace_dir: Path) -> bool:
+        """检查是否已完成（AC通过）"""
+        data = ProblemDataManager._load_readonly(workspace_dir)
+        return ProblemDataManager.status_is_completed(data.get("_processing"))
+    
+    @staticmethod
+    def load_with_status(workspace_dir: Path) -> Tuple[Dict[str, Any], bool]:
+        """一次读盘同时返回题目数据和是否已完成
+        
+        Returns:
+            (题目数据字典, 是否已完成)，等价于 load() 与 is_completed() 的组合
+        """
+        data = ProblemDataManager.load(workspace_dir)
+        return data, ProblemDataManager.status_is_completed(data.get("_processing"))
+    
+    @staticmethod
+    def scan_completed(base_dir: Path, dir_names: Optional[Iterable[str]] = None) -> Set[str]:
+        """批量扫描工作区，返回已完成题目的目录名集合
+        
+        一次 scandir 列出已有的题目目录，只读取存在 problem_data.json 的目录，
+        不存在的题目无需逐个 stat。
+        
+        Args:
+            base_dir: 工作区基础目录
+            dir_names: 只关心的目录名（None 表示全部 problem_* 目录）
+            
+        Returns:
+            已完成题目的目录名集合
+        """
+        wanted = set(dir_names) if dir_names is not None else None
+        completed: Set[str] = set()
+        try:
+            with os.scandir(base_dir) as it:
+                entries = [
+                    e for e in it
+                    if e.name.startswith("problem_") and (wanted is None or e.name in wanted)
+                ]
+        except OSError:
+            return completed
+        
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            data_file = os.path.join(entry.path, "problem_data.json")
+            try:
+                data = _load_shared(data_file)
+            except (OSError, ValueError):
+                continue
+            if ProblemDataManager.status_is_completed(data.get("_processing")):
+                completed.add(entry.name)
+        return completed
+    
     @staticmethod
     def mark_completed(workspace_dir: Path, solve_result: bool = True):
         """标记为已完成"""
-        from datetime import datetime
         ProblemDataManager.set_processing_status(workspace_dir, {
             "stage": "completed",
             "ok_solve": solve_result,
-            "completed_at": datetime.now().isoformat()
+            "completed_at": _iso_now()
         })
     
     # ========== 实用方法 ==========
@@ -291,7 +404,7 @@ class ProblemDataManager:
         Returns:
             题目标题
         """
-        data = ProblemDataManager.load(workspace_dir)
+        data = ProblemDataManager._load_readonly(workspace_dir)
         return data.get("title")
     
     @staticmethod
@@ -304,7 +417,7 @@ class ProblemDataManager:
         Returns:
             标签列表
         """
-        data = ProblemDataManager.load(workspace_dir)
+        data = ProblemDataManager._load_readonly(workspace_dir)
         tags = data.get("tags", [])
-        return tags if isinstance(tags, list) else []
+        return list(tags) if isinstance(tags, list) else []
 
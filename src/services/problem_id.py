@@ -17,8 +17,10 @@
 
 from __future__ import annotations
 
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import Dict, Iterable, Optional, Tuple, TYPE_CHECKING
 
 from loguru import logger
 
@@ -29,6 +31,19 @@ if TYPE_CHECKING:
     from services.oj.base.adapter_base import OJAdapter
 
 
+@lru_cache(maxsize=1)
+def _resolve_workspace_base() -> Path:
+    """工作区基础目录：环境变量 > /app/workspace（Docker）> 当前目录（进程内只解析一次）"""
+    workspace_base = os.getenv("OJO_WORKSPACE")
+    if not workspace_base:
+        docker_workspace = Path("/app/workspace")
+        if docker_workspace.exists():
+            workspace_base = str(docker_workspace)
+        else:
+            workspace_base = "workspace"
+    return Path(workspace_base)
+
+
 class ProblemIdResolver:
     """题目ID统一解析器
     
@@ -50,6 +65,24 @@ class ProblemIdResolver:
         self.registry = registry
         self.default_adapter = default_adapter
         self.default_base_url = default_base_url.rstrip("/")
+        # 解析结果缓存（适配器只在启动时注册，同一ID的结果在进程内不变）
+        # 未找到适配器的结果不缓存，避免适配器尚未注册时的结果被固定下来
+        self._adapter_cache: Dict[str, Tuple['OJAdapter', str]] = {}
+        self._canonical_cache: Dict[str, str] = {}
+        self._parsed_cache: Dict[str, Tuple['OJAdapter', Optional[str]]] = {}
+    
+    _CACHE_MAX = 4096
+    
+    def _remember(self, cache: Dict, key: str, value) -> None:
+        if len(cache) >= self._CACHE_MAX:
+            cache.clear()
+        cache[key] = value
+    
+    def cache_clear(self) -> None:
+        """清空解析缓存（适配器注册表变化后调用）"""
+        self._adapter_cache.clear()
+        self._canonical_cache.clear()
+        self._parsed_cache.clear()
     
     def is_pure_numeric(self, raw_id: str) -> bool:
         """判断是否为纯数字ID
@@ -60,7 +93,12 @@ class ProblemIdResolver:
         Returns:
             是否为1-10位纯数字
         """
+        # 常见情况：无首尾空白，直接判断，无需 strip() 分配新字符串
+        if 1 <= len(raw_id) <= 10 and raw_id.isdigit():
+            return True
         stripped = raw_id.strip()
+        if stripped is raw_id:  # 无首尾空白且上面已判定为否
+            return False
         return stripped.isdigit() and 1 <= len(stripped) <= 10
     
     def find_adapter(self, raw_id: str) -> Tuple[Optional['OJAdapter'], str]:
@@ -73,6 +111,10 @@ class ProblemIdResolver:
             (适配器实例, 用于解析的ID)
             如果是纯数字，会构造完整URL后查找
         """
+        cached = self._adapter_cache.get(raw_id)
+        if cached is not None:
+            return cached
+        
         stripped = raw_id.strip()
         
         # 纯数字ID: 构造URL后查找
@@ -80,11 +122,15 @@ class ProblemIdResolver:
             constructed_url = f"{self.default_base_url}/problem/{stripped}"
             logger.debug(f"[ProblemIdResolver] 纯数字ID {stripped}，构造URL: {constructed_url}")
             adapter = self.registry.find_adapter_by_url(constructed_url)
-            return adapter, constructed_url if adapter else stripped
+            found = adapter, constructed_url if adapter else stripped
+        else:
+            # 非纯数字: 直接尝试URL匹配
+            adapter = self.registry.find_adapter_by_url(stripped)
+            found = adapter, stripped
         
-        # 非纯数字: 直接尝试URL匹配
-        adapter = self.registry.find_adapter_by_url(stripped)
-        return adapter, stripped
+        if adapter:
+            self._remember(self._adapter_cache, raw_id, found)
+        return found
     
     def canonicalize(self, raw_id: str) -> str:
         """规范化题目ID
@@ -101,6 +147,10 @@ class ProblemIdResolver:
             规范化ID，如 "aicoders_2772"
             如果无法解析则返回原始ID
         """
+        cached = self._canonical_cache.get(raw_id)
+        if cached is not None:
+            return cached
+        
         try:
             adapter, lookup_id = self.find_adapter(raw_id)
             
@@ -111,21 +161,66 @@ class ProblemIdResolver:
             fetcher = adapter.get_problem_fetcher()
             if not fetcher:
                 logger.debug(f"[ProblemIdResolver] 适配器 {adapter.name} 不支持题面获取")
-                return raw_id
-            
-            parsed_id = fetcher.parse_problem_id(lookup_id)
-            if not parsed_id:
-                logger.debug(f"[ProblemIdResolver] 无法解析题目ID: {lookup_id}")
-                return raw_id
+                canonical = raw_id
+            else:
+                parsed_id = fetcher.parse_problem_id(lookup_id)
+                if parsed_id:
+                    canonical = f"{adapter.name}_{parsed_id}"
+                    logger.debug(f"[ProblemIdResolver] {raw_id} -> {canonical}")
+                else:
+                    logger.debug(f"[ProblemIdResolver] 无法解析题目ID: {lookup_id}")
+                    canonical = raw_id
             
-            canonical = f"{adapter.name}_{parsed_id}"
-            logger.debug(f"[ProblemIdResolver] {raw_id} -> {canonical}")
+            self._remember(self._canonical_cache, raw_id, canonical)
             return canonical
             
         except Exception as e:
             logger.warning(f"[ProblemIdResolver] 解析失败 {raw_id}: {e}")
             return raw_id
     
+    def bulk_canonicalize(self, raw_ids: Iterable[str]) -> Dict[str, str]:
+        """批量规范化题目ID
+        
+        重复ID只解析一次；纯数字ID构造的URL只有数字部分不同，
+        共用一次适配器查找。
+        
+        Args:
+            raw_ids: 原始ID列表
+            
+        Returns:
+            原始ID -> 规范化ID 的映射（与逐个调用 canonicalize 结果一致）
+        """
+        result: Dict[str, str] = {}
+        numeric_fetcher = None
+        numeric_adapter_name: Optional[str] = None
+        numeric_resolved = False
+        
+        for raw_id in raw_ids:
+            if raw_id in result:
+                continue
+            stripped = raw_id.strip()
+            if not self.is_pure_numeric(stripped):
+                result[raw_id] = self.canonicalize(raw_id)
+                continue
+            
+            try:
+                if not numeric_resolved:
+                    numeric_resolved = True
+                    adapter, _ = self.find_adapter(stripped)
+                    if adapter:
+                        numeric_fetcher = adapter.get_problem_fetcher()
+                        numeric_adapter_name = adapter.name
+                if not numeric_fetcher:
+                    result[raw_id] = raw_id
+                    continue
+                parsed_id = numeric_fetcher.parse_problem_id(f"{self.default_base_url}/problem/{stripped}")
+                result[raw_id] = f"{numeric_adapter_name}_{parsed_id}" if parsed_id else raw_id
+            except Exception as e:
+                logger.warning(f"[ProblemIdResolver] 解析失败 {raw_id}: {e}")
+                result[raw_id] = raw_id
+        
+        return result
+    
     def get_workspace_dir(self, raw_id: str, user_id: int) -> Path:
         """获取题目工作区目录（用户隔离，支持环境变量）
         
@@ -142,17 +237,7 @@ class ProblemIdResolver:
         canonical_id = self.canonicalize(raw_id)
         safe_pid = sanitize_filename(canonical_id)
         
-        # 使用环境变量或默认路径
-        import os
-        workspace_base = os.getenv("OJO_WORKSPACE")
-        if not workspace_base:
-            docker_workspace = Path("/app/workspace")
-            if docker_workspace.exists():
-                workspace_base = str(docker_workspace)
-            else:
-                workspace_base = "workspace"
-        
-        return Path(workspace_base) / f"user_{user_id}" / f"problem_{safe_pid}"
+        return _resolve_workspace_base() / f"user_{user_id}" / f"problem_{safe_pid}"
     
     def get_zip_path(self, raw_id: str, user_id: int) -> Path:
         """获取测试数据ZIP文件路径
@@ -178,6 +263,10 @@ class ProblemIdResolver:
             (适配器实例, 解析后的题目ID)
             如果解析失败则返回 (None, None)
         """
+        cached = self._parsed_cache.get(raw_id)
+        if cached is not None:
+            return cached
+        
         try:
             adapter, lookup_id = self.find_adapter(raw_id)
             
@@ -185,11 +274,9 @@ class ProblemIdResolver:
                 return None, None
             
             fetcher = adapter.get_problem_fetcher()
-            if not fetcher:
-                return adapter, None
-            
-            parsed_id = fetcher.parse_problem_id(lookup_id)
-            return adapter, parsed_id
+            parsed = adapter, (fetcher.parse_problem_id(lookup_id) if fetcher else None)
+            self._remember(self._parsed_cache, raw_id, parsed)
+            return parsed
             
         except Exception as e:
             logger.warning(f"[ProblemIdResolver] 解析失败 {raw_id}: {e}")
@@ -239,4 +326,6 @@ def get_problem_id_resolver() -> ProblemIdResolver:
 def reset_problem_id_resolver():
     """重置全局解析器 (用于测试)"""
     global _global_resolver
+    if _global_resolver is not None:
+        _global_resolver.cache_clear()
     _global_resolver = None
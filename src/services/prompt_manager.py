@@ -5,10 +5,27 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from loguru import logger
 
 
+# 缓存键 -> (分组, 字段)
+_STATIC_KEYS: Dict[str, Tuple[str, str]] = {
+    "dg_task": ("data_generation", "task_instructions"),
+    "dg_sys": ("data_generation", "system_prompt"),
+    "sol_req": ("solution", "task_requirements"),
+    "sol_sys": ("solution", "system_prompt"),
+    "ocr_extract": ("ocr", "extraction_prompt"),
+    "ocr_sys": ("ocr", "system_prompt"),
+    "search_query": ("search_solution", "query_template"),
+    "search_prefix": ("search_solution", "context_prefix"),
+    "search_none": ("search_solution", "no_solution_found"),
+}
+
+# 按 pid 渲染的数据生成任务指令缓存上限
+_TASK_CACHE_MAX = 1024
+
+
 class PromptManager:
     """提示词管理器，负责加载和提供所有prompt配置"""
     
@@ -18,10 +35,21 @@ class PromptManager:
         
         self.prompts_file = prompts_file
         self.prompts: Dict[str, Any] = {}
+        self._cache: Dict[str, str] = {}
+        self._task_cache: Dict[str, str] = {}
         self._load_prompts()
     
     def _load_prompts(self):
-        """加载prompts配置文件"""
+        """加载prompts配置文件，并预先取出所有静态提示词"""
+        self._read_prompts()
+        self._cache = {
+            key: self.prompts.get(group, {}).get(field, "")
+            for key, (group, field) in _STATIC_KEYS.items()
+        }
+        self._task_cache = {}
+    
+    def _read_prompts(self):
+        """读取prompts配置文件"""
         try:
             if not self.prompts_file.exists():
                 logger.warning(f"Prompts文件不存在: {self.prompts_file}，使用空配置")
@@ -42,41 +70,46 @@ class PromptManager:
     
     def get_data_generation_task_instructions(self, pid: str) -> str:
         """获取数据生成任务指令"""
-        instructions = self.prompts.get("data_generation", {}).get("task_instructions", "")
-        # 使用安全的替换方式，避免format()误解析花括号
-        return instructions.replace("{pid}", pid)
+        cached = self._task_cache.get(pid)
+        if cached is None:
+            # 使用安全的替换方式，避免format()误解析花括号
+            cached = self._cache["dg_task"].replace("{pid}", pid)
+            if len(self._task_cache) >= _TASK_CACHE_MAX:
+                self._task_cache.clear()
+            self._task_cache[pid] = cached
+        return cached
     
     def get_data_generation_system_prompt(self) -> str:
         """获取数据生成系统提示"""
-        return self.prompts.get("data_generation", {}).get("system_prompt", "")
+        return self._cache["dg_sys"]
     
     def get_solution_task_requirements(self) -> str:
         """获取解题任务要求"""
-        return self.prompts.get("solution", {}).get("task_requirements", "")
+        return self._cache["sol_req"]
     
     def get_solution_system_prompt(self) -> str:
         """获取解题系统提示"""
-        return self.prompts.get("solution", {}).get("system_prompt", "")
+        return self._cache["sol_sys"]
     
     def get_ocr_extraction_prompt(self) -> str:
         """获取OCR提取提示"""
-        return self.prompts.get("ocr", {}).get("extraction_prompt", "")
+        return self._cache["ocr_extract"]
     
     def get_ocr_system_prompt(self) -> str:
         """获取OCR系统提示"""
-        return self.prompts.get("ocr", {}).get("system_prompt", "")
+        return self._cache["ocr_sys"]
     
     def get_search_query_template(self) -> str:
         """获取题解搜索查询模板"""
-        return self.prompts.get("search_solution", {}).get("query_template", "")
+        return self._cache["search_query"]
     
     def get_search_context_prefix(self) -> str:
         """获取题解搜索上下文前缀"""
-        return self.prompts.get("search_solution", {}).get("context_prefix", "")
+        return self._cache["search_prefix"]
     
     def get_no_solution_found_text(self) -> str:
         """获取未找到题解时的提示文本"""
-        return self.prompts.get("search_solution", {}).get("no_solution_found", "")
+        return self._cache["search_none"]
 
 
 # 全局单例
@@ -3,9 +3,20 @@
 
 from __future__ import annotations
 
-from typing import List, Dict
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Tuple
 from loguru import logger
 
+try:
+    import ahocorasick
+except ImportError:  # 可选依赖
+    ahocorasick = None
+
 
 # 优先搜索的高质量算法站点
 PRIORITY_SITES = [
@@ -26,11 +37,109 @@ SECONDARY_SITES = [
 ]
 
 
+# search_web 结果缓存：(query, max_results) -> (缓存时间, 结果)，LRU 淘汰 + TTL 过期
+_SEARCH_CACHE: "OrderedDict[Tuple[str, int], Tuple[float, List[Dict[str, str]]]]" = OrderedDict()
+_SEARCH_CACHE_LOCK = threading.Lock()
+_CACHE_MAX = 512
+_TTL = 3600.0
+
+
+def _cache_get(key: Tuple[str, int]) -> List[Dict[str, str]] | None:
+    with _SEARCH_CACHE_LOCK:
+        entry = _SEARCH_CACHE.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= _TTL:
+            del _SEARCH_CACHE[key]
+            return None
+        _SEARCH_CACHE.move_to_end(key)
+        # 结果项为扁平字符串字典，逐项复制即可隔离调用方修改
+        return [dict(r) for r in entry[1]]
+
+
+def _cache_put(key: Tuple[str, int], results: List[Dict[str, str]]) -> None:
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = (time.monotonic(), [dict(r) for r in results])
+        _SEARCH_CACHE.move_to_end(key)
+        while len(_SEARCH_CACHE) > _CACHE_MAX:
+            _SEARCH_CACHE.popitem(last=False)
+
+
+# 并发发出题解查询的共享线程池（网络等待期间释放 GIL）
+_SEARCH_WORKERS = 4
+_search_executor: ThreadPoolExecutor | None = None
+_search_executor_lock = threading.Lock()
+
+
+def _search_pool() -> ThreadPoolExecutor:
+    global _search_executor
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                _search_executor = ThreadPoolExecutor(max_workers=_SEARCH_WORKERS, thread_name_prefix="search")
+    return _search_executor
+
+
+# 算法相关词汇或竞赛平台（结果必须包含其一）
+_ALGO_KEYWORDS = (
+    "算法", "solution", "editorial", "题解", "代码", "解题",
+    "algorithm", "ac", "accepted", "复杂度", "思路",
+    "approach", "解法", "题意", "分析", "codeforces", "leetcode",
+    "luogu", "洛谷", "online judge", "oj", "competitive programming",
+    "atcoder", "csdn", "cnblogs", "博客园"
+)
+
+# 明显无关的内容（含教材和课本习题解答）
+_EXCLUDE_KEYWORDS = (
+    "microsoft", "windows", "office", "下载软件", "激活",
+    "download windows", "购买", "win10", "win11",
+    "excel", "word", "powerpoint", "outlook",
+    "系统安装", "驱动", "更新补丁",
+    # 排除教材习题解答
+    "textbook", "教材", "课本", "习题解答", "exercise solutions",
+    "munkres", "rudin", "sipser", "topology", "analysis",
+    "mathematical analysis", "theory of computation",
+    "solutions manual", "instructor", "student solutions",
+    "homework", "assignment", "教科书"
+)
+
+
+def _build_keyword_matcher(keywords: Tuple[str, ...]) -> Callable[[str], bool]:
+    """返回“文本是否包含任一关键词”的判定函数，与关键词数量无关地单次线性扫描"""
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for kw in keywords:
+            automaton.add_word(kw, kw)
+        automaton.make_automaton()
+        return lambda blob: next(automaton.iter(blob), None) is not None
+    pattern = re.compile("|".join(re.escape(kw) for kw in keywords))
+    return lambda blob: pattern.search(blob) is not None
+
+
+_has_algo_keyword = _build_keyword_matcher(_ALGO_KEYWORDS)
+_has_exclude_keyword = _build_keyword_matcher(_EXCLUDE_KEYWORDS)
+
+
+def _close_clients(clients: List[object], lock: threading.Lock) -> None:
+    """关闭并清空客户端列表（原地清空，供 close() 与 weakref.finalize 共用）"""
+    with lock:
+        pending = clients[:]
+        clients.clear()
+    for client in pending:
+        SearchEngine._exit_client(client)
+
+
 class SearchEngine:
     """搜索引擎（使用DuckDuckGo）"""
     
     def __init__(self):
         self._ddgs = None
+        # 每个线程复用一个 DDGS 客户端（连接池/TLS 会话跨查询复用，并发查询互不干扰）
+        self._local = threading.local()
+        self._clients: List[object] = []
+        self._clients_lock = threading.Lock()
+        # 实例被回收或进程退出时关闭客户端；回调不引用 self，不会延长实例生命周期
+        weakref.finalize(self, _close_clients, self._clients, self._clients_lock)
     
     def _get_ddgs(self):
         """延迟初始化DDGS"""
@@ -49,6 +158,41 @@ class SearchEngine:
                 raise
         return self._ddgs
     
+    def _get_client(self):
+        """获取当前线程的 DDGS 客户端（首次调用时创建）"""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            DDGS = self._get_ddgs()
+            client = DDGS()
+            client.__enter__()
+            self._local.client = client
+            with self._clients_lock:
+                self._clients.append(client)
+        return client
+    
+    def _discard_client(self):
+        """丢弃当前线程的客户端（请求失败后下次重新创建）"""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            return
+        self._local.client = None
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+        self._exit_client(client)
+    
+    @staticmethod
+    def _exit_client(client):
+        try:
+            client.__exit__(None, None, None)
+        except Exception as e:
+            logger.debug(f"关闭DDGS客户端失败: {e}")
+    
+    def close(self):
+        """关闭所有线程创建的 DDGS 客户端"""
+        _close_clients(self._clients, self._clients_lock)
+        self._local = threading.local()
+    
     def search_web(self, query: str, max_results: int = 10) -> List[Dict[str, str]]:
         """
         使用DuckDuckGo搜索
@@ -60,35 +204,42 @@ class SearchEngine:
         Returns:
             搜索结果列表 [{title, url, snippet}]
         """
+        key = (query, max_results)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            DDGS = self._get_ddgs()
+            ddgs = self._get_client()
             results = []
             
-            with DDGS() as ddgs:
-                # 尝试获取更详细的搜索结果
-                for r in ddgs.text(
-                    query, 
-                    max_results=max_results, 
-                    region="wt-wt",  # 改为全球搜索，获得更多结果
-                    safesearch="off",  # 关闭安全搜索以获得更多技术内容
-                    backend="auto"  # 自动选择最佳后端
-                ):
-                    # 提取更完整的snippet
-                    snippet = r.get("body", "")
-                    if not snippet or len(snippet) < 20:
-                        # 如果snippet太短，尝试使用title作为补充
-                        snippet = r.get("title", "") + " - " + snippet
-                    
-                    results.append({
-                        "title": r.get("title", ""),
-                        "url": r.get("href", ""),
-                        "snippet": snippet
-                    })
+            # 尝试获取更详细的搜索结果
+            for r in ddgs.text(
+                query, 
+                max_results=max_results, 
+                region="wt-wt",  # 改为全球搜索，获得更多结果
+                safesearch="off",  # 关闭安全搜索以获得更多技术内容
+                backend="auto"  # 自动选择最佳后端
+            ):
+                # 提取更完整的snippet
+                snippet = r.get("body", "")
+                if not snippet or len(snippet) < 20:
+                    # 如果snippet太短，尝试使用title作为补充
+                    snippet = r.get("title", "") + " - " + snippet
+                
+                results.append({
+                    "title": r.get("title", ""),
+                    "url": r.get("href", ""),
+                    "snippet": snippet
+                })
             
+            # 只缓存成功的查询；失败（返回空列表）下次仍会重试
+            _cache_put(key, results)
             return results
         
         except Exception as e:
             logger.error(f"DuckDuckGo搜索失败: {e}")
+            self._discard_client()
             return []
     
     def search_acm_solution(self, problem_id: str, title: str = "", 
@@ -139,40 +290,48 @@ class SearchEngine:
             variants = [v for v in variants if v]
             
             # 生成查询组合（优先高质量站点）
-            queries = []
-            
-            # 第一轮：优先站点 + 强关键词
-            for v in variants[:2]:  # 只用前2个变体
-                for site in PRIORITY_SITES:
-                    queries.append(f"{v} {site}")
-            
+            # 第一轮：优先站点 + 强关键词（只用前2个变体）
+            priority_queries = [f"{v} {site}" for v in variants[:2] for site in PRIORITY_SITES]
             # 第二轮：通用搜索（带强关键词）
-            for v in variants:
-                queries.append(v)
+            queries = priority_queries + variants
+            
+            # 规范空白后去重（标题/描述为空时多个变体会退化成同一查询）
+            queries = list(dict.fromkeys(" ".join(q.split()) for q in queries))
+            n_priority = len(dict.fromkeys(" ".join(q.split()) for q in priority_queries))
             
-            # 执行搜索并去重
+            # 执行搜索并去重：每轮查询并发发出，结果按查询顺序合并，够数即停止
             seen_urls = set()
             raw_results = []
+            limit = max_results * 3  # 多搜索一些，后续过滤
             
-            for q in queries:
-                if len(raw_results) >= max_results * 3:  # 多搜索一些，后续过滤
+            for batch in (queries[:n_priority], queries[n_priority:]):
+                if len(raw_results) >= limit:
                     break
-                
-                # 对每个查询搜索少量结果
+                futures = [(q, _search_pool().submit(self.search_web, q, 3)) for q in batch]
                 try:
-                    for item in self.search_web(q, max_results=3):
-                        url = item.get("url", "")
-                        if not url or url in seen_urls:
-                            continue
-                        
-                        seen_urls.add(url)
-                        raw_results.append(item)
-                        
-                        if len(raw_results) >= max_results * 3:
+                    for q, future in futures:
+                        if len(raw_results) >= limit:
                             break
-                except Exception as e:
-                    logger.debug(f"查询失败: {q}, 错误: {e}")
-                    continue
+                        # 对每个查询搜索少量结果
+                        try:
+                            items = future.result()
+                        except Exception as e:
+                            logger.debug(f"查询失败: {q}, 错误: {e}")
+                            continue
+                        for item in items:
+                            url = item.get("url", "")
+                            if not url or url in seen_urls:
+                                continue
+                            
+                            seen_urls.add(url)
+                            raw_results.append(item)
+                            
+                            if len(raw_results) >= limit:
+                                break
+                finally:
+                    # 已够数时取消尚未开始的查询
+                    for _, future in futures:
+                        future.cancel()
             
             # 过滤相关性
             filtered_results = self._filter_relevant(raw_results, problem_id, title)
@@ -192,38 +351,14 @@ class SearchEngine:
         filtered = []
         
         for r in results:
-            # 检查标题、摘要和URL
-            text = (r.get('title', '') + " " + r.get('snippet', '')).lower()
-            url = r.get('url', '').lower()
-            
+            # 检查标题、摘要和URL：一次拼接、一次小写化，先排除明显无关的内容，无关结果不再检查算法词汇
+            blob = (r.get('title', '') + " " + r.get('snippet', '') + "\n" + r.get('url', '')).lower()
+            if _has_exclude_keyword(blob):
+                continue
             # 必须包含算法相关词汇或竞赛平台
-            algo_keywords = [
-                "算法", "solution", "editorial", "题解", "代码", "解题",
-                "algorithm", "ac", "accepted", "复杂度", "思路",
-                "approach", "解法", "题意", "分析", "codeforces", "leetcode",
-                "luogu", "洛谷", "online judge", "oj", "competitive programming",
-                "atcoder", "csdn", "cnblogs", "博客园"
-            ]
-            has_algo = any(kw in text or kw in url for kw in algo_keywords)
-            
-            # 过滤明显无关的内容（增加教材和课本检测）
-            exclude_keywords = [
-                "microsoft", "windows", "office", "下载软件", "激活",
-                "download windows", "购买", "win10", "win11",
-                "excel", "word", "powerpoint", "outlook",
-                "系统安装", "驱动", "更新补丁",
-                # 排除教材习题解答
-                "textbook", "教材", "课本", "习题解答", "exercise solutions",
-                "munkres", "rudin", "sipser", "topology", "analysis",
-                "mathematical analysis", "theory of computation",
-                "solutions manual", "instructor", "student solutions",
-                "homework", "assignment", "教科书"
-            ]
-            has_exclude = any(kw in text or kw in url for kw in exclude_keywords)
-            
-            # 通过算法关键词检查且无排除词
-            if has_algo and not has_exclude:
-                filtered.append(r)
+            if not _has_algo_keyword(blob):
+                continue
+            filtered.append(r)
         
         return filtered
 
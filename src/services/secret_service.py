@@ -7,7 +7,9 @@
 """
 
 import os
+import re
 import threading
+from functools import lru_cache
 from typing import Optional
 from loguru import logger
 
@@ -17,6 +19,12 @@ except ImportError:
     raise ImportError("请安装 cryptography: pip install cryptography")
 
 
+@lru_cache(maxsize=4)
+def _sensitive_pattern(keys: frozenset) -> re.Pattern:
+    """敏感字段名子串的交替正则（字段名包含任一子串即视为敏感）"""
+    return re.compile("|".join(re.escape(k) for k in sorted(keys)))
+
+
 class SecretService:
     """
     敏感信息加密服务（单例）
@@ -52,6 +60,9 @@ class SecretService:
         self._db = db
         self._cipher: Optional[Fernet] = None
         self._key: Optional[str] = None
+        # 加密器初始化后绑定的加解密方法（批量处理字段时省去属性查找）
+        self._enc_fn = None
+        self._dec_fn = None
         self._initialized = True
         
         logger.info("[SecretService] 加密服务初始化完成")
@@ -68,6 +79,13 @@ class SecretService:
             self._db = get_database()
         return self._db
     
+    def _set_cipher(self, cipher: Fernet) -> Fernet:
+        """设置加密器并绑定加解密方法"""
+        self._cipher = cipher
+        self._enc_fn = cipher.encrypt
+        self._dec_fn = cipher.decrypt
+        return cipher
+    
     @property
     def cipher(self) -> Fernet:
         """获取加密器（懒加载）"""
@@ -78,8 +96,7 @@ class SecretService:
         try:
             self._key = self.db.get_system_config("encryption_key")
             if self._key:
-                self._cipher = Fernet(self._key.encode())
-                return self._cipher
+                return self._set_cipher(Fernet(self._key.encode()))
         except Exception as e:
             logger.debug(f"从数据库获取加密密钥失败: {e}")
         
@@ -87,14 +104,13 @@ class SecretService:
         self._key = os.getenv("OJO_ENCRYPTION_KEY")
         if self._key:
             try:
-                self._cipher = Fernet(self._key.encode())
-                return self._cipher
+                return self._set_cipher(Fernet(self._key.encode()))
             except Exception:
                 logger.warning("环境变量中的加密密钥无效，将生成新密钥")
         
         # 3. 生成新密钥
         self._key = Fernet.generate_key().decode()
-        self._cipher = Fernet(self._key.encode())
+        self._set_cipher(Fernet(self._key.encode()))
         
         # 存储到数据库
         try:
@@ -119,8 +135,9 @@ class SecretService:
             return ""
         
         try:
-            encrypted = self.cipher.encrypt(plaintext.encode('utf-8'))
-            return encrypted.decode('utf-8')
+            if self._enc_fn is None:
+                _ = self.cipher  # 懒加载并绑定加解密方法
+            return self._enc_fn(plaintext.encode('utf-8')).decode('utf-8')
         except Exception as e:
             logger.error(f"加密失败: {e}")
             return plaintext  # 失败时返回原文（避免数据丢失）
@@ -139,8 +156,9 @@ class SecretService:
             return ""
         
         try:
-            decrypted = self.cipher.decrypt(ciphertext.encode('utf-8'))
-            return decrypted.decode('utf-8')
+            if self._dec_fn is None:
+                _ = self.cipher  # 懒加载并绑定加解密方法
+            return self._dec_fn(ciphertext.encode('utf-8')).decode('utf-8')
         except InvalidToken:
             # 可能是旧的明文数据，直接返回
             logger.debug("解密失败（可能是明文数据），返回原值")
@@ -151,14 +169,8 @@ class SecretService:
     
     def is_encrypted(self, value: str) -> bool:
         """检查值是否已加密"""
-        if not value:
-            return False
-        
-        try:
-            # Fernet 加密的数据以 gAAAAA 开头
-            return value.startswith('gAAAAA')
-        except Exception:
-            return False
+        # Fernet 加密的数据以 gAAAAA 开头（版本字节 0x80 + 时间戳高位）；非字符串一律视为未加密
+        return isinstance(value, str) and value[:6] == 'gAAAAA'
     
     def encrypt_dict(self, data: dict, keys: set = None) -> dict:
         """
@@ -174,12 +186,11 @@ class SecretService:
         if not data:
             return data
         
-        keys = keys or self.SENSITIVE_KEYS
+        pattern = _sensitive_pattern(frozenset(keys or self.SENSITIVE_KEYS))
         result = data.copy()
         
         for key, value in result.items():
-            key_lower = key.lower()
-            if any(sensitive in key_lower for sensitive in keys):
+            if pattern.search(key.lower()):
                 if value and isinstance(value, str) and not self.is_encrypted(value):
                     result[key] = self.encrypt(value)
         
@@ -199,12 +210,11 @@ class SecretService:
         if not data:
             return data
         
-        keys = keys or self.SENSITIVE_KEYS
+        pattern = _sensitive_pattern(frozenset(keys or self.SENSITIVE_KEYS))
         result = data.copy()
         
         for key, value in result.items():
-            key_lower = key.lower()
-            if any(sensitive in key_lower for sensitive in keys):
+            if pattern.search(key.lower()):
                 if value and isinstance(value, str) and self.is_encrypted(value):
                     result[key] = self.decrypt(value)
         
@@ -224,7 +234,7 @@ class SecretService:
             
             # 更新密钥
             self._key = key
-            self._cipher = test_cipher
+            self._set_cipher(test_cipher)
             
             # 存储到数据库
             self.db.set_system_config("encryption_key", key)
@@ -1,20 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import math
+import re
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
-import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from loguru import logger
 
 from services.unified_config import AppConfig, ConfigManager
 from services.oj_api import OJApi, OJAuth
 from utils.concurrency import CancelToken, retry_with_backoff
+from wash import normalize_test_cases  # 复用 CLI 逻辑
 from wash import prepare_update_payload as cli_prepare_update_payload
 
+try:
+    import ahocorasick
+except ImportError:  # 可选依赖
+    ahocorasick = None
+
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 SRC_DIR = ROOT_DIR / "src"
@@ -29,6 +38,10 @@ DEFAULT_FIELDS: Sequence[str] = (
     "remark",
 )
 DEFAULT_KEYWORDS: Sequence[str] = ("童程同美",)
+# 每个工作线程一次顺序处理的连续题号数（上限；范围较小时按线程数均分）
+_CHUNK_SIZE = 64
+# (pid, payload, changes, 异常)
+_ChunkItem = Tuple[int, Optional[Dict[str, object]], Dict[str, int], Optional[Exception]]
 
 
 @dataclass
@@ -61,17 +74,77 @@ class WashProblemResult:
     error: Optional[str] = None
 
 
-def sanitize_text(value: str, keywords: Sequence[str], replacement: str) -> Tuple[str, int]:
-    total_hits = 0
-    text = value
-    for kw in keywords:
-        if not kw:
+# 关键词元组 -> 已构建的 Aho-Corasick 自动机
+_automata: Dict[Tuple[str, ...], object] = {}
+
+
+def _keyword_automaton(keywords: Tuple[str, ...]):
+    automaton = _automata.get(keywords)
+    if automaton is None:
+        automaton = ahocorasick.Automaton()
+        for kw in keywords:
+            if kw:
+                automaton.add_word(kw, len(kw))
+        automaton.make_automaton()
+        _automata[keywords] = automaton
+    return automaton
+
+
+def _sanitize_text_ac(value: str, keywords: Tuple[str, ...], replacement: str) -> Tuple[str, int]:
+    """一次线性扫描找出所有关键词（最长、不重叠匹配），再一次 join 重建字符串"""
+    parts: List[str] = []
+    cursor = 0
+    hits = 0
+    for end, length in _keyword_automaton(keywords).iter_long(value):
+        start = end - length + 1
+        if start < cursor:
             continue
-        count = text.count(kw)
-        if count:
-            text = text.replace(kw, replacement)
-            total_hits += count
-    return text, total_hits
+        parts.append(value[cursor:start])
+        parts.append(replacement)
+        cursor = end + 1
+        hits += 1
+    if not hits:
+        return value, 0
+    parts.append(value[cursor:])
+    return "".join(parts), hits
+
+
+@lru_cache(maxsize=32)
+def _kw_regex(keywords: Tuple[str, ...]) -> re.Pattern:
+    """关键词交替正则；长关键词在前，与自动机一致取最长匹配"""
+    return re.compile("|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True)))
+
+
+def sanitize_text(value: str, keywords: Sequence[str], replacement: str) -> Tuple[str, int]:
+    keywords = tuple(kw for kw in keywords if kw)
+    if not keywords:
+        return value, 0
+    if len(keywords) == 1:
+        # 单关键词（默认配置）：未命中时只做一次可提前退出的子串查找
+        kw = keywords[0]
+        if kw not in value:
+            return value, 0
+        return value.replace(kw, replacement), value.count(kw)
+    if ahocorasick is not None:
+        return _sanitize_text_ac(value, keywords, replacement)
+    # 未安装 pyahocorasick：编译后的交替正则在 C 中单次扫描
+    return _kw_regex(keywords).subn(lambda _m: replacement, value)
+
+
+def payload_has_keywords(
+    payload: Dict[str, object],
+    keywords: Sequence[str],
+    fields: Sequence[str],
+) -> bool:
+    """快速预检：任一字段包含任一关键词（绝大多数题目不命中，可跳过完整清洗）"""
+    target = payload.get("problem")
+    if not isinstance(target, dict):
+        target = payload
+    for name in fields:
+        value = target.get(name)
+        if isinstance(value, str) and any(kw in value for kw in keywords if kw):
+            return True
+    return False
 
 
 def sanitize_problem_payload(
@@ -85,13 +158,14 @@ def sanitize_problem_payload(
         target = payload
 
     changes: Dict[str, int] = {}
-    for field in fields:
-        original = target.get(field)
-        if isinstance(original, str):
-            new_text, hits = sanitize_text(original, keywords, replacement)
-            if hits:
-                target[field] = new_text
-                changes[field] = hits
+    for name in fields:
+        original = target.get(name)
+        if not isinstance(original, str):
+            continue
+        new_text, hits = sanitize_text(original, keywords, replacement)
+        if hits:
+            target[name] = new_text
+            changes[name] = hits
     return changes
 
 
@@ -152,7 +226,14 @@ class SHSOJWashService:
                     logger.debug("wash on_log callback failed", exc_info=True)
             logger.info(msg)
 
-        api = OJApi(base_url=base_url, timeout=30, proxies=proxies or None, verify_ssl=verify_ssl)
+        # 所有工作线程共用登录 Session 的连接池（keep-alive 复用，按线程数留出余量）
+        api = OJApi(
+            base_url=base_url,
+            timeout=30,
+            proxies=proxies or None,
+            verify_ssl=verify_ssl,
+            pool_maxsize=max(1, task_cfg.workers) * 2,
+        )
         _log(f"正在登录 SHSOJ（{base_url}）...")
         auth = retry_with_backoff(
             lambda: api.login_user(username, password),
@@ -166,26 +247,51 @@ class SHSOJWashService:
         if not keywords:
             keywords = DEFAULT_KEYWORDS
         fields = tuple(field.strip() for field in task_cfg.fields if field.strip())
-        pids = list(range(task_cfg.start, task_cfg.end + 1))
+        pids = range(task_cfg.start, task_cfg.end + 1)
         stats.scanned = len(pids)
         self.stop()
         self._cancel = CancelToken()
-        self._executor = ThreadPoolExecutor(max_workers=max(1, task_cfg.workers))
-
-        futures: Dict[Future, int] = {}
-        for pid in pids:
-            if self._cancel.cancelled():
-                break
-            futures[self._executor.submit(self._fetch_and_sanitize, api, auth, pid, keywords, task_cfg, fields)] = pid
+        workers = max(1, task_cfg.workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+        # 每个任务顺序处理一段连续题号（服务端对相邻题目的缓存更友好）；
+        # 滑动窗口：最多 workers * 2 段在途，每完成一段再提交下一段，
+        # 内存占用与扫描范围无关，取消后不再提交新任务；
+        # 范围不足 _CHUNK_SIZE * workers 时缩小段长，保证所有线程都有活干
+        chunk_size = max(1, min(_CHUNK_SIZE, math.ceil(len(pids) / workers)))
+        chunk_iter = (pids[i:i + chunk_size] for i in range(0, len(pids), chunk_size))
+        futures: Dict[Future, range] = {}
+
+        def _submit_next() -> None:
+            executor = self._executor
+            if executor is None or self._cancel.cancelled():
+                return
+            chunk = next(chunk_iter, None)
+            if chunk is None:
+                return
+            try:
+                future = executor.submit(self._fetch_chunk, api, auth, chunk, keywords, task_cfg, fields)
+            except RuntimeError:  # 线程池已被 stop() 关闭
+                return
+            futures[future] = chunk
+
+        def _completed() -> Iterator[_ChunkItem]:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    futures.pop(future)
+                    _submit_next()
+                    if not future.cancelled():
+                        yield from future.result()
+
+        for _ in range(workers * 2):
+            _submit_next()
 
         consecutive_failures = 0
-        for future in as_completed(futures):
-            pid = futures[future]
+        for pid, payload, changes, exc in _completed():
             if self._cancel.cancelled():
                 break
-            try:
-                payload, changes = future.result()
-            except Exception as exc:
+            if exc is not None:
                 stats.failures += 1
                 consecutive_failures += 1
                 if on_problem:
@@ -216,8 +322,6 @@ class SHSOJWashService:
                     try:
                         raw_cases = api.fetch_problem_cases(auth, pid)
                         if raw_cases:
-                            from wash import normalize_test_cases  # 复用 CLI 逻辑
-
                             normalized_cases = normalize_test_cases(pid, raw_cases)
                             if normalized_cases:
                                 payload["testCaseScore"] = normalized_cases
@@ -273,6 +377,23 @@ class SHSOJWashService:
             except Exception:
                 logger.debug("wash on_progress callback failed", exc_info=True)
 
+    async def run_async(
+        self,
+        task_cfg: WashTaskConfig,
+        *,
+        on_log=None,
+        on_progress=None,
+        on_problem=None,
+    ) -> None:
+        """在工作线程中执行 run()，供异步调用方使用而不阻塞事件循环"""
+        await asyncio.to_thread(
+            self.run,
+            task_cfg,
+            on_log=on_log,
+            on_progress=on_progress,
+            on_problem=on_problem,
+        )
+
     def _resolve_proxies(self, cfg: AppConfig) -> Dict[str, str]:
         if getattr(cfg, "proxy_enabled", False):
             if cfg.http_proxy or cfg.https_proxy:
@@ -318,6 +439,28 @@ class SHSOJWashService:
         """直接复用 wash.py 的实现，保证与 CLI wash 行为一致"""
         return cli_prepare_update_payload(flat_payload, include_cases=include_cases)
 
+    def _fetch_chunk(
+        self,
+        api: OJApi,
+        auth: OJAuth,
+        pids: Iterable[int],
+        keywords: Sequence[str],
+        task_cfg: WashTaskConfig,
+        fields: Sequence[str],
+    ) -> List[_ChunkItem]:
+        """顺序拉取并清洗一段连续题号；单题失败记录异常后继续，取消时提前结束"""
+        results: List[_ChunkItem] = []
+        for pid in pids:
+            if self._cancel.cancelled():
+                break
+            try:
+                payload, changes = self._fetch_and_sanitize(api, auth, pid, keywords, task_cfg, fields)
+            except Exception as exc:  # noqa: PIE786
+                results.append((pid, None, {}, exc))
+                continue
+            results.append((pid, payload, changes, None))
+        return results
+
     def _fetch_and_sanitize(
         self,
         api: OJApi,
@@ -334,6 +477,8 @@ class SHSOJWashService:
             time.sleep(task_cfg.delay)
         if not payload:
             return None, {}
+        if not payload_has_keywords(payload, keywords, fields):
+            return payload, {}
         changes = sanitize_problem_payload(payload, keywords, task_cfg.replacement, fields)
         return payload, changes
 
@@ -3,13 +3,21 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import re
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any, TYPE_CHECKING
+from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
 from loguru import logger
 
 from services.oj_api import OJApi, OJAuth
 from services.prompt_manager import get_prompt_manager
+from utils import fast_json
+
+try:
+    import msgpack
+except ImportError:  # 可选依赖
+    msgpack = None
 
 if TYPE_CHECKING:
     from services.llm.base import BaseLLMClient
@@ -18,6 +26,9 @@ if TYPE_CHECKING:
 class SolutionSearcher:
     """题解搜索器"""
     
+    # 算法相关关键词（格式化保留摘要、总结门槛共用）
+    _ALGO_KEYWORDS = ("算法", "思路", "解法", "复杂度", "algorithm", "solution", "approach")
+    
     def __init__(self, oj_api: OJApi, workspace: Path, enable_search: bool = True, log_callback=None):
         """
         初始化题解搜索器
@@ -34,15 +45,39 @@ class SolutionSearcher:
         self.log_callback = log_callback or (lambda msg: None)
         self.cache_dir = workspace / ".solution_cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 总结门槛：信息量过少时跳过LLM总结，直接格式化
+        self.summary_min_chars = 400
+        self.summary_require_keywords = True
     
     def _log(self, pid: str, msg: str):
         """记录日志"""
         self.log_callback(f"[{pid}] {msg}")
     
     def _cache_file(self, problem_id: str) -> Path:
-        """缓存文件路径（内部辅助）"""
+        """缓存文件路径（内部辅助）：有 msgpack 时用 .msgpack，否则 .json"""
+        suffix = ".msgpack" if msgpack is not None else ".json"
+        return self.cache_dir / f"{problem_id}{suffix}"
+    
+    def _legacy_cache_file(self, problem_id: str) -> Path:
+        """旧版 JSON 缓存文件路径（内部辅助）"""
         return self.cache_dir / f"{problem_id}.json"
     
+    @staticmethod
+    def _decode_cache(path: Path) -> Dict[str, Any]:
+        """按扩展名解码缓存文件（内部辅助）"""
+        raw = path.read_bytes()
+        if path.suffix == ".msgpack":
+            return msgpack.unpackb(raw, raw=False)
+        return fast_json.loads(raw)
+    
+    @staticmethod
+    def _encode_cache(path: Path, data: Dict[str, Any]):
+        """按扩展名编码并写入缓存文件（内部辅助）"""
+        if path.suffix == ".msgpack":
+            path.write_bytes(msgpack.packb(data, use_bin_type=True))
+        else:
+            path.write_bytes(fast_json.dumps(data))
+    
     def search_solutions(self, auth: OJAuth, problem_id: str, title: str = "", 
                         description: str = "", limit: int = 3, 
                         summary_llm: 'BaseLLMClient' = None) -> Optional[str]:
@@ -85,8 +120,8 @@ class SolutionSearcher:
         # 将搜索结果写入日志
         self._write_solutions_to_log(problem_id, solutions)
         
-        # 如果启用总结且有总结LLM，总结搜索结果
-        if summary_llm and len(solutions) > 0:
+        # 如果启用总结且有总结LLM，总结搜索结果（信息量过少时跳过）
+        if summary_llm and len(solutions) > 0 and self._worth_summarizing(problem_id, solutions):
             try:
                 self._log(problem_id, "正在总结搜索结果...")
                 summary = self._summarize_results(problem_id, title, solutions, summary_llm)
@@ -112,6 +147,58 @@ class SolutionSearcher:
         
         return formatted
     
+    async def search_solutions_async(self, auth: OJAuth, problem_id: str, title: str = "",
+                                     description: str = "", limit: int = 3,
+                                     summary_llm: 'BaseLLMClient' = None) -> Optional[str]:
+        """search_solutions 的异步版本
+        
+        整个搜索流程（缓存读写、日志写入、阻塞的 LLM 总结）放到线程中执行，
+        不阻塞事件循环。
+        """
+        return await asyncio.to_thread(
+            self.search_solutions, auth, problem_id, title, description, limit, summary_llm
+        )
+    
+    async def search_many(self, auths_problems: List[Tuple[OJAuth, str, str, str]],
+                          concurrency: Optional[int] = None, limit: int = 3,
+                          summary_llm: 'BaseLLMClient' = None) -> Dict[str, Optional[str]]:
+        """并发搜索多道题的题解
+        
+        Args:
+            auths_problems: (auth, problem_id, title, description) 列表
+            concurrency: 最大同时在途请求数，默认取并发配置的 max_llm_concurrent
+            limit: 每题最多获取的题解数量
+            summary_llm: 用于总结搜索结果的LLM客户端（可选）
+        
+        Returns:
+            {problem_id: 格式化的题解文本或None}
+        """
+        if concurrency is None:
+            concurrency = self._default_concurrency()
+        sem = asyncio.Semaphore(max(1, int(concurrency)))
+        
+        async def _one(auth: OJAuth, pid: str, title: str, description: str) -> Optional[str]:
+            async with sem:
+                try:
+                    return await self.search_solutions_async(
+                        auth, pid, title, description, limit, summary_llm
+                    )
+                except Exception as e:
+                    logger.warning(f"[{pid}] 搜索题解失败: {e}")
+                    return None
+        
+        results = await asyncio.gather(*(_one(*item) for item in auths_problems))
+        return {item[1]: res for item, res in zip(auths_problems, results)}
+    
+    @staticmethod
+    def _default_concurrency() -> int:
+        """默认并发数：跟随 LLM 并发配置（内部辅助）"""
+        try:
+            from services.concurrency_manager import get_concurrency_manager
+            return get_concurrency_manager().config.max_llm_concurrent
+        except Exception:
+            return 16
+    
     def _search_from_web(self, problem_id: str, title: str, description_snippet: str, limit: int) -> List[Dict[str, Any]]:
         """从网络搜索题解
         
@@ -178,6 +265,28 @@ class SolutionSearcher:
         #     logger.warning(f"[{problem_id}] 网络搜索题解失败: {e}")
         #     return []
     
+    def _worth_summarizing(self, problem_id: str, solutions: List[Dict[str, Any]]) -> bool:
+        """判断搜索结果是否值得调用LLM总结（内部辅助）
+        
+        单条结果、摘要总长不足 summary_min_chars、或（要求关键词时）无任何
+        算法关键词，均直接格式化，省去一次LLM往返。
+        """
+        if len(solutions) <= 1:
+            reason = "仅1条结果"
+        else:
+            total_chars = sum(len(sol.get("snippet", "")) for sol in solutions)
+            if total_chars < self.summary_min_chars:
+                reason = f"摘要总长 {total_chars} < {self.summary_min_chars}"
+            elif self.summary_require_keywords and not any(
+                kw in sol.get("snippet", "").lower()
+                for sol in solutions for kw in self._ALGO_KEYWORDS
+            ):
+                reason = "无算法关键词"
+            else:
+                return True
+        logger.debug(f"[{problem_id}] 跳过搜索结果总结: {reason}")
+        return False
+    
     def _format_solutions(self, solutions: List[Dict[str, Any]], problem_id: str) -> str:
         """格式化题解为提示词附加内容（简洁版，不影响模型发挥）"""
         if not solutions:
@@ -205,8 +314,8 @@ class SolutionSearcher:
                 # 提取关键信息，避免过长
                 snippet = sol['snippet']
                 # 如果摘要中有算法关键词，优先保留
-                keywords = ["算法", "思路", "解法", "复杂度", "algorithm", "solution", "approach"]
-                has_keywords = any(kw in snippet.lower() for kw in keywords)
+                snippet_lower = snippet.lower()
+                has_keywords = any(kw in snippet_lower for kw in self._ALGO_KEYWORDS)
                 
                 if has_keywords or len(snippet) <= 200:
                     formatted_parts.append(f"   摘要: {snippet}")
@@ -291,21 +400,8 @@ class SolutionSearcher:
         except Exception as e:
             logger.debug(f"写入题解到日志失败: {e}")
     
-    def _summarize_results(self, problem_id: str, problem_title: str, 
-                          solutions: List[Dict[str, Any]], llm_client) -> str:
-        """使用LLM总结搜索结果"""
-        try:
-            # 构建总结prompt
-            summary_prompt = f"题目: {problem_title} (ID: {problem_id})\n\n"
-            summary_prompt += f"以下是搜索到的{len(solutions)}条参考资源：\n\n"
-            
-            for idx, sol in enumerate(solutions, 1):
-                summary_prompt += f"{idx}. {sol.get('title', '未知标题')}\n"
-                snippet = sol.get('snippet', '')[:300]  # 每条最多300字
-                if snippet:
-                    summary_prompt += f"   {snippet}\n\n"
-            
-            summary_prompt += """
+    # 单题总结的输出格式要求（批量总结时对每道题重复使用）
+    _SUMMARY_TEMPLATE = """
 请从上述资源中提取关键信息，输出格式：
 
 **算法思路**: （1-2句话概括核心算法）
@@ -314,12 +410,37 @@ class SolutionSearcher:
 
 要求：简洁、准确、仅提取算法相关信息，忽略无关内容。如果资源无关或无效，请输出"无有效信息"。
 """
+    
+    _SUMMARY_SYSTEM_PROMPT = "You are an algorithm expert. Extract key algorithmic insights concisely."
+    
+    # 批量总结输出分段标记：### Problem i
+    _BATCH_SECTION_RE = re.compile(r"^###\s*Problem\s+(\d+)\s*$", re.MULTILINE)
+    
+    def _build_summary_sources(self, problem_id: str, problem_title: str,
+                               solutions: List[Dict[str, Any]]) -> str:
+        """构建单题的总结输入（题目 + 参考资源列表）"""
+        parts = [f"题目: {problem_title} (ID: {problem_id})\n\n",
+                 f"以下是搜索到的{len(solutions)}条参考资源：\n\n"]
+        for idx, sol in enumerate(solutions, 1):
+            parts.append(f"{idx}. {sol.get('title', '未知标题')}\n")
+            snippet = sol.get('snippet', '')[:300]  # 每条最多300字
+            if snippet:
+                parts.append(f"   {snippet}\n\n")
+        return "".join(parts)
+    
+    def _summarize_results(self, problem_id: str, problem_title: str, 
+                          solutions: List[Dict[str, Any]], llm_client) -> str:
+        """使用LLM总结搜索结果"""
+        try:
+            # 构建总结prompt
+            summary_prompt = self._build_summary_sources(problem_id, problem_title, solutions)
+            summary_prompt += self._SUMMARY_TEMPLATE
             
             # 调用LLM总结（非流式，快速返回）
             content, _ = llm_client.chat_completion(
                 summary_prompt,
                 stream=False,
-                system_prompt="You are an algorithm expert. Extract key algorithmic insights concisely."
+                system_prompt=self._SUMMARY_SYSTEM_PROMPT
             )
             
             return content if content else ""
@@ -328,6 +449,77 @@ class SolutionSearcher:
             logger.error(f"总结搜索结果失败: {e}")
             return ""
     
+    def summarize_batch(self, items: List[Tuple[str, str, List[Dict[str, Any]]]],
+                        llm_client, batch_size: int = 8) -> Dict[str, str]:
+        """批量总结多道题的搜索结果
+        
+        每 batch_size 道题合并为一次 LLM 调用，输出按 ``### Problem i`` 分段后
+        拆回各题，分别写日志并缓存。缺失或为空的分段回退到原始格式化。
+        batch_size 越大单次延迟越高，一般取 4~8。
+        
+        Args:
+            items: (problem_id, title, solutions) 列表
+            llm_client: 用于总结的LLM客户端
+            batch_size: 每次调用合并的题目数
+        
+        Returns:
+            {problem_id: 格式化的题解文本}
+        """
+        batch_size = max(1, int(batch_size))
+        results: Dict[str, str] = {}
+        items = [it for it in items if it[2]]
+        
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            summaries: Dict[int, str] = {}
+            try:
+                prompt_parts = []
+                for idx, (pid, title, solutions) in enumerate(batch, 1):
+                    prompt_parts.append(f"Problem {idx}:\n")
+                    prompt_parts.append(self._build_summary_sources(pid, title, solutions))
+                    prompt_parts.append(self._SUMMARY_TEMPLATE)
+                    prompt_parts.append("\n")
+                prompt_parts.append(
+                    f"请对以上 {len(batch)} 道题分别输出总结，"
+                    f"每道题以单独一行 `### Problem i` 开头（i 为题目序号）。\n"
+                )
+                
+                content, _ = llm_client.chat_completion(
+                    "".join(prompt_parts),
+                    stream=False,
+                    system_prompt=(
+                        self._SUMMARY_SYSTEM_PROMPT
+                        + " Return one `### Problem i` delimited block per problem, in order."
+                    )
+                )
+                summaries = self._split_batch_summary(content or "")
+            except Exception as e:
+                logger.error(f"批量总结搜索结果失败: {e}")
+            
+            for idx, (pid, title, solutions) in enumerate(batch, 1):
+                summary = summaries.get(idx, "")
+                if summary:
+                    self._log(pid, "✓ 搜索结果已总结（批量）")
+                    self._write_summary_to_log(pid, summary)
+                    formatted = self._build_summary_context(summary)
+                else:
+                    formatted = self._format_solutions(solutions, pid)
+                self._save_to_cache(pid, formatted)
+                results[pid] = formatted
+        
+        return results
+    
+    def _split_batch_summary(self, content: str) -> Dict[int, str]:
+        """按 ``### Problem i`` 拆分批量总结输出（内部辅助）"""
+        sections: Dict[int, str] = {}
+        matches = list(self._BATCH_SECTION_RE.finditer(content))
+        for i, m in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+            body = content[m.end():end].strip()
+            if body:
+                sections.setdefault(int(m.group(1)), body)
+        return sections
+    
     def _write_summary_to_log(self, problem_id: str, summary: str):
         """将总结写入problem.log"""
         try:
@@ -361,18 +553,25 @@ class SolutionSearcher:
         """从缓存加载题解（带过期检查）"""
         try:
             cache_file = self._cache_file(problem_id)
-            if cache_file.exists():
-                data = json.loads(cache_file.read_text(encoding="utf-8"))
-                
-                # 检查缓存是否过期
-                cached_at = data.get("cached_at", 0)
-                import time
-                if time.time() - cached_at > self.CACHE_TTL_SECONDS:
-                    logger.debug(f"[{problem_id}] 缓存已过期，将重新搜索")
-                    cache_file.unlink()  # 删除过期缓存
+            if not cache_file.exists():
+                # 一次性迁移：旧版 .json 缓存转为 .msgpack
+                legacy = self._legacy_cache_file(problem_id)
+                if legacy == cache_file or not legacy.exists():
                     return None
-                
-                return data.get("formatted_solutions")
+                data = self._decode_cache(legacy)
+                self._encode_cache(cache_file, data)
+                legacy.unlink()
+            else:
+                data = self._decode_cache(cache_file)
+            
+            # 检查缓存是否过期
+            cached_at = data.get("cached_at", 0)
+            if time.time() - cached_at > self.CACHE_TTL_SECONDS:
+                logger.debug(f"[{problem_id}] 缓存已过期，将重新搜索")
+                cache_file.unlink()  # 删除过期缓存
+                return None
+            
+            return data.get("formatted_solutions")
         except Exception as e:
             logger.debug(f"加载缓存失败: {e}")
         return None
@@ -380,14 +579,13 @@ class SolutionSearcher:
     def _save_to_cache(self, problem_id: str, formatted: str):
         """保存题解到缓存（带时间戳）"""
         try:
-            import time
             cache_file = self._cache_file(problem_id)
             data = {
                 "problem_id": problem_id,
                 "formatted_solutions": formatted,
                 "cached_at": time.time()
             }
-            cache_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            self._encode_cache(cache_file, data)
             logger.debug(f"[{problem_id}] 题解已缓存")
         except Exception as e:
             logger.debug(f"保存缓存失败: {e}")
@@ -396,9 +594,12 @@ class SolutionSearcher:
         """清除缓存"""
         try:
             if problem_id:
-                cache_file = self._cache_file(problem_id)
-                if cache_file.exists():
-                    cache_file.unlink()
+                removed = False
+                for cache_file in {self._cache_file(problem_id), self._legacy_cache_file(problem_id)}:
+                    if cache_file.exists():
+                        cache_file.unlink()
+                        removed = True
+                if removed:
                     logger.info(f"已清除题目 {problem_id} 的题解缓存")
             else:
                 import shutil
@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 
-import time, json, threading
+import time, json, threading, re
 from pathlib import Path
 from typing import Dict, Any
 
@@ -17,7 +17,9 @@ from services.llm.stream_handler import StreamHandler
 from services.prompt_manager import get_prompt_manager
 from services.problem_data_manager import ProblemDataManager
 from utils.text import html_to_text, sanitize_cpp_code, sanitize_filename, parse_examples
-from services.oj.shsoj.status_codes import get_status_name, is_judging, is_final_status, is_compile_error, is_accepted
+from services.oj.shsoj.status_codes import (
+    get_status_name, is_accepted, get_status_flags, FLAG_AC, FLAG_CE, FLAG_FINAL,
+)
 
 
 def build_prompt_for_solution(problem: Dict[str, Any], reference_solutions: str = None) -> str:
@@ -63,6 +65,10 @@ def build_prompt_for_solution(problem: Dict[str, Any], reference_solutions: str
     return "\n".join(prompt_parts)
 
 
+# reasoning 中的 C++ 代码块
+_CODE_BLOCK_RE = re.compile(r'```(?:cpp|c\+\+)?\s*(.*?)```', re.DOTALL)
+
+
 class SolveService:
     # 类级别的 HydroOJ 认证对象，所有 SolveService 实例共享同一个 session（避免并发时创建多个 session 导致 403）
     _hydrooj_adapter = None
@@ -238,8 +244,7 @@ class SolveService:
         
         if not code and reasoning:
             self._log(original_id, "尝试从reasoning中提取代码...")
-            import re
-            code_blocks = re.findall(r'```(?:cpp|c\+\+)?\s*(.*?)```', reasoning, re.DOTALL)
+            code_blocks = _CODE_BLOCK_RE.findall(reasoning)
             if code_blocks:
                 code = code_blocks[0].strip()
                 self._log(original_id, f"从reasoning提取到代码（{len(code)}字符）")
@@ -354,7 +359,7 @@ class SolveService:
                     
             except Exception as e:
                 self._log(original_id, f"✗ {adapter_display} 提交失败: {e}")
-                raise RuntimeError(f"{adapter_display} 提交失败: {e}")
+                raise RuntimeError(f"{adapter_display} 提交失败: {e}") from e
         
         # 向后兼容：使用旧的 API（如果没有提供适配器）
         # 修改为C++ With O2
@@ -401,21 +406,22 @@ class SolveService:
             poll_count += 1
             
             status_name = get_status_name(status)
+            flags = get_status_flags(status)
             self._log(original_id, f"[轮询 {poll_count}] {status_name}")
             
-            if is_compile_error(status) and not last.get("errorMessage"):
+            if flags & FLAG_CE and not last.get("errorMessage"):
                 if poll_count < 3:
                     self._log(original_id, f"  CE但无错误信息，继续等待判题...")
                     if not interruptible_sleep(3.0, self._is_cancelled):
                         return {"cancelled": True}
                     continue
             
-            if is_final_status(status):
-                if is_accepted(status):
+            if flags & FLAG_FINAL:
+                if flags & FLAG_AC:
                     self._log(original_id, "✓ 判题通过 (Accepted)！")
                 else:
                     self._log(original_id, f"✗ 判题未通过：{status_name}")
-                    if is_compile_error(status):
+                    if flags & FLAG_CE:
                         error_msg = last.get("errorMessage", "无错误信息")
                         self._log(original_id, f"错误信息: {error_msg}")
                 
@@ -630,7 +636,7 @@ class SolveService:
                     
             except Exception as e:
                 self._log(original_id, f"✗ {adapter_display} 提交失败: {e}")
-                raise RuntimeError(f"{adapter_display} 提交失败: {e}")
+                raise RuntimeError(f"{adapter_display} 提交失败: {e}") from e
         # 检查是否是 HydroOJ 题目（use_local_problem 为 True 说明有 hydrooj_real_id）
         elif use_local_problem and hydrooj_real_id:
             # HydroOJ 题目：使用 HydroOJ 适配器提交（向后兼容）
@@ -695,7 +701,7 @@ class SolveService:
                     
             except Exception as e:
                 self._log(original_id, f"✗ HydroOJ 提交失败: {e}")
-                raise RuntimeError(f"HydroOJ 提交失败: {e}")
+                raise RuntimeError(f"HydroOJ 提交失败: {e}") from e
         else:
             # SHSOJ 题目：使用原有逻辑
             language = "C++ With O2"
@@ -734,18 +740,19 @@ class SolveService:
                 
                 # 实时输出判题状态
                 status_name = get_status_name(status)
+                flags = get_status_flags(status)
                 self._log(original_id, f"[轮询 {poll_count}] {status_name}")
                 
                 # 如果是CE但没有错误信息，可能是OJ还在处理，再等等
-                if is_compile_error(status) and not last.get("errorMessage"):
+                if flags & FLAG_CE and not last.get("errorMessage"):
                     if poll_count < 3:  # 前3次轮询到CE但无错误信息时继续等待
                         self._log(original_id, f"  CE但无错误信息，继续等待判题...")
                         if not interruptible_sleep(3.0, self._is_cancelled):
                             return {"cancelled": True}
                         continue
                 
-                if is_final_status(status):
-                    if is_accepted(status):
+                if flags & FLAG_FINAL:
+                    if flags & FLAG_AC:
                         self._log(original_id, "✓ 判题通过 (Accepted)！")
                     else:
                         self._log(original_id, f"✗ 判题未通过：{status_name}")
@@ -128,6 +128,7 @@ class TaskService:
         # 任务取消追踪
         self._cancelled_tasks: set = set()
         self._running_tasks: Dict[int, Any] = {}  # task_id -> future
+        self._pipelines: Dict[int, Any] = {}  # task_id -> 运行中的 PipelineRunner（取消时直接唤醒其等待）
         self._shutting_down = False
         
         self._initialized = True
@@ -413,9 +414,9 @@ class TaskService:
         pipeline = PipelineRunner(
             cfg_mgr, 
             user_id=user_id,
-            fetch_adapter_override=fetch_adapter  # 任务级别隔离
+            fetch_adapter_override=fetch_adapter,  # 任务级别隔离
+            task_id=task_id
         )
-        pipeline._current_task_id = task_id
         
         # 传递取消检查函数给 Pipeline（包括服务关闭检查）
         pipeline._cancellation_check = lambda: self.is_task_cancelled(task_id) or self._shutting_down
@@ -430,9 +431,11 @@ class TaskService:
         def run_pipeline():
             """在线程池中执行 pipeline，添加日志追踪"""
             logger.info(f"[Pipeline] 任务 {task_id} 线程开始执行 (problem={problem_id})")
+            self._pipelines[task_id] = pipeline
             try:
                 return pipeline.run([problem_id], config.to_modules_dict(), force_process_finished=True)
             finally:
+                self._pipelines.pop(task_id, None)
                 logger.info(f"[Pipeline] 任务 {task_id} 线程执行结束 (problem={problem_id})")
         
         try:
@@ -628,6 +631,11 @@ class TaskService:
         """取消正在运行的任务"""
         self._cancelled_tasks.add(task_id)
         
+        # 通知运行中的 pipeline，退避等待立即结束
+        pipeline = self._pipelines.get(task_id)
+        if pipeline is not None:
+            pipeline.request_cancel()
+        
         # 尝试取消 future
         if task_id in self._running_tasks:
             future = self._running_tasks.pop(task_id, None)
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import math
+import random
 import threading
 import time
+from email.utils import parsedate_to_datetime
 from typing import Optional, Callable
 
+import requests
+
 class SemaphorePool:
     """三个独立限流的信号量：DeepSeek、OJ API读、OJ API写"""
     def __init__(self, deepseek_limit: int, oj_limit: int):
@@ -26,22 +31,54 @@ def acquire(sem: threading.Semaphore) -> _Acquire:
 
 class CancelToken:
     def __init__(self):
-        self._flag = False
-        self._lock = threading.Lock()
+        self._event = threading.Event()
 
     def cancel(self):
-        with self._lock:
-            self._flag = True
+        self._event.set()
 
     def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """阻塞直到被取消或超时，返回是否已取消（取消时立即唤醒，无需轮询）"""
+        return self._event.wait(timeout)
+
+
+class TokenBucket:
+    """重试令牌桶（自适应重试）：重试消耗令牌，服务端正常响应时返还
+
+    下游持续限流时令牌耗尽，后续重试在本地直接放弃，不再加重服务端负担；
+    最坏情况下的重试次数约为 capacity / 每次重试的消耗。
+    """
+
+    def __init__(self, capacity: float = 10.0):
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """令牌足够时扣除并返回 True，否则不扣除并返回 False"""
+        with self._lock:
+            if self._tokens < amount:
+                return False
+            self._tokens -= amount
+            return True
+
+    def add(self, amount: float = 1.0) -> None:
+        """返还令牌（不超过容量）"""
         with self._lock:
-            return self._flag
+            self._tokens = min(self.capacity, self._tokens + amount)
 
 
 def interruptible_sleep(
     seconds: float, 
     cancel_check: Optional[Callable[[], bool]] = None,
-    interval: float = 0.5
+    interval: float = 0.5,
+    token: Optional[CancelToken] = None,
 ) -> bool:
     """可中断的等待
     
@@ -49,22 +86,89 @@ def interruptible_sleep(
         seconds: 等待秒数
         cancel_check: 取消检查函数，返回 True 表示需要取消
         interval: 检查间隔（默认 0.5 秒）
+        token: 取消令牌；提供时在令牌上阻塞等待，取消后立即返回
     
     Returns:
         bool: True 表示正常完成，False 表示被取消
     """
     if cancel_check is None:
+        if token is not None:
+            return not token.wait(seconds)
         time.sleep(seconds)
         return True
     
-    elapsed = 0.0
-    while elapsed < seconds:
+    deadline = time.monotonic() + seconds
+    while True:
         if cancel_check():
             return False
-        sleep_time = min(interval, seconds - elapsed)
-        time.sleep(sleep_time)
-        elapsed += sleep_time
-    return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        sleep_time = min(interval, remaining)
+        if token is not None:
+            if token.wait(sleep_time):
+                return False
+        else:
+            time.sleep(sleep_time)
+
+
+class TransientHTTPError(RuntimeError):
+    """可重试的HTTP错误（5xx），retry_after 为服务端建议的等待秒数"""
+
+    def __init__(self, message: str, status_code: int = 0, retry_after: float = 0.0):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RateLimitedError(TransientHTTPError):
+    """服务端限流（HTTP 429/503）"""
+
+
+# 服务端建议等待时间的上限（秒），防止异常或恶意的 Retry-After 让线程无限期阻塞
+MAX_RETRY_AFTER = 300.0
+
+
+def clamp_retry_after(value: float) -> float:
+    """把服务端建议的等待秒数限制在 [0, MAX_RETRY_AFTER]，非有限值（inf/nan）视为 0"""
+    if not math.isfinite(value):
+        return 0.0
+    return min(MAX_RETRY_AFTER, max(0.0, value))
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """解析 Retry-After 响应头（秒数或 HTTP-date），无法解析时返回 0，结果不超过 MAX_RETRY_AFTER"""
+    if not value:
+        return 0.0
+    value = value.strip()
+    try:
+        return clamp_retry_after(float(value))
+    except ValueError:
+        pass
+    try:
+        return clamp_retry_after(parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return 0.0
+
+
+def raise_for_transient_status(resp: requests.Response, message: str) -> None:
+    """429/503 抛出 RateLimitedError，其余 5xx 抛出 TransientHTTPError"""
+    code = resp.status_code
+    if code in (429, 503):
+        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        raise RateLimitedError(message, status_code=code, retry_after=retry_after)
+    if code >= 500:
+        raise TransientHTTPError(message, status_code=code)
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """仅 5xx/429/连接错误可重试，4xx 与业务错误应立即失败"""
+    return isinstance(exc, (TransientHTTPError, requests.ConnectionError, requests.Timeout))
+
+
+def decorrelated_jitter(prev_delay: float, base_delay: float, cap: float) -> float:
+    """Decorrelated jitter：在 [base, prev*3] 内随机取值并以 cap 封顶，避免多线程同步重试"""
+    return min(cap, random.uniform(base_delay, max(base_delay, prev_delay * 3)))
 
 
 def retry_with_backoff(
@@ -74,7 +178,10 @@ def retry_with_backoff(
     base_delay: float = 1.0, 
     factor: float = 2.0, 
     on_error: Optional[Callable] = None,
-    cancel_check: Optional[Callable[[], bool]] = None
+    cancel_check: Optional[Callable[[], bool]] = None,
+    jitter: bool = False,
+    max_delay: float = 30.0,
+    retryable: Optional[Callable[[Exception], bool]] = None
 ):
     """带退避的重试（支持取消检查）
     
@@ -82,9 +189,14 @@ def retry_with_backoff(
         fn: 要执行的函数
         max_attempts: 最大尝试次数
         base_delay: 基础延迟
-        factor: 退避因子
+        factor: 退避因子（jitter=False 时使用）
         on_error: 错误回调
         cancel_check: 取消检查函数
+        jitter: 使用 decorrelated jitter 代替固定指数退避
+        max_delay: jitter 模式下单次等待上限，同时也是 retry_after 的上限
+        retryable: 判断异常是否可重试，返回 False 时立即抛出
+    
+    异常携带 retry_after（如 RateLimitedError）时，等待时间不少于 min(retry_after, max_delay)。
     
     Returns:
         函数执行结果
@@ -93,6 +205,7 @@ def retry_with_backoff(
         最后一次异常或 CancelledError
     """
     attempt = 0
+    delay = base_delay
     while True:
         # 检查取消
         if cancel_check and cancel_check():
@@ -109,8 +222,15 @@ def retry_with_backoff(
                     pass
             if attempt >= max_attempts:
                 raise
+            if retryable is not None and not retryable(e):
+                raise
             
             # 可中断的等待
-            delay = base_delay * (factor ** (attempt - 1))
+            if jitter:
+                delay = decorrelated_jitter(delay, base_delay, max_delay)
+            else:
+                delay = base_delay * (factor ** (attempt - 1))
+            retry_after = clamp_retry_after(float(getattr(e, "retry_after", 0.0) or 0.0))
+            delay = max(delay, min(retry_after, max_delay))
             if not interruptible_sleep(delay, cancel_check):
                 raise InterruptedError("操作被取消")
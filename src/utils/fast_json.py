@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""JSON 编解码（优先使用 orjson，未安装时回退标准库 json）"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from typing import Any, BinaryIO, Iterable
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """序列化为 UTF-8 字节（非 ASCII 字符原样输出，等价于 ensure_ascii=False）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _default(obj: Any) -> Any:
+    """标准库回退路径：与 orjson 一致地序列化 dataclass"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_pretty(obj: Any) -> bytes:
+    """序列化为两空格缩进的 UTF-8 字节（等价于 json.dumps(ensure_ascii=False, indent=2)，支持 dataclass）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=_default).encode("utf-8")
+
+
+def dump_array_pretty(items: Iterable[Any], fp: BinaryIO) -> None:
+    """逐个元素写出 JSON 数组，输出与 dumps_pretty(list(items)) 逐字节一致
+
+    不在内存中拼出整份文档，峰值内存只与单个元素有关。
+    """
+    first = True
+    for item in items:
+        fp.write(b"[\n  " if first else b",\n  ")
+        fp.write(dumps_pretty(item).replace(b"\n", b"\n  "))
+        first = False
+    fp.write(b"[]" if first else b"\n]")
+
+
+def loads(data: bytes | bytearray | str) -> Any:
+    """反序列化 JSON 字节或字符串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
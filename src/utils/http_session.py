@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""带连接池的 requests.Session 工厂（复用 keep-alive 连接，摊薄 TCP/TLS 握手）"""
+
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_pooled_session(
+    pool_connections: int = 4,
+    pool_maxsize: int = 16,
+    proxies: dict | None = None,
+    adapter: HTTPAdapter | None = None,
+) -> requests.Session:
+    """创建挂载了连接池的 Session
+    
+    Args:
+        pool_connections: 缓存的主机连接池数量
+        pool_maxsize: 每个主机的最大连接数（应不小于并发线程数）
+        proxies: 代理配置
+        adapter: 复用已有的 HTTPAdapter（多个 Session 共享连接池，头部/Cookie 互不影响）
+    
+    重试由上层（retry_with_backoff）负责，这里 max_retries=0。
+    """
+    s = requests.Session()
+    if adapter is None:
+        adapter = create_pooled_adapter(pool_connections, pool_maxsize)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.proxies = proxies or {}
+    return s
+
+
+def create_pooled_adapter(pool_connections: int = 4, pool_maxsize: int = 16) -> HTTPAdapter:
+    """创建不自动重试的连接池 HTTPAdapter，可挂载到多个 Session 上共享"""
+    return HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
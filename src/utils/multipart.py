@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""流式 multipart/form-data 请求体（避免把整个文件读入内存）"""
+
+from __future__ import annotations
+
+import os
+import time
+
+
+class MultipartFileStream:
+    """单文件 multipart/form-data 的只读流
+
+    按 head → 文件内容 → tail 顺序分块读出，格式与原先手工拼接的
+    WebKit 风格请求体完全一致。实现了 ``read`` 与 ``__len__``，
+    requests 会据此设置 Content-Length 并分块发送，不会整体复制文件。
+    """
+
+    def __init__(self, path: str, field: str = "file",
+                 content_type: str = "application/x-zip-compressed"):
+        self.boundary = "----WebKitFormBoundary%08x%08x" % (
+            int(time.time()) & 0xFFFFFFFF, os.getpid() & 0xFFFFFFFF
+        )
+        filename = os.path.basename(path)
+        crlf = "\r\n"
+        lines = [
+            f"--{self.boundary}",
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"',
+            f"Content-Type: {content_type}",
+            "",
+        ]
+        self._head = (crlf.join(lines) + crlf).encode("utf-8")
+        self._tail = (crlf + f"--{self.boundary}--" + crlf).encode("utf-8")
+        self._length = len(self._head) + os.path.getsize(path) + len(self._tail)
+        self._file = open(path, "rb")
+        self._stage = 0  # 0=head, 1=file, 2=tail
+        self._pending = b""
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length
+        out = bytearray()
+        while len(out) < size:
+            if self._pending:
+                take = size - len(out)
+                out += self._pending[:take]
+                self._pending = self._pending[take:]
+            elif self._stage == 0:
+                self._pending, self._stage = self._head, 1
+            elif self._stage == 1:
+                chunk = self._file.read(size - len(out))
+                if chunk:
+                    out += chunk
+                else:
+                    self._file.close()
+                    self._pending, self._stage = self._tail, 2
+            else:
+                break
+        return bytes(out)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "MultipartFileStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
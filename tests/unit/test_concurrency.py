@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+retry_with_backoff 单元测试
+
+测试限流等待、decorrelated jitter 与可重试判定
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加src到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import pytest
+from utils import concurrency
+from utils.concurrency import (
+    CancelToken,
+    RateLimitedError,
+    TokenBucket,
+    decorrelated_jitter,
+    interruptible_sleep,
+    is_retryable_error,
+    parse_retry_after,
+    retry_with_backoff,
+)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录等待时长而不真正 sleep"""
+    recorded = []
+
+    def fake_sleep(seconds, cancel_check=None, interval=0.5):
+        recorded.append(seconds)
+        return True
+
+    monkeypatch.setattr(concurrency, "interruptible_sleep", fake_sleep)
+    return recorded
+
+
+class TestRetryWithBackoff:
+    """retry_with_backoff 测试类"""
+
+    def test_retry_after_is_honored(self, sleeps):
+        """测试限流异常的 Retry-After 作为最小等待时间"""
+        calls = []
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RateLimitedError("429", status_code=429, retry_after=12.0)
+            return "ok"
+
+        assert retry_with_backoff(fn, base_delay=1.0) == "ok"
+        assert sleeps == [12.0]
+
+    def test_retry_after_is_capped_by_max_delay(self, sleeps):
+        """测试过大的 Retry-After 不超过 max_delay"""
+        calls = []
+
+        def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RateLimitedError("429", status_code=429, retry_after=99999999.0)
+            return "ok"
+
+        assert retry_with_backoff(fn, base_delay=1.0, max_delay=20.0) == "ok"
+        assert sleeps == [20.0]
+
+    def test_non_retryable_fails_fast(self, sleeps):
+        """测试不可重试的错误立即抛出"""
+        calls = []
+
+        def fn():
+            calls.append(1)
+            raise RuntimeError("登录失败，HTTP状态 401")
+
+        with pytest.raises(RuntimeError):
+            retry_with_backoff(fn, retryable=is_retryable_error)
+        assert len(calls) == 1
+        assert sleeps == []
+
+    def test_jitter_delays_are_bounded(self, sleeps):
+        """测试 jitter 模式下等待时间在 [base, cap] 内"""
+        def fn():
+            raise RateLimitedError("503", status_code=503)
+
+        with pytest.raises(RateLimitedError):
+            retry_with_backoff(fn, max_attempts=6, base_delay=1.0, jitter=True, max_delay=5.0)
+        assert len(sleeps) == 5
+        assert all(1.0 <= d <= 5.0 for d in sleeps)
+
+    def test_default_exponential_delays_unchanged(self, sleeps):
+        """测试默认指数退避序列不变"""
+        def fn():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            retry_with_backoff(fn, max_attempts=4, base_delay=1.0, factor=2.0)
+        assert sleeps == [1.0, 2.0, 4.0]
+
+
+class TestHelpers:
+    """辅助函数测试"""
+
+    def test_parse_retry_after_seconds(self):
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after(None) == 0.0
+        assert parse_retry_after("garbage") == 0.0
+
+    def test_parse_retry_after_is_capped(self):
+        assert parse_retry_after("inf") == 0.0
+        assert parse_retry_after("nan") == 0.0
+        assert parse_retry_after("99999999") == concurrency.MAX_RETRY_AFTER
+
+    def test_decorrelated_jitter_range(self):
+        for _ in range(100):
+            d = decorrelated_jitter(2.0, 1.0, 30.0)
+            assert 1.0 <= d <= 6.0
+
+
+class TestTokenBucket:
+    """TokenBucket 测试类"""
+
+    def test_exhausts_and_refills(self):
+        """测试令牌耗尽后拒绝，返还后恢复且不超过容量"""
+        bucket = TokenBucket(capacity=10.0)
+        assert bucket.try_acquire(5.0)
+        assert bucket.try_acquire(5.0)
+        assert not bucket.try_acquire(1.0)
+        assert bucket.tokens == 0.0
+
+        bucket.add(1.0)
+        assert bucket.try_acquire(1.0)
+        bucket.add(100.0)
+        assert bucket.tokens == 10.0
+
+
+class TestInterruptibleSleep:
+    """interruptible_sleep 测试类"""
+
+    def test_token_cancel_wakes_immediately(self):
+        """测试取消令牌被触发时立即结束等待"""
+        token = CancelToken()
+        threading.Timer(0.05, token.cancel).start()
+        start = time.monotonic()
+        assert interruptible_sleep(30.0, lambda: False, token=token) is False
+        assert time.monotonic() - start < 1.0
+
+    def test_completes_without_cancel(self):
+        """测试未取消时正常等待结束"""
+        assert interruptible_sleep(0.01, lambda: False, token=CancelToken()) is True
+        assert interruptible_sleep(0.01, token=CancelToken()) is True
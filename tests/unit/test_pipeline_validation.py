@@ -84,6 +84,102 @@ class TestPipelineValidationIntegration(unittest.TestCase):
         self.assertTrue(result_extra.get("validation_passed", False))
 
 
+
+class TestRetryBackoff(unittest.TestCase):
+    """测试重试等待时间按错误类型分类"""
+
+    def test_backoff_classification(self):
+        """确定性错误不等待，4xx 线性等待，瞬时错误约 30s"""
+        from services.pipeline import _backoff_for
+
+        self.assertEqual(_backoff_for("编译错误 CE", 1), 0.0)
+        self.assertEqual(_backoff_for("ZIP 文件缺失", 2), 0.0)
+        self.assertEqual(_backoff_for("HTTP 404 Not Found", 2), 10.0)
+        for text in ("HTTP 429", "响应码=503", "Read timed out"):
+            self.assertTrue(28.5 <= _backoff_for(text, 1) <= 31.5)
+        self.assertEqual(_backoff_for("unknown", 3, fallback=15.0), 15.0)
+
+    def test_backoff_ignores_bare_numbers(self):
+        """行号、通过数等普通数字不被当作 HTTP 状态码；确定性错误优先"""
+        from services.pipeline import _backoff_for
+
+        self.assertEqual(_backoff_for("编译失败: gen.cpp:512:5: error", 1), 0.0)
+        self.assertEqual(_backoff_for("compile error at line 404", 1), 0.0)
+        self.assertEqual(_backoff_for("验题失败 450/500 通过", 1), 0.0)
+        self.assertEqual(_backoff_for("本地验题失败: 3/10 通过", 2), 0.0)
+        self.assertEqual(_backoff_for("got 503 items", 2, fallback=7.0), 7.0)
+        self.assertEqual(_backoff_for("status: 403", 3), 15.0)
+
+    def test_backoff_transient_wins_over_local_keywords(self):
+        """上传错误常提到 zip / 适配器，只要带 5xx、429 或超时仍需退避"""
+        from services.pipeline import _backoff_for
+
+        for text in (
+            "zip upload failed: HTTP 502 Bad Gateway",
+            "上传适配器返回 响应码=503",
+            "HTTPSConnectionPool: Read timed out (adapter hydrooj)",
+            "题目不存在 HTTP 429",
+            "Connection reset; missing response",
+        ):
+            self.assertTrue(28.5 <= _backoff_for(text, 1) <= 31.5, text)
+        self.assertEqual(_backoff_for("zip 上传失败 HTTP 404", 2), 10.0)
+
+    def test_compute_retry_wait_is_capped_exponential(self):
+        """求解重试等待按次数指数增长，带 full jitter 且不超过上限"""
+        from services.pipeline import _compute_retry_wait
+
+        for attempt, ceiling in ((1, 30.0), (2, 60.0), (3, 120.0), (5, 120.0)):
+            wait = _compute_retry_wait("rate_limit", attempt)
+            self.assertTrue(ceiling * 0.5 <= wait <= ceiling)
+        self.assertTrue(2.5 <= _compute_retry_wait("unknown", 1) <= 5.0)
+
+    def test_server_retry_after(self):
+        """优先使用异常链上的 retry_after，其次解析错误信息中的等待提示"""
+        from services.pipeline import _server_retry_after
+        from utils.concurrency import RateLimitedError
+
+        try:
+            try:
+                raise RateLimitedError("提交频率过快", status_code=429, retry_after=12.0)
+            except RateLimitedError as inner:
+                raise RuntimeError(f"SHSOJ 提交失败: {inner}") from inner
+        except RuntimeError as e:
+            self.assertEqual(_server_retry_after(e, str(e)), 12.0)
+
+        err = RuntimeError("HTTP 429 Too Many Requests（请求过于频繁，建议等待 7 秒）")
+        self.assertEqual(_server_retry_after(err, str(err)), 7.0)
+        self.assertIsNone(_server_retry_after(RuntimeError("频率过快"), "频率过快"))
+
+        from utils.concurrency import MAX_RETRY_AFTER
+        huge = RateLimitedError("429", status_code=429, retry_after=float("inf"))
+        self.assertIsNone(_server_retry_after(huge, str(huge)))
+        err = RuntimeError("建议等待 99999999 秒")
+        self.assertEqual(_server_retry_after(err, str(err)), MAX_RETRY_AFTER)
+
+    def test_classify_solve_error(self):
+        """求解异常分类：认证失效优先于频率限制，其次题目不存在"""
+        from services.pipeline import _classify_solve_error
+
+        self.assertEqual(_classify_solve_error("提交频率过快，HTTP 401"), "auth_expired")
+        self.assertEqual(_classify_solve_error("Token has EXPIRED"), "auth_expired")
+        self.assertEqual(_classify_solve_error("题目已不存在 (HTTP 429)"), "rate_limit")
+        self.assertEqual(_classify_solve_error("题目已不存在"), "not_exist")
+        self.assertEqual(_classify_solve_error("网络错误"), "other")
+
+    def test_classify_solve_error_from_exception_chain(self):
+        """异常链上的 RateLimitedError 判为频率限制，即使错误信息不含限流关键字"""
+        from services.pipeline import _classify_solve_error
+        from utils.concurrency import RateLimitedError
+
+        try:
+            try:
+                raise RateLimitedError("HTTP 503", status_code=503, retry_after=20.0)
+            except RateLimitedError as inner:
+                raise RuntimeError("提交失败: HTTP 503 Service Unavailable") from inner
+        except RuntimeError as e:
+            self.assertEqual(_classify_solve_error(str(e), e), "rate_limit")
+            self.assertEqual(_classify_solve_error(str(e)), "other")
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
 
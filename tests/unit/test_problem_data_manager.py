@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+ProblemDataManager 单元测试
+
+测试批量扫描已完成题目与单次读盘加载状态
+"""
+
+import sys
+from pathlib import Path
+
+# 添加src到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from services.problem_data_manager import ProblemDataManager
+
+
+def _make_problem(base: Path, name: str, status=None) -> Path:
+    pdir = base / name
+    pdir.mkdir(parents=True)
+    data = {"title": name}
+    if status is not None:
+        data["_processing"] = status
+    ProblemDataManager.save(pdir, data)
+    return pdir
+
+
+class TestScanCompleted:
+    """scan_completed 测试类"""
+
+    def test_matches_is_completed(self, tmp_path):
+        """测试批量扫描结果与逐个 is_completed 一致"""
+        dirs = [
+            _make_problem(tmp_path, "problem_1", {"stage": "completed"}),
+            _make_problem(tmp_path, "problem_2", {"stage": "gen", "ok_solve": True}),
+            _make_problem(tmp_path, "problem_3", {"stage": "upload"}),
+            _make_problem(tmp_path, "problem_4"),
+        ]
+        (tmp_path / "problem_5").mkdir()
+
+        expected = {d.name for d in dirs if ProblemDataManager.is_completed(d)}
+        assert ProblemDataManager.scan_completed(tmp_path) == expected == {"problem_1", "problem_2"}
+
+    def test_filters_by_dir_names(self, tmp_path):
+        """测试只返回关心的目录"""
+        _make_problem(tmp_path, "problem_1", {"stage": "completed"})
+        _make_problem(tmp_path, "problem_2", {"stage": "completed"})
+
+        assert ProblemDataManager.scan_completed(tmp_path, ["problem_2", "problem_9"]) == {"problem_2"}
+
+    def test_missing_base_dir(self, tmp_path):
+        """测试工作区不存在时返回空集合"""
+        assert ProblemDataManager.scan_completed(tmp_path / "missing") == set()
+
+
+class TestLoadWithStatus:
+    """load_with_status 测试类"""
+
+    def test_matches_separate_calls(self, tmp_path):
+        """测试结果与 load() + is_completed() 一致"""
+        for name, status in [("problem_1", {"stage": "completed"}), ("problem_2", {"stage": "gen"}), ("problem_3", None)]:
+            pdir = _make_problem(tmp_path, name, status)
+            data, is_ac = ProblemDataManager.load_with_status(pdir)
+            assert data == ProblemDataManager.load(pdir)
+            assert is_ac == ProblemDataManager.is_completed(pdir)
+
+    def test_missing_dir(self, tmp_path):
+        """测试目录不存在时返回空数据且未完成"""
+        assert ProblemDataManager.load_with_status(tmp_path / "problem_x") == ({}, False)
+
+
+class TestUpdate:
+    """update 测试类"""
+
+    def test_merges_processing_in_one_write(self, tmp_path):
+        """测试字段更新与处理状态合并一次写入，且保留已有字段"""
+        pdir = _make_problem(tmp_path, "problem_1", {"stage": "gen", "ok_gen": True})
+        ProblemDataManager.update(pdir, {"validation": {"passed": True}}, processing={"stage": "upload"})
+
+        data = ProblemDataManager.load(pdir)
+        assert data["title"] == "problem_1"
+        assert data["validation"] == {"passed": True}
+        assert data["_processing"]["stage"] == "upload"
+        assert data["_processing"]["ok_gen"] is True
+        assert "updated_at" in data["_processing"]
+        assert not list(pdir.glob("*.tmp"))
+
+
+class TestReadonlyCache:
+    """只读加载缓存测试类"""
+
+    def test_sees_saved_changes(self, tmp_path):
+        """测试保存后只读接口读到新数据，且返回值修改不影响缓存"""
+        pdir = _make_problem(tmp_path, "problem_1", {"stage": "gen"})
+        assert not ProblemDataManager.is_completed(pdir)
+
+        ProblemDataManager.set_processing_status(pdir, {"stage": "completed"})
+        assert ProblemDataManager.is_completed(pdir)
+
+        status = ProblemDataManager.get_processing_status(pdir)
+        status["stage"] = "gen"
+        assert ProblemDataManager.get_processing_status(pdir)["stage"] == "completed"
+
+
+class TestSave:
+    """save 测试类"""
+
+    def test_skips_identical_write(self, tmp_path):
+        """测试内容未变化时不重写文件"""
+        pdir = _make_problem(tmp_path, "problem_1", {"stage": "gen"})
+        data_file = pdir / "problem_data.json"
+        ino = data_file.stat().st_ino
+
+        ProblemDataManager.save(pdir, ProblemDataManager.load(pdir))
+        assert data_file.stat().st_ino == ino
+
+        ProblemDataManager.save(pdir, {"title": "changed"})
+        assert data_file.stat().st_ino != ino
+        assert ProblemDataManager.load(pdir)["title"] == "changed"
+
+    def test_concurrent_saves_do_not_collide(self, tmp_path):
+        """测试同目录多线程并发保存不会互相覆盖临时文件"""
+        from concurrent.futures import ThreadPoolExecutor
+        from loguru import logger
+
+        pdir = _make_problem(tmp_path, "problem_1", {"stage": "gen"})
+        errors = []
+        sink_id = logger.add(errors.append, level="ERROR")
+
+        def worker(n):
+            for i in range(300):
+                ProblemDataManager.save(pdir, {"title": f"t{n}-{i}"})
+
+        try:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(worker, range(4)))
+        finally:
+            logger.remove(sink_id)
+
+        assert errors == []
+        assert ProblemDataManager.load(pdir)["title"].endswith("-299")
+        assert not list(pdir.glob("*.tmp"))
@@ -12,7 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
 import pytest
-from services.problem_id import get_problem_id_resolver
+from services.problem_id import ProblemIdResolver, get_problem_id_resolver
 
 
 class TestProblemIdResolver:
@@ -124,6 +124,57 @@ class TestProblemIdResolver:
         assert canonical is not None
         assert "1234" in canonical
 
+    # ============= 批量规范化测试 =============
+
+    def test_bulk_canonicalize_matches_single(self):
+        """测试批量规范化与逐个规范化结果一致"""
+        ids = ["2772", " 1234 ", "2772", "https://codeforces.com/contest/1234/problem/A", "P1001", ""]
+        bulk = self.resolver.bulk_canonicalize(ids)
+
+        assert set(bulk) == set(ids)
+        assert bulk == {raw_id: self.resolver.canonicalize(raw_id) for raw_id in ids}
+
+
+class TestResolverCache:
+    """解析结果缓存测试"""
+
+    class _Fetcher:
+        def parse_problem_id(self, url):
+            return url.rsplit("/", 1)[-1]
+
+    class _Adapter:
+        name = "fake"
+
+        def get_problem_fetcher(self):
+            return TestResolverCache._Fetcher()
+
+    class _Registry:
+        def __init__(self, adapter):
+            self.adapter = adapter
+            self.lookups = 0
+
+        def find_adapter_by_url(self, url):
+            self.lookups += 1
+            return self.adapter
+
+    def test_canonicalize_is_cached(self):
+        """测试同一ID只查找一次适配器"""
+        registry = self._Registry(self._Adapter())
+        resolver = ProblemIdResolver(registry, default_base_url="https://oj.example.com")
+
+        assert resolver.canonicalize("2772") == resolver.canonicalize("2772") == "fake_2772"
+        assert resolver.parse_with_adapter("2772")[1] == "2772"
+        assert registry.lookups == 1
+
+    def test_missing_adapter_not_cached(self):
+        """测试未找到适配器的结果不被缓存"""
+        registry = self._Registry(None)
+        resolver = ProblemIdResolver(registry, default_base_url="https://oj.example.com")
+
+        assert resolver.canonicalize("2772") == "2772"
+        registry.adapter = self._Adapter()
+        assert resolver.canonicalize("2772") == "fake_2772"
+
 
 class TestPlatformDetection:
     """平台检测测试"""
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+SHSOJ 状态码单元测试
+
+测试标志位表与谓词函数语义一致
+"""
+
+import sys
+from pathlib import Path
+
+# 添加src到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from services.oj.shsoj import status_codes as sc
+
+
+class TestStatusFlags:
+    """状态标志位测试类"""
+
+    def test_predicates_match_original_semantics(self):
+        """测试谓词与原先的 ==/in 判断结果一致"""
+        for code in list(sc.STATUS_NAMES) + [99, None]:
+            assert sc.is_accepted(code) == (code == 0)
+            assert sc.is_compile_error(code) == (code in (6, -2))
+            assert sc.is_system_error(code) == (code == 8)
+            assert sc.is_partially_accepted(code) == (code == 7)
+            assert sc.is_wrong_answer(code) == (code == 1)
+            assert sc.is_runtime_error(code) == (code == 4)
+            assert sc.is_judging(code) == (code == 5)
+            assert sc.is_final_status(code) == (code != 5)
+            assert sc.requires_data_regeneration(code) == (code in (1, 4, 7))
+
+    def test_unknown_code_is_final(self):
+        """测试未知状态码视为最终状态"""
+        assert sc.get_status_flags(42) == sc.FLAG_FINAL